@@ -0,0 +1,104 @@
+"""Admission control for roll searches.
+
+At most ``limit`` searches run at once per process. Requests arriving
+while all slots are busy wait in a short queue, for at most
+``queue_timeout`` seconds or until their own deadline. Requests that
+find the queue full, or time out in it, are overflow: depending on the
+``overload`` policy they are either shed, by raising Overloaded, or
+admitted as degraded, which the caller answers with a cheaper search.
+Degraded requests have their own, separate limit, past which they are
+shed too.
+"""
+import contextlib
+import threading
+import time
+
+import metrics
+
+# What happens to requests that cannot get a search slot in time
+OVERLOAD_POLICIES = ('degrade', 'shed')
+
+class Overloaded(Exception):
+    """Raised for a request shed because every search slot is busy."""
+
+class AdmissionControl:
+    """A bounded number of search slots with a short wait queue in front."""
+
+    def __init__(self, limit, queue_size, queue_timeout, overload='degrade', degraded_limit=None):
+        if overload not in OVERLOAD_POLICIES:
+            raise ValueError(f"Unknown overload policy {overload!r}")
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.overload = overload
+        self.degraded_limit = limit * 4 if degraded_limit is None else degraded_limit
+        self.active = 0
+        self.waiting = 0
+        self.degraded = 0
+        self._condition = threading.Condition()
+
+    @contextlib.contextmanager
+    def admit(self, deadline=None):
+        """Hold a search slot for the enclosed block, yielding 'full' or 'degraded'.
+
+        ``deadline`` is the request's time.monotonic() deadline, which also
+        ends its wait in the queue. Raises Overloaded if the request is shed.
+        """
+        started = time.monotonic()
+        admitted = self._acquire(deadline)
+        metrics.stage_duration.observe(time.monotonic() - started, stage='queue')
+        if admitted:
+            try:
+                yield 'full'
+            finally:
+                self._release()
+            return
+
+        with self._condition:
+            degrade = self.overload == 'degrade' and self.degraded < self.degraded_limit
+            if degrade:
+                self.degraded += 1
+        if not degrade:
+            metrics.overload_requests.inc(action='shed')
+            raise Overloaded(f"All {self.limit} search slots and {self.queue_size} queue places are busy")
+        metrics.overload_requests.inc(action='degraded')
+        try:
+            yield 'degraded'
+        finally:
+            with self._condition:
+                self.degraded -= 1
+
+    def _acquire(self, deadline):
+        """Take a search slot, waiting in the queue if there is room; False if none was had."""
+        with self._condition:
+            # Arrivals queue behind waiting requests rather than taking a slot freed for them
+            if self.active < self.limit and not self.waiting:
+                self.active += 1
+                metrics.active_searches.set(self.active)
+                return True
+            if self.waiting >= self.queue_size:
+                return False
+
+            end = time.monotonic() + self.queue_timeout
+            if deadline is not None:
+                end = min(end, deadline)
+            self.waiting += 1
+            metrics.admission_queue_depth.set(self.waiting)
+            try:
+                while self.active >= self.limit:
+                    remaining = end - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+                self.active += 1
+                metrics.active_searches.set(self.active)
+                return True
+            finally:
+                self.waiting -= 1
+                metrics.admission_queue_depth.set(self.waiting)
+
+    def _release(self):
+        with self._condition:
+            self.active -= 1
+            metrics.active_searches.set(self.active)
+            self._condition.notify()
@@ -0,0 +1,202 @@
+"""Vectorized Monte Carlo roll search.
+
+Simulates thousands of random games at once as NumPy arrays, using the
+transition table of a compiled board from main.compile_board. The game
+rules are exactly those of main.simulate_game, which stays the reference
+implementation. NumPy is optional; check ``available()`` before use.
+"""
+import random
+import time
+
+import search_stats
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is an optional dependency
+    np = None
+
+# Number of games simulated together in one batch
+BATCH_SIZE = 4096
+
+# With a deadline, batches start at this size and are then sized to the time left
+DEADLINE_BATCH_SIZE = 256
+
+def available():
+    """Return True if NumPy is installed and the engine can be used."""
+    return np is not None
+
+def simulate_batch(board, players, rolls):
+    """Simulate one game per row of ``rolls`` (a 2-D array of die rolls).
+
+    Returns (winners, lengths, coverage) arrays: the winning player of each
+    game or -1, the number of rolls used, and the number of distinct
+    squares landed on.
+    """
+    board_size = board.board_size
+    landing = np.asarray(board.landing, dtype=np.int32)
+    destination = np.asarray(board.destination, dtype=np.int32)
+    next_mode = np.asarray(board.next_mode, dtype=np.int8)
+
+    games, max_rolls = rolls.shape
+    positions = np.zeros((games, players), dtype=np.int32)
+    die_modes = np.zeros((games, players), dtype=np.int8)
+    covered = np.zeros((games, board_size + 1), dtype=bool)
+    active = np.ones(games, dtype=bool)
+    winners = np.full(games, -1, dtype=np.int32)
+    lengths = np.full(games, max_rolls, dtype=np.int32)
+
+    for roll_index in range(max_rolls):
+        live = np.flatnonzero(active)
+        if live.size == 0:
+            break
+        player = roll_index % players
+
+        transition = (positions[live, player] * 2 + die_modes[live, player]) * 6 + rolls[live, roll_index] - 1
+        next_position = destination[transition]
+        covered[live, landing[transition]] = True
+        covered[live, next_position] = True
+        positions[live, player] = next_position
+        die_modes[live, player] = next_mode[transition]
+
+        won = live[next_position == board_size]
+        winners[won] = player
+        lengths[won] = roll_index + 1
+        active[won] = False
+
+    return winners, lengths, covered.sum(axis=1)
+
+def search_rolls(board, players, attempts, max_rolls, target_coverage, seed=None, deadline=None, patience=None,
+                 cancel=None, stats=None):
+    """Search random games in batches for the lowest-coverage win by the last player.
+
+    Stops early once a win at or below ``target_coverage`` is found, and
+    between batches once ``deadline`` (a time.monotonic() value) has passed,
+    ``patience`` attempts have brought no improvement or the ``cancel``
+    threading.Event is set.
+    Returns the best roll list, or [] if no attempt was won by the last player.
+    Without a ``seed`` one is drawn from the random module, so random.seed()
+    makes the search reproducible. Counts are added to ``stats`` as by
+    main.monte_carlo_rolls.
+    """
+    rng = np.random.default_rng(random.getrandbits(64) if seed is None else seed)
+    board_size = board.board_size
+    target_winner = players - 1
+    best_rolls = []
+    best_key = None
+    since_improvement = 0
+    seconds_per_game = None
+    played = wins = 0
+    stop = None
+
+    remaining = attempts
+    while remaining > 0:
+        games = min(BATCH_SIZE, remaining)
+        if deadline is not None:
+            if seconds_per_game is None:
+                games = min(games, DEADLINE_BATCH_SIZE)
+            else:
+                fits = int((deadline - time.monotonic()) / seconds_per_game)
+                games = max(1, min(games, fits))
+        remaining -= games
+
+        started = time.monotonic()
+        rolls = rng.integers(1, 7, size=(games, max_rolls), dtype=np.int32)
+        winners, lengths, coverage = simulate_batch(board, players, rolls)
+        seconds_per_game = (time.monotonic() - started) / games
+
+        candidates = np.flatnonzero(winners == target_winner)
+        played += games
+        wins += int(candidates.size)
+        if candidates.size:
+            # Lowest coverage first, shortest sequence on ties
+            best = candidates[np.lexsort((lengths[candidates], coverage[candidates]))[0]]
+            key = (int(coverage[best]), int(lengths[best]))
+            if best_key is None or key < best_key:
+                best_key = key
+                best_rolls = rolls[best, :lengths[best]].tolist()
+                since_improvement = games - 1 - best
+            else:
+                since_improvement += games
+        elif best_key is not None:
+            since_improvement += games
+
+        best_coverage = None if best_key is None else best_key[0] / board_size
+        stop = search_stats.stop_reason(best_coverage, target_coverage, deadline, patience, since_improvement, cancel)
+        if stop is not None:
+            break
+
+    search_stats.add_search_stats(stats, played, wins, stop)
+    return best_rolls
+
+def verify_batch(board, players, sequences):
+    """Replay roll sequences of any lengths together; return results as main.verify_rolls does.
+
+    Sequences are padded into BATCH_SIZE x longest arrays; each game stops
+    at its win, at the end of its own sequence or at an invalid roll.
+    """
+    results = []
+    for start in range(0, len(sequences), BATCH_SIZE):
+        results.extend(_verify_chunk(board, players, sequences[start:start + BATCH_SIZE]))
+    return results
+
+def _verify_chunk(board, players, sequences):
+    board_size = board.board_size
+    landing = np.asarray(board.landing, dtype=np.int32)
+    destination = np.asarray(board.destination, dtype=np.int32)
+    next_state = np.asarray(board.next_state, dtype=np.int32)
+
+    games = len(sequences)
+    sizes = np.fromiter(map(len, sequences), dtype=np.int64, count=games)
+    max_rolls = int(sizes.max(initial=0))
+    rolls = np.ones((games, max_rolls), dtype=np.int64)
+    rolls[np.arange(max_rolls) < sizes[:, None]] = np.fromiter(
+        (die_roll for sequence in sequences for die_roll in sequence), dtype=np.int64, count=int(sizes.sum()))
+
+    states = np.zeros((games, players), dtype=np.int32)
+    covered = np.zeros((games, board_size + 1), dtype=bool)
+    winners = np.full(games, -1, dtype=np.int32)
+    used = sizes.copy()
+    invalid = np.zeros(games, dtype=bool)
+    active = sizes > 0
+
+    for roll_index in range(max_rolls):
+        active &= sizes > roll_index
+        live = np.flatnonzero(active)
+        if live.size == 0:
+            break
+        player = roll_index % players
+
+        die_rolls = rolls[live, roll_index]
+        bad = (die_rolls < 1) | (die_rolls > 6)
+        if bad.any():
+            invalid[live[bad]] = True
+            active[live[bad]] = False
+            live = live[~bad]
+            die_rolls = die_rolls[~bad]
+
+        transition = states[live, player] * 6 + die_rolls - 1
+        next_position = destination[transition]
+        covered[live, landing[transition]] = True
+        covered[live, next_position] = True
+        states[live, player] = next_state[transition]
+
+        won = live[next_position == board_size]
+        winners[won] = player
+        used[won] = roll_index + 1
+        active[won] = False
+
+    coverage = (covered.sum(axis=1) / board_size).tolist()
+    positions = (states >> 1).tolist()
+    results = []
+    for game, (winner, rolls_used, failed) in enumerate(zip(winners.tolist(), used.tolist(), invalid.tolist())):
+        if failed:
+            bad_roll = next(die_roll for die_roll in sequences[game] if not 1 <= die_roll <= 6)
+            results.append({'error': f"Die roll {bad_roll} not in range [1..6]"})
+        else:
+            results.append({
+                'winner': None if winner < 0 else winner,
+                'positions': positions[game],
+                'coverage': coverage[game],
+                'rolls_used': rolls_used,
+            })
+    return results
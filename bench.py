@@ -0,0 +1,173 @@
+"""Benchmark the /slpu pipeline across board sizes and jump densities.
+
+Generates random valid boards, times each stage (parse_svg_board,
+compile_board, generate_rolls, simulate_game, rendering) and the whole
+Flask /slpu handler, and prints a JSON report with p50/p95/p99 latency,
+handler throughput and achieved coverage per configuration. Boards and
+searches are seeded, so runs with the same arguments are comparable
+between versions.
+
+    python bench.py --sizes 8x8,16x16,32x32 --densities 0,0.25 --repeat 20 --seed 1
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+
+import cache
+import geometry
+import main
+
+def random_board_svg(width, height, jump_count, rng):
+    """Return the SVG of a random valid board with ``jump_count`` jumps."""
+    board_size = width * height
+    if jump_count * 2 > board_size // 4:
+        raise ValueError(f"{jump_count} jumps exceed the 25% limit of a {width}x{height} board")
+
+    # Lines run between the top-left corners of the jump squares
+    squares = rng.sample(range(2, board_size), jump_count * 2)
+    offset = geometry.CELL_SIZE // 2
+    corners = [(x - offset, y - offset) for x, y in geometry.board_geometry(width, height).centers_of(squares)]
+    lines = []
+    for (x1, y1), (x2, y2) in zip(corners[::2], corners[1::2]):
+        lines.append(f'  <line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}" stroke="BLUE" marker-end="url(#end)" />')
+
+    return '\n'.join([
+        f'<svg viewBox="0 0 {width * 32} {height * 32}" xmlns="http://www.w3.org/2000/svg">',
+        '  <rect width="100%" height="100%" fill="#f9f9f9" />',
+        *lines,
+        '</svg>',
+    ])
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of values."""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(fraction * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+def summarize(seconds):
+    milliseconds = [value * 1000 for value in seconds]
+    return {
+        'p50_ms': percentile(milliseconds, 0.50),
+        'p95_ms': percentile(milliseconds, 0.95),
+        'p99_ms': percentile(milliseconds, 0.99),
+        'mean_ms': statistics.fmean(milliseconds),
+    }
+
+def timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+def bench_config(width, height, density, args, client):
+    """Benchmark one board size and jump density over ``args.repeat`` random boards."""
+    board_size = width * height
+    jump_count = int(board_size * density) // 2
+    stages = {name: [] for name in ('parse', 'compile', 'search', 'simulate', 'render', 'handler')}
+    coverages = []
+    wins = 0
+
+    for repeat in range(args.repeat):
+        rng = random.Random(f"{args.seed}/{width}x{height}/{density}/{repeat}")
+        svg_content = random_board_svg(width, height, jump_count, rng)
+        random.seed(rng.getrandbits(64))
+
+        board_data, elapsed = timed(main.parse_svg_board, svg_content)
+        stages['parse'].append(elapsed)
+        jumps = board_data['jumps']
+
+        board, elapsed = timed(main.compile_board, board_size, jumps)
+        stages['compile'].append(elapsed)
+
+        deadline, patience = main.search_budget(time.monotonic(), args.deadline_ms)
+        rolls, elapsed = timed(main.generate_rolls, board_size, args.players, jumps, board, args.strategy,
+                               args.engine, args.workers, deadline, patience)
+        stages['search'].append(elapsed)
+
+        (positions, squares_landed, winner, _), elapsed = timed(
+            main.simulate_game, board_size, args.players, jumps, rolls, board
+        )
+        stages['simulate'].append(elapsed)
+        coverages.append(len(squares_landed) / board_size)
+        wins += winner == args.players - 1
+
+        _, elapsed = timed(main.generate_board_svg_with_players, board_data['svg_root'], positions, width, height)
+        stages['render'].append(elapsed)
+
+        query = {'strategy': args.strategy, 'engine': args.engine, 'players': args.players}
+        if args.deadline_ms is not None:
+            query['deadline_ms'] = args.deadline_ms
+        _, elapsed = timed(client.post, '/slpu', data=svg_content, query_string=query)
+        stages['handler'].append(elapsed)
+
+    return {
+        'width': width,
+        'height': height,
+        'jumps': jump_count,
+        'stages': {name: summarize(values) for name, values in stages.items()},
+        'throughput_rps': len(stages['handler']) / sum(stages['handler']),
+        'coverage': {
+            'mean': statistics.fmean(coverages),
+            'min': min(coverages),
+            'max': max(coverages),
+        },
+        'win_rate': wins / args.repeat,
+    }
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', default='4x4,8x8,16x16,24x24,32x32',
+                        help='comma-separated WIDTHxHEIGHT board sizes')
+    parser.add_argument('--densities', default='0,0.125,0.25',
+                        help='comma-separated fractions of squares used by jumps (at most 0.25)')
+    parser.add_argument('--repeat', type=int, default=20, help='boards per configuration')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--players', type=int, default=2)
+    parser.add_argument('--strategy', choices=main.STRATEGIES, default=main.DEFAULT_STRATEGY)
+    parser.add_argument('--engine', choices=main.ENGINES, default=main.DEFAULT_ENGINE)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--deadline-ms', help='per-search latency budget')
+    parser.add_argument('--cache', action='store_true', help='keep the result cache enabled for the handler')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    return parser.parse_args(argv)
+
+def main_cli(argv=None):
+    args = parse_args(argv)
+    sizes = [tuple(map(int, size.split('x'))) for size in args.sizes.split(',')]
+    densities = [float(density) for density in args.densities.split(',')]
+    if any(not 0 <= density <= 0.25 for density in densities):
+        raise SystemExit("Densities must be between 0 and 0.25")
+
+    if not args.cache:
+        # A zero-sized cache makes every handler call run the full search
+        main.result_cache = cache.ResultCache(0)
+    client = main.app.test_client()
+
+    report = {
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'players': args.players,
+        'strategy': args.strategy,
+        'engine': args.engine,
+        'workers': args.workers,
+        'deadline_ms': args.deadline_ms,
+        'python': platform.python_version(),
+        'results': [
+            bench_config(width, height, density, args, client)
+            for width, height in sizes
+            for density in densities
+        ],
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main_cli(sys.argv[1:])
@@ -0,0 +1,189 @@
+"""Result cache for solved boards.
+
+Results are keyed on a canonical signature of the parsed board (width,
+height and sorted jumps) rather than the raw SVG, so boards that differ
+only in markup share an entry. A bounded in-memory LRU sits in front of
+an optional sqlite file that survives restarts and can be shared by
+several worker processes.
+
+SingleFlight coalesces concurrent searches for a board that is not
+cached yet, so identical requests arriving together run one search.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+def board_signature(board_width, board_height, jumps, players=2):
+    """Return a canonical signature for a parsed board and player count."""
+    ordered = sorted(tuple(map(int, jump.split(':'))) for jump in jumps)
+    canonical = f"{board_width}x{board_height}/{players}/" + ','.join(f"{start}:{end}" for start, end in ordered)
+    return hashlib.sha256(canonical.encode('ascii')).hexdigest()
+
+class LRUCache:
+    """Thread-safe bounded mapping that evicts the least recently used entry."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+class DiskCache:
+    """sqlite-backed mapping of keys to JSON values, safe to share between processes."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+
+    def _connection(self):
+        # sqlite connections must not cross threads or forked processes
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute('PRAGMA journal_mode=WAL')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key):
+        row = self._connection().execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put(self, key, value):
+        with self._connection() as connection:
+            connection.execute('INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)', (key, json.dumps(value)))
+
+class ResultCache:
+    """Two-tier cache of solved board results.
+
+    Values are dicts with at least a ``coverage`` entry; a result only
+    replaces a cached one for the same board if its coverage is lower.
+    """
+
+    def __init__(self, maxsize, path=None):
+        self.memory = LRUCache(maxsize)
+        self.disk = DiskCache(path) if path else None
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.put(key, value)
+        return value
+
+    def put(self, key, value):
+        current = self.get(key)
+        if current is not None and current['coverage'] <= value['coverage']:
+            return
+        self.memory.put(key, value)
+        if self.disk is not None:
+            self.disk.put(key, value)
+
+class _Flight:
+    __slots__ = ('done', 'value', 'ok', 'deadline')
+
+    def __init__(self, deadline):
+        self.done = threading.Event()
+        self.value = None
+        self.ok = False
+        self.deadline = deadline
+
+    def covers(self, deadline):
+        """Return whether this flight searches at least as long as a caller with ``deadline`` could."""
+        return self.deadline is None or (deadline is not None and deadline <= self.deadline)
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one.
+
+    The first caller for a key (the leader) runs the function; callers
+    arriving while it runs (followers) wait for it and share its value.
+    A leader is only followed by callers whose deadline is no later than
+    its own, so nobody gets a value searched with less time than they
+    gave; other callers lead a flight of their own.
+    If the leader raises or is cancelled, followers do not see its error
+    or partial value: they try again, one of them becoming the new
+    leader. A follower whose own deadline passes, or whose own cancel
+    event is set, stops waiting and runs the function itself.
+    """
+
+    # How often a waiting follower checks its cancel event
+    POLL_SECONDS = 0.05
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(flights) for flights in self._flights.values())
+
+    def do(self, key, func, deadline=None, cancel=None):
+        """Return (value, outcome) where outcome is 'leader', 'shared' or 'timeout'.
+
+        ``deadline`` is a time.monotonic() value and ``cancel`` a
+        threading.Event; a leader's value is only shared if its
+        ``cancel`` was not set by the time ``func`` returned.
+        """
+        while True:
+            with self._lock:
+                flights = self._flights.setdefault(key, [])
+                flight = next((flight for flight in flights if flight.covers(deadline)), None)
+                leader = flight is None
+                if leader:
+                    flight = _Flight(deadline)
+                    flights.append(flight)
+
+            if leader:
+                try:
+                    flight.value = func()
+                    flight.ok = cancel is None or not cancel.is_set()
+                    return flight.value, 'leader'
+                finally:
+                    with self._lock:
+                        flights = self._flights[key]
+                        flights.remove(flight)
+                        if not flights:
+                            del self._flights[key]
+                    flight.done.set()
+
+            if not self._wait(flight, deadline, cancel):
+                return func(), 'timeout'
+            if flight.ok:
+                return flight.value, 'shared'
+
+    def _wait(self, flight, deadline, cancel):
+        """Wait for a flight to land; False if the deadline passed or ``cancel`` was set first."""
+        while True:
+            timeout = self.POLL_SECONDS if cancel is not None else None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return flight.done.is_set()
+                timeout = remaining if timeout is None else min(timeout, remaining)
+            if flight.done.wait(timeout):
+                return True
+            if cancel is not None and cancel.is_set():
+                return False
@@ -1,19 +1,230 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import Response
-import random
+from fastapi.responses import Response, StreamingResponse
+import asyncio
+import functools
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import admission
+import cache
+import main
+import metrics
+import profiling
 
 app = FastAPI()
 
+# Parsing, search and rendering run here so the event loop keeps accepting requests
+executor = ThreadPoolExecutor(max_workers=int(os.environ.get('SLPU_THREADS', os.cpu_count() or 4)))
+
+# How often a running search checks whether its client is still connected
+DISCONNECT_POLL_SECONDS = 0.05
+
+# Largest body accepted by /slpu/batch
+MAX_BATCH_BYTES = 64 * main.MAX_SVG_BYTES
+
+async def read_body(request, limit=main.MAX_SVG_BYTES):
+    """Read the request body, rejecting it as soon as it exceeds ``limit`` bytes."""
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise main.BoardValidationError('body_too_large', f"Body exceeds {limit} bytes")
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+async def run_cancellable(request, cancel, func, *args, **kwargs):
+    """Run ``func`` in the executor, setting ``cancel`` if the client disconnects first."""
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(executor, functools.partial(func, *args, cancel=cancel, **kwargs))
+    while True:
+        done, _ = await asyncio.wait({future}, timeout=DISCONNECT_POLL_SECONDS)
+        if done:
+            return future.result()
+        if await request.is_disconnected():
+            cancel.set()
+            return await future
+
+def solve_svg_profiled(profile_requested, params, svg_content, *args, **kwargs):
+    """Run main.solve_svg_response, profiled if requested; return its (status, body, headers, result)."""
+    with profiling.profiled(profile_requested, svg_content, params) as profile:
+        status, body, headers, result = main.solve_svg_response(svg_content, *args, **kwargs)
+        if profile is not None:
+            profile.info['coverage'] = result['coverage']
+            headers[profiling.PROFILE_ID_HEADER] = profile.id
+        return status, body, headers, result
+
 @app.post("/slpu")
 async def slpu_endpoint(request: Request):
-    # The body is SVG, but we don't need to parse it for this simple case
-    # Just generate 6 random die rolls (1-6)
-    rolls = [str(random.randint(1, 6)) for _ in range(6)]
-    die_rolls = ''.join(rolls)
-    
-    # Return SVG response
-    svg_content = f'<svg xmlns="http://www.w3.org/2000/svg"><text>{die_rolls}</text></svg>'
-    return Response(content=svg_content, media_type="image/svg+xml")
+    """Run the full /slpu pipeline from main.py without blocking the event loop.
+
+    Accepts the same ``strategy``, ``engine``, ``players`` and
+    ``deadline_ms`` query parameters and ``X-Deadline-Ms`` header as the
+    Flask app, and reports coverage and load shedding, handles
+    conditional requests and compression and supports profiling the same
+    way.
+    """
+    started = time.monotonic()
+    cancel = threading.Event()
+    try:
+        svg_content = await read_body(request)
+        params = request.query_params
+        strategy = params.get('strategy', main.DEFAULT_STRATEGY)
+        engine = params.get('engine', main.DEFAULT_ENGINE)
+        players = main.parse_players(params.get('players'))
+        deadline_ms = params.get('deadline_ms') or request.headers.get('X-Deadline-Ms')
+        deadline, patience = main.search_budget(started, deadline_ms)
+
+        profile_requested = profiling.requested(request.headers.get(profiling.PROFILE_HEADER))
+        profile_params = {'strategy': strategy, 'engine': engine, 'players': players, 'deadline_ms': deadline_ms}
+        status, body, headers, _ = await run_cancellable(
+            request, cancel, solve_svg_profiled, profile_requested, profile_params, svg_content, strategy, engine,
+            main.SEARCH_WORKERS, deadline, patience, players=players,
+            if_none_match=request.headers.get('If-None-Match'),
+            accept_encoding=request.headers.get('Accept-Encoding'))
+        media_type = headers.pop('Content-Type', None)
+        return Response(content=body, status_code=status, media_type=media_type, headers=headers)
+    except admission.Overloaded:
+        return Response(content=main.EMPTY_SVG, status_code=503, media_type="image/svg+xml",
+                        headers={'Retry-After': '1'})
+    except ValueError as e:
+        # Return empty response for validation errors (will result in score 0)
+        main.record_failure(e)
+    except Exception as e:
+        # Return empty response for any other errors
+        main.record_failure(e)
+    return Response(content=main.EMPTY_SVG, media_type="image/svg+xml")
+
+def solve_batch_board(board_data, players, strategy, engine, deadline_ms, cancel=None):
+    """Solve one board of a batch, with the deadline counted from the start of its search."""
+    deadline, patience = main.search_budget(time.monotonic(), deadline_ms)
+    return main.solve_board(board_data, players, strategy, engine, main.SEARCH_WORKERS, deadline, patience, cancel)
+
+def batch_line(board_id, svg_content, coverage=None, error=None):
+    line = {'id': board_id, 'svg': svg_content}
+    if coverage is not None:
+        line['coverage'] = coverage
+    if error is not None:
+        line['error'] = error
+    return json.dumps(line) + '\n'
+
+async def stream_batch(lines, players, strategy, engine, deadline_ms):
+    """Yield one JSON line per input board, in the order the boards are solved."""
+    loop = asyncio.get_running_loop()
+    cancel = threading.Event()
+
+    # Decode and parse every board, reporting bad ones straight away
+    boards = []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+            boards.append((item.get('id', number), item['svg']))
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            yield batch_line(number, main.EMPTY_SVG, error=f"Invalid batch line: {e}")
+
+    parsed = await asyncio.gather(
+        *(loop.run_in_executor(executor, main.parse_svg_board, svg_content) for _, svg_content in boards),
+        return_exceptions=True,
+    )
+
+    # Group boards by signature so duplicates are solved once
+    groups = {}
+    for (board_id, _), board_data in zip(boards, parsed):
+        if isinstance(board_data, Exception):
+            main.record_failure(board_data)
+            yield batch_line(board_id, main.EMPTY_SVG, error=str(board_data))
+            continue
+        key = cache.board_signature(board_data['board_width'], board_data['board_height'], board_data['jumps'], players)
+        groups.setdefault(key, []).append((board_id, board_data))
+
+    # A batch runs at most as many searches at once as there are search slots,
+    # so its boards wait their turn here rather than overflowing admission
+    # control and shedding or degrading each other
+    slots = asyncio.Semaphore(max(1, main.admission_control.limit))
+
+    async def solve_group(members):
+        async with slots:
+            try:
+                result = await loop.run_in_executor(
+                    executor,
+                    functools.partial(solve_batch_board, members[0][1], players, strategy, engine, deadline_ms, cancel)
+                )
+            except Exception as e:
+                return members, None, e
+        return members, result, None
+
+    try:
+        for solved in asyncio.as_completed([solve_group(members) for members in groups.values()]):
+            members, result, error = await solved
+            for board_id, board_data in members:
+                if isinstance(error, admission.Overloaded):
+                    # Already counted as shed by admission control; not a failure
+                    yield batch_line(board_id, main.EMPTY_SVG, error=str(error))
+                    continue
+                if error is not None:
+                    main.record_failure(error)
+                    yield batch_line(board_id, main.EMPTY_SVG, error=str(error))
+                    continue
+                svg_content = main.generate_board_svg_with_players(
+                    board_data['svg_root'], result['positions'], board_data['board_width'], board_data['board_height']
+                )
+                yield batch_line(board_id, svg_content, result['coverage'])
+    finally:
+        # Stop any searches still running if the client went away
+        cancel.set()
+
+@app.post("/slpu/batch")
+async def slpu_batch_endpoint(request: Request):
+    """Solve many boards from one JSON-lines body and stream the results back.
+
+    Each input line is an object with an ``id`` and an ``svg`` board; each
+    output line has the ``id``, the rendered ``svg`` and its ``coverage``,
+    or an ``error``. Boards are solved concurrently, duplicates only once,
+    and the query parameters of /slpu apply to every board, with
+    ``deadline_ms`` counted per board. A batch holds at most as many search
+    slots at once as admission control has; boards shed when other
+    requests hold them get an ``error`` line.
+    """
+    try:
+        body = await read_body(request, MAX_BATCH_BYTES)
+    except ValueError as e:
+        return Response(content=batch_line(None, main.EMPTY_SVG, error=str(e)), media_type='application/x-ndjson')
+
+    params = request.query_params
+    strategy = params.get('strategy', main.DEFAULT_STRATEGY)
+    engine = params.get('engine', main.DEFAULT_ENGINE)
+    deadline_ms = params.get('deadline_ms') or request.headers.get('X-Deadline-Ms')
+    try:
+        players = main.parse_players(params.get('players'))
+    except ValueError as e:
+        return Response(content=batch_line(None, main.EMPTY_SVG, error=str(e)), media_type='application/x-ndjson')
+    return StreamingResponse(stream_batch(body.splitlines(), players, strategy, engine, deadline_ms),
+                             media_type='application/x-ndjson')
+
+@app.post("/verify")
+async def verify_endpoint(request: Request):
+    """Replay roll sequences on a board, like the Flask app's /verify."""
+    try:
+        payload = json.loads(await read_body(request, main.MAX_VERIFY_BYTES))
+        engine = request.query_params.get('engine', main.VERIFY_ENGINE)
+        response = await asyncio.get_running_loop().run_in_executor(executor, main.verify_request, payload, engine)
+    except ValueError as e:  # Includes invalid JSON
+        main.record_failure(e)
+        return Response(content=json.dumps({'error': str(e)}), status_code=400, media_type='application/json')
+    except Exception as e:
+        main.record_failure(e)
+        return Response(content=json.dumps({'error': 'Internal error'}), status_code=500, media_type='application/json')
+    return Response(content=json.dumps(response), media_type='application/json')
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Expose service metrics in the Prometheus text format."""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
 
 if __name__ == "__main__":
     import uvicorn
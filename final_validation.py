@@ -18,6 +18,9 @@ svg_content = '''<svg viewBox="0 0 512 512" xmlns="http://www.w3.org/2000/svg">
 # Mock the request
 mock_request = Mock()
 mock_request.data.decode.return_value = svg_content
+mock_request.args = {}
+mock_request.headers = {}
+mock_request.content_length = None
 original_request = main.request
 main.request = mock_request
 
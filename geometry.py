@@ -0,0 +1,95 @@
+"""Mapping between board squares and SVG coordinates.
+
+Squares are numbered from 1 in a boustrophedon pattern: the bottom row
+runs left to right, the next one right to left, and so on. Each square
+is a CELL_SIZE x CELL_SIZE cell of the SVG, whose y axis points down.
+
+coord_to_square and square_to_coord are the reference arithmetic;
+board_geometry builds lookup tables from them once per board size, which
+parsing and rendering use to convert many points at a time.
+"""
+import functools
+
+# Side of one square in SVG units
+CELL_SIZE = 32
+
+def coord_to_square(x, y, width, height):
+    """Convert SVG coordinates to square number (1-based)."""
+    # Squares are 32x32; any point inside a square maps to it
+    col = x // CELL_SIZE
+    # For row: SVG y=0 is top, but board row 0 is bottom
+    row = height - 1 - y // CELL_SIZE
+
+    if row % 2 == 0:
+        # Even rows: left to right
+        return row * width + col + 1
+    # Odd rows: right to left
+    return row * width + (width - 1 - col) + 1
+
+def square_to_coord(square, width, height):
+    """Convert square number (1-based) to SVG coordinates (center of square)."""
+    square -= 1  # 0-based
+    row = square // width
+    col = square % width
+
+    # Adjust for boustrophedon
+    if row % 2 == 1:
+        # Odd rows: right to left
+        col = width - 1 - col
+
+    # SVG coordinates: x from left, y from top
+    x = col * CELL_SIZE + CELL_SIZE // 2
+    y = height * CELL_SIZE - (row * CELL_SIZE + CELL_SIZE // 2)
+    return x, y
+
+class BoardGeometry:
+    """Lookup tables for one board size.
+
+    ``centers[square]`` is the SVG center of a square (index 0 unused) and
+    ``cell_squares[row * width + col]`` the square in the cell at that
+    column and row, counted from the top-left of the SVG.
+    """
+
+    __slots__ = ('width', 'height', 'centers', 'cell_squares')
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.centers = (None,) + tuple(square_to_coord(square, width, height) for square in range(1, width * height + 1))
+        self.cell_squares = tuple(
+            coord_to_square(col * CELL_SIZE, row * CELL_SIZE, width, height)
+            for row in range(height)
+            for col in range(width)
+        )
+
+    def square_at(self, x, y):
+        """Return the square containing SVG point (x, y), like coord_to_square."""
+        col = x // CELL_SIZE
+        row = y // CELL_SIZE
+        if 0 <= col < self.width and 0 <= row < self.height:
+            return self.cell_squares[row * self.width + col]
+        # Points outside the board keep the arithmetic result, which validation rejects
+        return coord_to_square(x, y, self.width, self.height)
+
+    def squares_at(self, points):
+        """Return the squares containing each (x, y) point."""
+        return [self.square_at(x, y) for x, y in points]
+
+    def centers_of(self, squares):
+        """Return the SVG center of each square."""
+        centers = self.centers
+        return [centers[square] for square in squares]
+
+# Room for every board size parse_svg_board accepts (4-32 wide, 4-32 high, even)
+@functools.lru_cache(maxsize=512)
+def board_geometry(width, height):
+    """Return the BoardGeometry for a board size, built once and shared across requests."""
+    return BoardGeometry(width, height)
+
+def parse_coordinate(value):
+    """Convert an SVG coordinate attribute to an integer, truncating fractions."""
+    try:
+        return int(value)
+    except ValueError:
+        # Fractional or exponent forms such as "16.0" or "1e2"
+        return int(float(value))
@@ -0,0 +1,225 @@
+"""Distance-to-goal tables that steer the roll search.
+
+For every packed state of a compiled board (``square * 2 + die_mode``,
+as in CompiledBoard.next_state) two tables are computed once and kept on
+the board:
+
+- ``rolls_to_finish``: the fewest own rolls that reach the final square,
+  found by a breadth-first search backwards from it;
+- ``expected_rolls``: the expected number of own rolls to finish with
+  random rolls, from the absorbing Markov chain of the board.
+
+guided_rolls uses them to play games where the last player heads for
+the finish and the other players avoid it, all preferring squares that
+are already covered.
+"""
+import collections
+import random
+
+import search_stats
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is an optional dependency
+    np = None
+
+# Distance used for states that can never reach the final square
+UNREACHABLE = 1 << 30
+
+# Expected finish times are iterated until no state changes by more than this
+EXPECTED_TOLERANCE = 0.01
+EXPECTED_MAX_SWEEPS = 5000
+
+# Worst build time per state seen for board_tables, with and without NumPy
+# (32x32 boards with 25% jumps), used to decide if the tables fit a deadline
+TABLE_SECONDS_PER_STATE = 6e-5
+TABLE_SECONDS_PER_STATE_PYTHON = 3e-4
+
+# Share of guided moves that pick a random roll instead of the best one
+GUIDE_EXPLORATION = 0.1
+
+class DistanceTables:
+    """Per-state distance tables of one compiled board."""
+
+    __slots__ = ('rolls_to_finish', 'expected_rolls')
+
+    def __init__(self, rolls_to_finish, expected_rolls):
+        self.rolls_to_finish = rolls_to_finish
+        self.expected_rolls = expected_rolls
+
+def rolls_to_finish(board):
+    """Return the fewest rolls to the final square from each state (UNREACHABLE if none)."""
+    board_size = board.board_size
+    next_state = board.next_state
+    states = (board_size + 1) * 2
+
+    # Reverse edges, leaving out moves from the final square where the game is over
+    predecessors = [[] for _ in range(states)]
+    for state in range(board_size * 2):
+        for transition in range(state * 6, state * 6 + 6):
+            predecessors[next_state[transition]].append(state)
+
+    distance = [UNREACHABLE] * states
+    queue = collections.deque((board_size * 2, board_size * 2 + 1))
+    for state in queue:
+        distance[state] = 0
+    while queue:
+        state = queue.popleft()
+        for previous in predecessors[state]:
+            if distance[previous] == UNREACHABLE:
+                distance[previous] = distance[state] + 1
+                queue.append(previous)
+    return distance
+
+def expected_rolls(board, distance):
+    """Return the expected number of random rolls to the final square from each state.
+
+    Solves E[s] = 1 + mean(E[next]) over the six rolls, with E = 0 on the
+    final square, by repeated sweeps until EXPECTED_TOLERANCE. States that
+    cannot reach the final square, or may fall into one that cannot, are
+    infinite.
+    """
+    board_size = board.board_size
+    live = board_size * 2  # States before the final square
+    unreachable = [d == UNREACHABLE for d in distance]
+
+    if np is not None:
+        # Jacobi sweeps over the whole table at once
+        successors = np.asarray(board.next_state[:live * 6], dtype=np.int64).reshape(live, 6)
+        values = np.where(np.asarray(unreachable), np.inf, 0.0)
+        for _ in range(EXPECTED_MAX_SWEEPS):
+            updated = 1 + values[successors].mean(axis=1)
+            finite = np.isfinite(updated)
+            change = np.abs(updated[finite] - values[:live][finite]).max(initial=0.0)
+            values[:live] = updated
+            if change < EXPECTED_TOLERANCE:
+                break
+        return values.tolist()
+
+    # Gauss-Seidel sweeps, from the final square backwards
+    next_state = board.next_state
+    values = [float('inf') if blocked else 0.0 for blocked in unreachable]
+    order = range(live - 1, -1, -1)
+    for _ in range(EXPECTED_MAX_SWEEPS):
+        change = 0.0
+        for state in order:
+            base = state * 6
+            value = 1 + sum(values[next_state[transition]] for transition in range(base, base + 6)) / 6
+            difference = abs(value - values[state])
+            if difference > change:  # False for inf - inf, which stays inf
+                change = difference
+            values[state] = value
+        if change < EXPECTED_TOLERANCE:
+            break
+    return values
+
+def table_seconds(board):
+    """Return an upper estimate of how long board_tables takes on a board without tables."""
+    per_state = TABLE_SECONDS_PER_STATE if np is not None else TABLE_SECONDS_PER_STATE_PYTHON
+    return (board.board_size + 1) * 2 * per_state
+
+def board_tables(board):
+    """Return the DistanceTables of a compiled board, computing them on first use."""
+    if board.tables is None:
+        distance = rolls_to_finish(board)
+        board.tables = DistanceTables(distance, expected_rolls(board, distance))
+    return board.tables
+
+def guided_rolls(board, players, attempts, max_rolls, target_coverage, rng=None, deadline=None, patience=None,
+                 cancel=None, stats=None):
+    """Search games whose rolls are steered by the board's distance tables.
+
+    On each turn the roll is chosen by the squares it would newly cover
+    and, for the last player, the expected rolls still needed to finish,
+    weighted by a factor drawn per attempt; other players never take a
+    winning roll. A share of moves (GUIDE_EXPLORATION) is random instead.
+    Attempts are abandoned as soon as they cover as many squares as the
+    best win or the last player can no longer finish within ``max_rolls``.
+
+    Stops and counts like main.monte_carlo_rolls and returns the best roll
+    list, or [] if no attempt was won by the last player.
+    """
+    rng = rng or random
+    uniform = rng.random
+    board_size = board.board_size
+    landing = board.landing
+    destination = board.destination
+    next_state = board.next_state
+    tables = board_tables(board)
+    to_finish = tables.rolls_to_finish
+    expected = tables.expected_rolls
+    target_winner = players - 1
+
+    best_rolls = []
+    best_count = None
+    best_attempt = 0
+    played = wins = 0
+    stop = None
+
+    for attempt in range(attempts):
+        played += 1
+        rolls = []
+        states = [0] * players
+        covered = bytearray(board_size + 1)
+        count = 0
+        player = 0
+        # How many new squares one roll of progress is worth in this attempt
+        weight = players * (0.5 + 1.5 * uniform())
+
+        while len(rolls) < max_rolls:
+            state = states[player]
+            base = state * 6
+            last = player == target_winner
+            if last and to_finish[state] > (max_rolls - len(rolls) + players - 1) // players:
+                break  # The last player cannot finish in the rolls left
+
+            choice = None
+            if uniform() < GUIDE_EXPLORATION:
+                choice = int(uniform() * 6) + 1
+                if not last and destination[base + choice - 1] == board_size:
+                    choice = None
+            if choice is None:
+                best_score = None
+                for die_roll in range(1, 7):
+                    transition = base + die_roll - 1
+                    next_position = destination[transition]
+                    if not last and next_position == board_size:
+                        continue
+                    square = landing[transition]
+                    fresh = (not covered[next_position]) + (square != next_position and not covered[square])
+                    score = fresh + uniform() * 0.5
+                    if last:
+                        score += weight * expected[next_state[transition]]
+                    if best_score is None or score < best_score:
+                        best_score = score
+                        choice = die_roll
+
+            transition = base + choice - 1
+            next_position = destination[transition]
+            for square in (landing[transition], next_position):
+                if not covered[square]:
+                    covered[square] = 1
+                    count += 1
+            states[player] = next_state[transition]
+            rolls.append(choice)
+
+            if next_position == board_size:
+                if last:
+                    wins += 1
+                    if best_count is None or count < best_count:
+                        best_count = count
+                        best_rolls = rolls
+                        best_attempt = attempt
+                break
+            if best_count is not None and count >= best_count:
+                break  # Cannot beat the best win any more
+            player = (player + 1) % players
+
+        best_coverage = None if best_count is None else best_count / board_size
+        stop = search_stats.stop_reason(best_coverage, target_coverage, deadline, patience, attempt - best_attempt,
+                                        cancel)
+        if stop is not None:
+            break
+
+    search_stats.add_search_stats(stats, played, wins, stop)
+    return best_rolls
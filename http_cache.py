@@ -0,0 +1,128 @@
+"""HTTP validators and compression for rendered /slpu responses.
+
+A rendered board depends only on the request's SVG markup and the
+result it was solved with, so a strong ETag is computed from those
+before rendering: a request whose If-None-Match names it gets a 304
+without the board being rendered or sent. Responses of at least
+COMPRESS_MIN_BYTES are compressed with brotli (when the optional
+``brotli`` package is installed) or gzip, as the client's
+Accept-Encoding allows. Each encoding of a response has its own ETag,
+suffixed with the encoding, and any of them validates the others.
+
+RenderedResponse keeps a response's bytes together with the encodings
+already computed, so a cached response is compressed once rather than
+on every hit.
+"""
+import gzip
+import hashlib
+import json
+import threading
+
+try:
+    import brotli
+except ImportError:  # brotli is an optional dependency
+    brotli = None
+
+# Smaller bodies are sent uncompressed; the saving would not pay for the work
+COMPRESS_MIN_BYTES = 1024
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+def available_encodings():
+    """Return the content codings that can be produced, most preferred first."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    # mtime=0 keeps the bytes, and so the ETag, stable
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+def choose_encoding(accept_encoding, size):
+    """Return the content coding to send a ``size``-byte body in, or None for identity."""
+    if not accept_encoding or size < COMPRESS_MIN_BYTES:
+        return None
+    weights = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.partition(';')
+        weight = 1.0
+        name, _, value = params.strip().partition('=')
+        if name.strip().lower() == 'q':
+            try:
+                weight = float(value)
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+
+    best = None
+    best_weight = 0.0
+    for encoding in available_encodings():
+        weight = weights.get(encoding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best = encoding
+            best_weight = weight
+    return best
+
+def etag(svg_content, key, result):
+    """Return the strong entity tag (without quotes) of a response rendered from ``result``."""
+    if isinstance(svg_content, str):
+        svg_content = svg_content.encode('utf-8')
+    digest = hashlib.sha256(svg_content)
+    digest.update(key.encode('utf-8'))
+    digest.update(json.dumps([result['rolls'], result['positions'], result['winner'], result['coverage']],
+                             separators=(',', ':')).encode('utf-8'))
+    return digest.hexdigest()[:32]
+
+def etag_header(tag, encoding=None):
+    """Return the ETag header value for one encoding of a response."""
+    return f'"{tag}-{encoding}"' if encoding else f'"{tag}"'
+
+def _matches(if_none_match, tag):
+    """Yield the encoding (None for identity or '*') of each If-None-Match entry naming ``tag``."""
+    if not if_none_match:
+        return
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            yield None
+            continue
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]  # Weak comparison, as If-None-Match uses
+        candidate = candidate.strip('"')
+        if candidate == tag:
+            yield None
+        else:
+            prefix, _, encoding = candidate.rpartition('-')
+            if prefix == tag and encoding in ('gzip', 'br'):
+                yield encoding
+
+def etag_matches(if_none_match, tag):
+    """Return whether an If-None-Match header value names any encoding of ``tag``."""
+    return next(_matches(if_none_match, tag), False) is not False
+
+def matched_encoding(if_none_match, tag):
+    """Return the encoding of the first If-None-Match entry naming ``tag``, None for identity."""
+    return next(_matches(if_none_match, tag), None)
+
+class RenderedResponse:
+    """A rendered response body and the compressed encodings of it made so far."""
+
+    __slots__ = ('body', 'encoded', '_lock')
+
+    def __init__(self, body):
+        self.body = body.encode('utf-8') if isinstance(body, str) else body
+        self.encoded = {}
+        self._lock = threading.Lock()
+
+    def encode(self, encoding):
+        """Return the body in ``encoding`` (None for identity), compressing it on first use."""
+        if encoding is None:
+            return self.body
+        data = self.encoded.get(encoding)
+        if data is None:
+            with self._lock:
+                data = self.encoded.get(encoding)
+                if data is None:
+                    data = self.encoded[encoding] = compress(self.body, encoding)
+        return data
@@ -0,0 +1,287 @@
+"""Load-test a running /slpu server with recorded or synthesized boards.
+
+Boards come from .svg files, from JSON-lines files with an ``svg`` field
+per line (the /slpu/batch input format, optionally with a ``query``
+object of per-request parameters), or are generated like bench.py does.
+Requests are sent either at fixed rates (open loop, a new request every
+1/rate seconds whatever the server does) or with a fixed number of
+clients each sending back to back (closed loop). Several rates or
+concurrencies can be given to step the load up and find where the server
+saturates. The JSON report gives, per step, throughput, latency
+percentiles, status, error and empty-response counts and the coverage
+reported in the X-Coverage header.
+
+    python loadtest.py --server flask --server-workers 4 --rate 5,10,20 --duration 20
+    python loadtest.py --url http://127.0.0.1:8000/slpu --concurrency 1,4,16 --boards test_board.svg
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+import bench
+import main
+
+# How long to wait for a server started with --server to accept connections
+SERVER_START_SECONDS = 60
+
+def load_boards(paths):
+    """Return (svg, query) pairs from .svg and JSON-lines files."""
+    boards = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            content = f.read()
+        if not path.endswith(('.jsonl', '.ndjson')):
+            boards.append((content, {}))
+            continue
+        for line in content.splitlines():
+            if line.strip():
+                item = json.loads(line)
+                boards.append((item['svg'].encode('utf-8'), item.get('query', {})))
+    return boards
+
+def synthesize_boards(sizes, density, count, seed):
+    """Return ``count`` random boards per size, as bench.py generates them."""
+    rng = random.Random(seed)
+    boards = []
+    for width, height in sizes:
+        jump_count = int(width * height * density) // 2
+        for _ in range(count):
+            boards.append((bench.random_board_svg(width, height, jump_count, rng).encode('utf-8'), {}))
+    return boards
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def start_server(kind, workers):
+    """Start a local server of ``kind`` ('flask' via serve.py or 'fastapi' via uvicorn); return (process, url)."""
+    port = free_port()
+    if kind == 'flask':
+        command = [sys.executable, 'serve.py', '--host', '127.0.0.1', '--port', str(port), '--workers', str(workers)]
+    else:
+        command = [sys.executable, '-m', 'uvicorn', 'fastapi_app:app', '--host', '127.0.0.1', '--port', str(port),
+                   '--workers', str(workers), '--log-level', 'warning']
+    process = subprocess.Popen(command, cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    deadline = time.monotonic() + SERVER_START_SECONDS
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{kind} server exited with {process.returncode}")
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return process, f'http://127.0.0.1:{port}/slpu'
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"{kind} server did not start within {SERVER_START_SECONDS}s")
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+class Target:
+    """The /slpu URL and query parameters shared by every request."""
+
+    def __init__(self, url, query, timeout):
+        parsed = urllib.parse.urlsplit(url)
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.path = parsed.path or '/slpu'
+        self.query = query
+        self.timeout = timeout
+
+    def send(self, svg_content, query):
+        """POST one board and return a result dict with status, latency, coverage or error."""
+        params = dict(self.query, **query)
+        path = self.path + ('?' + urllib.parse.urlencode(params) if params else '')
+        started = time.perf_counter()
+        try:
+            connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                connection.request('POST', path, svg_content, {'Content-Type': 'image/svg+xml'})
+                response = connection.getresponse()
+                body = response.read()
+            finally:
+                connection.close()
+        except (OSError, http.client.HTTPException) as e:
+            return {'latency': time.perf_counter() - started, 'error': type(e).__name__}
+        result = {'latency': time.perf_counter() - started, 'status': response.status}
+        coverage = response.getheader('X-Coverage')
+        if coverage is not None:
+            result['coverage'] = float(coverage)
+        result['empty'] = response.status == 200 and body.decode('utf-8', 'replace') == main.EMPTY_SVG
+        return result
+
+def run_rate(target, boards, rate, duration, max_concurrency):
+    """Send requests at ``rate`` per second for ``duration`` seconds; return (results, elapsed, lag)."""
+    total = max(1, int(rate * duration))
+    results = []
+    lags = []
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        futures = []
+        started = time.perf_counter()
+        for index, (svg_content, query) in zip(range(total), itertools.cycle(boards)):
+            scheduled = started + index / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            lags.append(max(0.0, -delay))
+            futures.append(pool.submit(target.send, svg_content, query))
+        results = [future.result() for future in futures]
+    return results, time.perf_counter() - started, lags
+
+def run_concurrency(target, boards, concurrency, duration):
+    """Keep ``concurrency`` clients sending back to back for ``duration`` seconds; return (results, elapsed)."""
+    results = []
+    lock = threading.Lock()
+    sequence = itertools.cycle(boards)
+    stop = time.perf_counter() + duration
+
+    def client():
+        while time.perf_counter() < stop:
+            with lock:
+                svg_content, query = next(sequence)
+            result = target.send(svg_content, query)
+            with lock:
+                results.append(result)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - started
+
+def report_step(results, elapsed, target_coverage=None):
+    """Summarize one load step.
+
+    Requests that failed or got any status but 200 count as errors. With
+    a ``target_coverage``, the share of solved boards at or below it is
+    reported as ``at_target``.
+    """
+    statuses = {}
+    for result in results:
+        key = str(result.get('status', 'error'))
+        statuses[key] = statuses.get(key, 0) + 1
+    errors = sum(result.get('status') != 200 for result in results)
+    empty = sum(result.get('empty', False) for result in results)
+    ok = [result for result in results if result.get('status') == 200 and not result['empty']]
+    coverages = [result['coverage'] for result in ok if 'coverage' in result]
+
+    step = {
+        'requests': len(results),
+        'elapsed_s': elapsed,
+        'throughput_rps': len(ok) / elapsed if elapsed else 0.0,
+        'latency': None,
+        'statuses': statuses,
+        'error_rate': errors / len(results) if results else 0.0,
+        'empty_rate': empty / len(results) if results else 0.0,
+    }
+    if results:
+        step['latency'] = bench.summarize([result['latency'] for result in results])
+        step['latency']['max_ms'] = max(result['latency'] for result in results) * 1000
+    if coverages:
+        step['coverage'] = {
+            'mean': statistics.fmean(coverages),
+            'min': min(coverages),
+            'p50': bench.percentile(coverages, 0.50),
+            'p95': bench.percentile(coverages, 0.95),
+            'max': max(coverages),
+        }
+        if target_coverage is not None:
+            step['coverage']['at_target'] = sum(coverage <= target_coverage for coverage in coverages) / len(coverages)
+    return step
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--url', default='http://127.0.0.1:5000/slpu', help='/slpu URL of a running server')
+    target.add_argument('--server', choices=('flask', 'fastapi'), help='start a local server for the test')
+    parser.add_argument('--server-workers', type=int, default=os.cpu_count() or 2)
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument('--rate', help='comma-separated request rates per second (open loop)')
+    load.add_argument('--concurrency', default='1', help='comma-separated client counts (closed loop)')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per load step')
+    parser.add_argument('--max-concurrency', type=int, default=256, help='open-loop requests in flight at most')
+    parser.add_argument('--boards', nargs='*', default=[], help='.svg or JSON-lines files to replay')
+    parser.add_argument('--sizes', default='8x8,16x16,32x32', help='sizes of synthesized boards')
+    parser.add_argument('--density', type=float, default=0.125, help='jump density of synthesized boards')
+    parser.add_argument('--count', type=int, default=20, help='synthesized boards per size')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--strategy', choices=main.STRATEGIES)
+    parser.add_argument('--engine', choices=main.ENGINES)
+    parser.add_argument('--players', type=int)
+    parser.add_argument('--deadline-ms')
+    parser.add_argument('--target-coverage', type=float, help='also report the share of boards solved at or below it')
+    parser.add_argument('--timeout', type=float, default=60, help='per-request timeout in seconds')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    return parser.parse_args(argv)
+
+def main_cli(argv=None):
+    args = parse_args(argv)
+    if args.boards:
+        boards = load_boards(args.boards)
+    else:
+        sizes = [tuple(map(int, size.split('x'))) for size in args.sizes.split(',')]
+        boards = synthesize_boards(sizes, args.density, args.count, args.seed)
+    random.Random(args.seed).shuffle(boards)
+
+    query = {name: value for name, value in (('strategy', args.strategy), ('engine', args.engine),
+                                             ('players', args.players), ('deadline_ms', args.deadline_ms))
+             if value is not None}
+
+    process = None
+    url = args.url
+    if args.server:
+        process, url = start_server(args.server, args.server_workers)
+    try:
+        target = Target(url, query, args.timeout)
+        steps = []
+        if args.rate:
+            for rate in map(float, args.rate.split(',')):
+                results, elapsed, lags = run_rate(target, boards, rate, args.duration, args.max_concurrency)
+                step = dict(report_step(results, elapsed, args.target_coverage), rate=rate)
+                # Dispatch falling behind schedule means the client itself is saturated
+                step['dispatch_lag_p95_ms'] = bench.percentile(lags, 0.95) * 1000
+                steps.append(step)
+        else:
+            for concurrency in map(int, args.concurrency.split(',')):
+                results, elapsed = run_concurrency(target, boards, concurrency, args.duration)
+                steps.append(dict(report_step(results, elapsed, args.target_coverage), concurrency=concurrency))
+    finally:
+        if process is not None:
+            stop_server(process)
+
+    report = {
+        'url': url,
+        'server': args.server,
+        'boards': len(boards),
+        'query': query,
+        'duration_s': args.duration,
+        'steps': steps,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main_cli(sys.argv[1:])
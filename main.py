@@ -1,53 +1,86 @@
 from flask import Flask, request, jsonify
+import heapq
+import math
+import os
 import random
+import time
+from xml.etree import ElementTree as ET
+
+import admission
+import batch_engine
+import cache
+import geometry
+import heuristics
+import http_cache
+import metrics
+import profiling
+import search_stats
 
 app = Flask(__name__)
 
+class BoardValidationError(ValueError):
+    """Board rejected by validation; ``reason`` is a short label used for metrics."""
+
+    def __init__(self, reason, message):
+        super().__init__(message)
+        self.reason = reason
+
+# Limits on incoming boards, checked while parsing so oversized bodies are rejected early
+MAX_SVG_BYTES = 1 << 20
+MAX_SVG_ELEMENTS = 10000
+SVG_CHUNK_SIZE = 1 << 16
+SVG_NAMESPACE = '{http://www.w3.org/2000/svg}'
+
 def parse_svg_board(svg_content):
-    """Parse SVG content to extract board size and jumps."""
-    import re
-    from xml.etree import ElementTree as ET
-    
-    # Parse SVG
-    root = ET.fromstring(svg_content)
-    viewBox = root.get('viewBox')
-    if viewBox:
-        _, _, width, height = map(int, viewBox.split())
-        # Each square is 32 units, so board dimensions are width/32 x height/32
-        board_width = width // 32
-        board_height = height // 32
-        
-        # Validate constraints
-        if not (4 <= board_width <= 32):
-            raise ValueError(f"Board width {board_width} not in range [4..32]")
-        if not (4 <= board_height <= 32):
-            raise ValueError(f"Board height {board_height} not in range [4..32]")
-        if board_height % 2 != 0:
-            raise ValueError(f"Board height {board_height} must be even")
-            
-        board_size = board_width * board_height
-    else:
-        # Default fallback
-        board_size = 256
-    
+    """Parse SVG content to extract board size and jumps.
+
+    The SVG is read in one streaming pass: the board size is validated as
+    soon as the root element's viewBox is seen and each jump as soon as
+    its <line> is seen, so malformed or oversized boards are rejected
+    before the rest of the body is parsed.
+    """
+    if isinstance(svg_content, str):
+        svg_content = svg_content.encode('utf-8')
+    if len(svg_content) > MAX_SVG_BYTES:
+        raise BoardValidationError('body_too_large', f"SVG body of {len(svg_content)} bytes exceeds {MAX_SVG_BYTES}")
+
+    parser = ET.XMLPullParser(events=('start',))
+    root = None
+    board_size = board_width = board_height = None
+    validator = None
     jumps = []
-    
-    # Find all line elements (jumps)
-    for line in root.findall('.//{http://www.w3.org/2000/svg}line'):
-        x1 = int(float(line.get('x1')))
-        y1 = int(float(line.get('y1')))
-        x2 = int(float(line.get('x2')))
-        y2 = int(float(line.get('y2')))
-        
-        # Convert coordinates to square numbers
-        start_square = coord_to_square(x1, y1, board_width, board_height)
-        end_square = coord_to_square(x2, y2, board_width, board_height)
-        
-        jumps.append(f"{start_square}:{end_square}")
-    
-    # Validate jump constraints
-    validate_jumps(jumps, board_size, board_width, board_height)
-    
+    elements = 0
+
+    try:
+        for offset in range(0, len(svg_content), SVG_CHUNK_SIZE):
+            parser.feed(svg_content[offset:offset + SVG_CHUNK_SIZE])
+            for _, element in parser.read_events():
+                elements += 1
+                if elements > MAX_SVG_ELEMENTS:
+                    raise BoardValidationError('too_many_elements', f"SVG has more than {MAX_SVG_ELEMENTS} elements")
+
+                if root is None:
+                    root = element
+                    board_width, board_height = _board_dimensions(root.get('viewBox'))
+                    board_size = board_width * board_height
+                    validator = JumpValidator(board_size)
+                    geom = geometry.board_geometry(board_width, board_height)
+                elif element.tag == SVG_NAMESPACE + 'line':
+                    # Convert coordinates to square numbers
+                    x1, y1, x2, y2 = (_svg_coordinate(element, name) for name in ('x1', 'y1', 'x2', 'y2'))
+                    start_square = geom.square_at(x1, y1)
+                    end_square = geom.square_at(x2, y2)
+
+                    jump = f"{start_square}:{end_square}"
+                    validator.add(jump)
+                    jumps.append(jump)
+        parser.close()
+    except ET.ParseError as e:
+        raise BoardValidationError('malformed_svg', f"Malformed SVG: {e}") from None
+
+    if root is None:
+        raise BoardValidationError('malformed_svg', "SVG has no root element")
+
     return {
         'board_size': board_size,
         'jumps': jumps,
@@ -56,144 +89,150 @@ def parse_svg_board(svg_content):
         'svg_root': root
     }
 
-def coord_to_square(x, y, width, height):
-    """Convert SVG coordinates to square number (1-based)."""
-    # Squares are 32x32, coordinates are from top-left of square
-    col = x // 32
-    # For row: SVG y=0 is top, but board row 0 is bottom
-    # Total SVG height is height * 32
-    total_height = height * 32
-    row = (total_height - 32 - y) // 32
-    
-    # Boustrophedon pattern: 
-    # Row 0 (bottom): left to right
-    # Row 1: right to left
-    # Row 2: left to right
-    # Row 3 (top): right to left
-    if row % 2 == 0:
-        # Even rows: left to right
-        square = row * width + col + 1
-    else:
-        # Odd rows: right to left
-        square = row * width + (width - 1 - col) + 1
-    
-    return square
-
-def square_to_coord(square, width, height):
-    """Convert square number (1-based) to SVG coordinates (center of square)."""
-    square -= 1  # 0-based
-    row = square // width
-    col = square % width
-    
-    # Adjust for boustrophedon
-    if row % 2 == 1:
-        # Odd rows: right to left
-        col = width - 1 - col
-    
-    # SVG coordinates: x from left, y from top
-    total_height = height * 32
-    x = col * 32 + 16  # center
-    y = total_height - (row * 32 + 16)  # center, flipped
-    
-    return x, y
+def _board_dimensions(viewBox):
+    """Return the validated (width, height) in squares for an SVG viewBox."""
+    if not viewBox:
+        # Default fallback
+        return 16, 16
+
+    try:
+        _, _, width, height = map(int, viewBox.split())
+    except ValueError:
+        raise BoardValidationError('bad_viewbox', f"Invalid viewBox {viewBox!r}") from None
+    # Each square is 32 units, so board dimensions are width/32 x height/32
+    board_width = width // 32
+    board_height = height // 32
+
+    # Validate constraints
+    if not (4 <= board_width <= 32):
+        raise BoardValidationError('board_width', f"Board width {board_width} not in range [4..32]")
+    if not (4 <= board_height <= 32):
+        raise BoardValidationError('board_height', f"Board height {board_height} not in range [4..32]")
+    if board_height % 2 != 0:
+        raise BoardValidationError('board_height', f"Board height {board_height} must be even")
+    return board_width, board_height
+
+def _svg_coordinate(element, name):
+    value = element.get(name)
+    if value is None:
+        raise BoardValidationError('bad_coordinate', f"<line> is missing {name}")
+    try:
+        return geometry.parse_coordinate(value)
+    except (ValueError, OverflowError):
+        raise BoardValidationError('bad_coordinate', f"<line> has invalid {name} {value!r}") from None
+
+# Coordinate mapping lives in geometry.py; these names are kept for callers of main
+coord_to_square = geometry.coord_to_square
+square_to_coord = geometry.square_to_coord
+
+def square_centers(width, height):
+    """Return a tuple mapping each square (1-based, index 0 unused) to its SVG center."""
+    return geometry.board_geometry(width, height).centers
+
+# Player marker colors, cycled for more players
+PLAYER_COLORS = ['red', 'blue', 'green', 'yellow', 'orange', 'purple', 'cyan', 'magenta']
+
+class BoardTemplate:
+    """Board SVG serialized once and split around its closing tag.
+
+    Player markers are rendered by string assembly between the prefix and
+    suffix, giving the same output as appending <circle> elements to the
+    tree and serializing it again.
+    """
+
+    __slots__ = ('bare', 'prefix', 'suffix')
+
+    def __init__(self, svg_root):
+        svg_string = ET.tostring(svg_root, encoding='unicode', method='xml')
+        # Remove XML declaration if present
+        if svg_string.startswith('<?xml'):
+            svg_string = svg_string.split('?>', 1)[1].strip()
+        self.bare = svg_string
+
+        if svg_string.endswith(' />'):
+            # Empty root element, serialized as self-closing
+            tag = svg_string[1:].split(None, 1)[0].rstrip('/>')
+            self.prefix = svg_string[:-3] + '>'
+            self.suffix = f'</{tag}>'
+        else:
+            split = svg_string.rindex('</')
+            self.prefix = svg_string[:split]
+            self.suffix = svg_string[split:]
+
+    def render(self, positions, board_width, board_height):
+        """Return the board SVG with a marker for each player on the board."""
+        centers = square_centers(board_width, board_height)
+        parts = [self.prefix]
+        for i, pos in enumerate(positions):
+            if pos > 0:  # Only show if on board
+                x, y = centers[pos]
+                color = PLAYER_COLORS[i % len(PLAYER_COLORS)]
+                parts.append(f'<circle cx="{x}" cy="{y}" r="12" fill="{color}" stroke="black" stroke-width="2" />')
+        if len(parts) == 1:
+            return self.bare
+        parts.append(self.suffix)
+        return ''.join(parts)
 
 def generate_board_svg_with_players(svg_root, positions, board_width, board_height):
-    """Generate SVG with the board and player positions."""
-    from xml.etree import ElementTree as ET
-    
-    # Create a copy of the root
-    root = ET.fromstring(ET.tostring(svg_root))
-    
-    # Add player circles
-    colors = ['red', 'blue', 'green', 'yellow']  # For up to 4 players
-    for i, pos in enumerate(positions):
-        if pos > 0:  # Only show if on board
-            x, y = square_to_coord(pos, board_width, board_height)
-            circle = ET.Element('circle')
-            circle.set('cx', str(x))
-            circle.set('cy', str(y))
-            circle.set('r', '12')
-            circle.set('fill', colors[i % len(colors)])
-            circle.set('stroke', 'black')
-            circle.set('stroke-width', '2')
-            root.append(circle)
-    
-    # Convert back to string without XML declaration
-    svg_string = ET.tostring(root, encoding='unicode', method='xml')
-    # Remove XML declaration if present
-    if svg_string.startswith('<?xml'):
-        svg_string = svg_string.split('?>', 1)[1].strip()
-    return svg_string
+    """Generate SVG with the board and player positions.
 
-def validate_jumps(jumps, board_size, width, height):
-    
-    for jump in jumps:
+    ``svg_root`` is the parsed board root, or a BoardTemplate to reuse one
+    already serialized.
+    """
+    template = svg_root if isinstance(svg_root, BoardTemplate) else BoardTemplate(svg_root)
+    return template.render(positions, board_width, board_height)
+
+class JumpValidator:
+    """Check jumps one at a time against the board's jump constraints."""
+
+    def __init__(self, board_size):
+        self.board_size = board_size
+        self.jump_squares = set()
+        self.start_squares = set()
+        self.end_squares = set()
+
+    def add(self, jump):
         start, end = map(int, jump.split(':'))
-        
+
+        # Check squares are on the board
+        if not (1 <= start <= self.board_size and 1 <= end <= self.board_size):
+            raise BoardValidationError('jump_off_board', f"Jump {jump} is outside the board")
+
         # Check first and last squares
-        if start == 1 or start == board_size or end == 1 or end == board_size:
-            raise ValueError(f"Jump {jump} involves first or last square")
-        
+        if start == 1 or start == self.board_size or end == 1 or end == self.board_size:
+            raise BoardValidationError('jump_first_last', f"Jump {jump} involves first or last square")
+
         # Check for conflicts
-        if start in jump_squares or end in jump_squares:
-            raise ValueError(f"Jump {jump} conflicts with existing jumps")
-        
-        jump_squares.add(start)
-        jump_squares.add(end)
-        start_squares.add(start)
-        end_squares.add(end)
-    
-    # Check last 64 squares don't have only snake starts
-    last_64_start = max(1, board_size - 63)
-    for square in range(last_64_start, board_size + 1):
-        if square in start_squares and square not in end_squares:
-            # This is a snake start in the last 64 squares
-            # Check if there's a corresponding ladder end
-            pass  # For now, we'll allow this as the constraint might be interpreted differently
-    
-    # Check jump coverage doesn't exceed 25% of board
-    if len(jump_squares) > board_size // 4:
-        raise ValueError(f"Too many jumps: {len(jump_squares)} > {board_size // 4}")
-    
-    return True
+        if start in self.jump_squares or end in self.jump_squares:
+            raise BoardValidationError('jump_conflict', f"Jump {jump} conflicts with existing jumps")
+
+        self.jump_squares.add(start)
+        self.jump_squares.add(end)
+        self.start_squares.add(start)
+        self.end_squares.add(end)
+
+        # Check jump coverage doesn't exceed 25% of board
+        if len(self.jump_squares) > self.board_size // 4:
+            raise BoardValidationError('too_many_jumps',
+                                       f"Too many jumps: {len(self.jump_squares)} > {self.board_size // 4}")
 
 def validate_jumps(jumps, board_size, width, height):
     """Validate jump constraints."""
-    jump_squares = set()
-    start_squares = set()
-    end_squares = set()
-    
+    validator = JumpValidator(board_size)
     for jump in jumps:
-        start, end = map(int, jump.split(':'))
-        
-        # Check first and last squares
-        if start == 1 or start == board_size or end == 1 or end == board_size:
-            raise ValueError(f"Jump {jump} involves first or last square")
-        
-        # Check for conflicts
-        if start in jump_squares or end in jump_squares:
-            raise ValueError(f"Jump {jump} conflicts with existing jumps")
-        
-        jump_squares.add(start)
-        jump_squares.add(end)
-        start_squares.add(start)
-        end_squares.add(end)
-    
+        validator.add(jump)
+
     # Check last 64 squares don't have only snake starts
     last_64_start = max(1, board_size - 63)
     for square in range(last_64_start, board_size + 1):
-        if square in start_squares and square not in end_squares:
+        if square in validator.start_squares and square not in validator.end_squares:
             # This is a snake start in the last 64 squares
             # Check if there's a corresponding ladder end
             pass  # For now, we'll allow this as the constraint might be interpreted differently
-    
-    # Check jump coverage doesn't exceed 25% of board
-    if len(jump_squares) > board_size // 4:
-        raise ValueError(f"Too many jumps: {len(jump_squares)} > {board_size // 4}")
-    
+
     return True
 
-def generate_board_svg_with_players(svg_root, positions, board_width, board_height):
+def parse_jumps(jumps, board_size):
     """Parse jumps into a dictionary mapping start to end positions."""
     jump_map = {}
     for jump in jumps:
@@ -207,162 +246,964 @@ def apply_jump(position, jump_map, die_roll, board_size):
         return jump_map[position]
     return position
 
-def simulate_game(board_size, players, jumps, rolls):
+# Die modes, used as indexes into the compiled transition table
+REGULAR_DIE = 0
+POWER_DIE = 1
+
+class CompiledBoard:
+    """Board with jumps and every die transition precomputed.
+
+    Transitions are stored in flat lists indexed by
+    ``(square * 2 + die_mode) * 6 + die_roll - 1``, where square 0 is the
+    start position before square 1. Each entry holds the square landed on
+    (bounce-back applied), the square after any jump and the die mode for
+    the player's next turn. ``next_state`` packs the last two the same way
+    as the index, ``square * 2 + die_mode``, which is how simulators keep
+    each player's state in a single int.
+    """
+
+    __slots__ = ('board_size', 'jumps', 'jump_table', 'landing', 'destination', 'next_mode', 'next_state', 'tables')
+
+    def __init__(self, board_size, jumps):
+        self.board_size = board_size
+        self.jumps = list(jumps)
+        self.tables = None  # Distance tables, see heuristics.board_tables
+
+        # Dense jump table: jump_table[square] is where a player on square ends up
+        jump_map = parse_jumps(jumps, board_size)
+        self.jump_table = [jump_map.get(square, square) for square in range(board_size + 1)]
+
+        self.landing = []
+        self.destination = []
+        self.next_mode = []
+        self.next_state = []
+        for position in range(board_size + 1):
+            for die_mode in (REGULAR_DIE, POWER_DIE):
+                for die_roll in range(1, 7):
+                    if die_mode == REGULAR_DIE:
+                        movement = die_roll
+                        mode = POWER_DIE if die_roll == 6 else REGULAR_DIE
+                    else:
+                        movement = 2 ** die_roll
+                        mode = REGULAR_DIE if die_roll == 1 else POWER_DIE
+
+                    new_position = position + movement
+                    if new_position > board_size:
+                        overshoot = new_position - board_size
+                        new_position = board_size - overshoot
+                    new_position = max(1, min(board_size, new_position))
+
+                    self.landing.append(new_position)
+                    self.destination.append(self.jump_table[new_position])
+                    self.next_mode.append(mode)
+                    self.next_state.append(self.jump_table[new_position] * 2 + mode)
+
+def compile_board(board_size, jumps):
+    """Build a CompiledBoard from parse_svg_board output."""
+    return CompiledBoard(board_size, jumps)
+
+def shared_board(board_size, jumps):
+    """Return the CompiledBoard of a board from compiled_boards, compiling it on first use.
+
+    The board, and the distance tables heuristics.board_tables keeps on
+    it, are then shared by every request for the same board.
+    """
+    key = (board_size, tuple(sorted(jumps)))
+    board = compiled_boards.get(key)
+    if board is None:
+        board = compile_board(board_size, jumps)
+        compiled_boards.put(key, board)
+    return board
+
+@profiling.section('simulate_game')
+def simulate_game(board_size, players, jumps, rolls, board=None):
     """Simulate the game with given rolls and return final positions and squares landed."""
-    jump_map = parse_jumps(jumps, board_size)
-    positions = [0] * players  # Players start before square 1
-    squares_landed = set()  # Track unique squares landed for scoring
+    if board is None:
+        board = compile_board(board_size, jumps)
+    landing = board.landing
+    destination = board.destination
+    next_state = board.next_state
+
+    # Each player's square and die mode packed as square * 2 + die_mode;
+    # players start before square 1 with the regular die
+    states = [0] * players
+    covered = bytearray(board_size + 1)  # Squares landed on, for scoring
     roll_index = 0
     player = 0
-    player_die_types = ['regular'] * players  # Track each player's current die type
-    
-    while roll_index < len(rolls):
-        # Current player's turn
-        current_position = positions[player]
-        die_roll = rolls[roll_index]
+    winner = None
+
+    for die_roll in rolls:
+        if not 1 <= die_roll <= 6:
+            raise ValueError(f"Die roll {die_roll} not in range [1..6]")
         roll_index += 1
-        
-        # Determine movement based on die type
-        if player_die_types[player] == 'regular':
-            movement = die_roll
-            # Power up if rolled 6
-            if die_roll == 6:
-                player_die_types[player] = 'power'
-        else:  # power die
-            movement = 2 ** die_roll
-            # Revert to regular if rolled 1
-            if die_roll == 1:
-                player_die_types[player] = 'regular'
-        
-        # Move by calculated movement
-        new_position = current_position + movement
-        if new_position > board_size:
-            overshoot = new_position - board_size
-            new_position = board_size - overshoot
-        new_position = max(1, min(board_size, new_position))
-
-        # Add position to squares landed
-        squares_landed.add(new_position)
-
-        # Apply any jump (Snake or Ladder)
-        next_position = apply_jump(new_position, jump_map, movement, board_size)
-        if next_position != new_position:
-            squares_landed.add(next_position)
-
-        # Update player's position
-        positions[player] = next_position
+
+        # Look up landing square, post-jump square and next state
+        transition = states[player] * 6 + die_roll - 1
+        next_position = destination[transition]
+        covered[landing[transition]] = 1
+        covered[next_position] = 1
+        states[player] = next_state[transition]
 
         # Check if current player has won
-        if positions[player] == board_size:
-            return positions, squares_landed, player, roll_index
+        if next_position == board_size:
+            winner = player
+            break
 
         # Move to next player
         player = (player + 1) % players
 
-    return positions, squares_landed, None, roll_index
+    positions = [state >> 1 for state in states]
+    return positions, covered_squares(covered), winner, roll_index
+
+def covered_squares(covered):
+    """Return the set of squares marked in a coverage bytearray."""
+    return {square for square, hit in enumerate(covered) if hit}
+
+class PrefixNode:
+    """Game state after a roll prefix, with the states of its known extensions.
+
+    ``states`` holds each player's packed ``square * 2 + die_mode`` and
+    ``covered`` the squares landed on as a bytes bitmap.
+    """
+
+    __slots__ = ('depth', 'states', 'covered', 'player', 'winner', 'children')
+
+    def __init__(self, depth, states, covered, player, winner=None):
+        self.depth = depth
+        self.states = states
+        self.covered = covered
+        self.player = player
+        self.winner = winner
+        self.children = {}
+
+class PrefixSimulator:
+    """Incremental simulator that memoizes game states in a trie keyed by roll prefix.
+
+    Each node is the checkpointed state (player states, squares landed and
+    player to move) after the rolls on its path, so sequences that share a
+    prefix only simulate the rolls after it. At most ``max_nodes`` states
+    are kept; once full, the trie is cleared.
+    """
+
+    def __init__(self, board, players, max_nodes=None):
+        self.board = board
+        self.players = players
+        self.max_nodes = PREFIX_MEMO_NODES if max_nodes is None else max_nodes
+        self.clear()
+
+    def clear(self):
+        self.root = PrefixNode(0, (0,) * self.players, bytes(self.board.board_size + 1), 0)
+        self.nodes = 1
+
+    def _step(self, node, die_roll):
+        if not 1 <= die_roll <= 6:
+            raise ValueError(f"Die roll {die_roll} not in range [1..6]")
+        board = self.board
+        player = node.player
+        transition = node.states[player] * 6 + die_roll - 1
+        next_position = board.destination[transition]
+        states = list(node.states)
+        states[player] = board.next_state[transition]
+        covered = bytearray(node.covered)
+        covered[board.landing[transition]] = 1
+        covered[next_position] = 1
+        winner = player if next_position == board.board_size else None
+        return PrefixNode(node.depth + 1, tuple(states), bytes(covered), (player + 1) % self.players, winner)
+
+    def path(self, rolls):
+        """Return the nodes for every prefix of ``rolls``, stopping at a win.
+
+        The first node is the start of the game. Missing states are
+        simulated from the longest memoized prefix and stored while
+        there is room.
+        """
+        if self.nodes + len(rolls) > self.max_nodes:
+            self.clear()
+        node = self.root
+        nodes = [node]
+        for die_roll in rolls:
+            if node.winner is not None:
+                break
+            child = node.children.get(die_roll)
+            if child is None:
+                child = self._step(node, die_roll)
+                if self.nodes < self.max_nodes:
+                    node.children[die_roll] = child
+                    self.nodes += 1
+            node = child
+            nodes.append(node)
+        return nodes
+
+    def play(self, rolls):
+        """Simulate ``rolls`` like simulate_game, reusing memoized prefixes."""
+        node = self.path(rolls)[-1]
+        return [state >> 1 for state in node.states], covered_squares(node.covered), node.winner, node.depth
+
+# Searches stop as soon as their best win covers at most this share of the
+# board. Lower coverage always scores better, so the default never stops
+# early: searches end on their plateau, deadline or attempt limit, and the best
+# win is always refined. Raise it to trade coverage for latency.
+TARGET_COVERAGE = float(os.environ.get('SLPU_TARGET_COVERAGE', '0'))
+
+# Monte Carlo search limits
+MAX_ATTEMPTS = 10000  # Increased attempts for better coverage
+MAX_ROLLS = 200  # Allow longer sequences for better coverage
+
+# Players per game, selectable per request with the ``players`` query parameter
+DEFAULT_PLAYERS = 2
+MAX_PLAYERS = 16
+
+STRATEGIES = ('monte_carlo', 'solver', 'guided')
+DEFAULT_STRATEGY = 'monte_carlo'
+
+# Monte Carlo engines: pure Python reference or NumPy batches (batch_engine.py)
+ENGINES = ('python', 'numpy')
+DEFAULT_ENGINE = 'python'
+
+# Below this many sequences the fixed cost of a NumPy batch outweighs its speed
+VERIFY_BATCH_MIN = 500
+
+# Largest /verify request body, and the engine it uses unless asked otherwise
+MAX_VERIFY_BYTES = 64 * MAX_SVG_BYTES
+VERIFY_ENGINE = 'numpy'
+
+# Worker processes used by /slpu for Monte Carlo search (see parallel.py)
+SEARCH_WORKERS = int(os.environ.get('SLPU_SEARCH_WORKERS', '1'))
+
+# With a deadline, stop once this many attempts in a row brought no improvement
+PLATEAU_ATTEMPTS = 1000
+
+# Game states memoized by a PrefixSimulator, and the share of Monte Carlo
+# attempts that resume from a state on the best win instead of square 0
+PREFIX_MEMO_NODES = 4096
+PREFIX_RESUME_RATE = 0.5
+
+# Random searches hand their best win to refine_rolls after this many
+# attempts in a row without improvement
+SEARCH_PATIENCE = 200
+
+# Local search over the best win (see refine_rolls): steps per search, and
+# the annealing temperature in squares at the start, cooling linearly to 0
+REFINE_ITERATIONS = 2000
+REFINE_TEMPERATURE = 1.0
+
+# Solved boards, keyed by board signature (see cache.py). Set SLPU_CACHE_DB
+# to a file path to keep results across restarts and share them between processes.
+RESULT_CACHE_SIZE = int(os.environ.get('SLPU_CACHE_SIZE', '1024'))
+result_cache = cache.ResultCache(RESULT_CACHE_SIZE, os.environ.get('SLPU_CACHE_DB'))
+
+# Rendered /slpu responses and their compressed encodings, keyed by ETag (see http_cache.py)
+RESPONSE_CACHE_SIZE = int(os.environ.get('SLPU_RESPONSE_CACHE_SIZE', '256'))
+response_cache = cache.LRUCache(RESPONSE_CACHE_SIZE)
+
+# Compiled boards with their distance tables, keyed by board size and sorted jumps
+COMPILED_BOARD_CACHE_SIZE = int(os.environ.get('SLPU_BOARD_CACHE_SIZE', '256'))
+compiled_boards = cache.LRUCache(COMPILED_BOARD_CACHE_SIZE)
+
+# Searches in progress, keyed like result_cache
+inflight = cache.SingleFlight()
+
+# Concurrent searches per process, and the queue in front of them (see admission.py).
+# Overflow requests are shed with a 503 or, with SLPU_OVERLOAD=degrade, get a
+# plain Monte Carlo search limited to DEGRADED_BUDGET_MS whose result is not cached.
+MAX_SEARCHES = int(os.environ.get('SLPU_MAX_SEARCHES', '4'))
+SEARCH_QUEUE = int(os.environ.get('SLPU_SEARCH_QUEUE', '16'))
+QUEUE_TIMEOUT_MS = int(os.environ.get('SLPU_QUEUE_TIMEOUT_MS', '250'))
+DEGRADED_BUDGET_MS = 50
+DEGRADED_STRATEGY = 'monte_carlo'
+admission_control = admission.AdmissionControl(MAX_SEARCHES, SEARCH_QUEUE, QUEUE_TIMEOUT_MS / 1000,
+                                               os.environ.get('SLPU_OVERLOAD', 'degrade'),
+                                               int(os.environ.get('SLPU_MAX_DEGRADED', str(MAX_SEARCHES * 4))))
+
+def verify_rolls(board, players, sequences, engine=DEFAULT_ENGINE):
+    """Replay many roll sequences on a compiled board; return one result dict per sequence.
+
+    Each result holds the ``winner`` (None if nobody won), final
+    ``positions``, ``coverage`` and ``rolls_used``, as simulate_game
+    reports them; rolls after a win are ignored. A sequence that reaches
+    a roll outside 1..6 gets an ``error`` instead. The 'numpy' engine
+    replays the sequences in batches (batch_engine.verify_batch) when
+    NumPy is installed and there are at least VERIFY_BATCH_MIN of them.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}")
+    if engine == 'numpy' and batch_engine.available() and len(sequences) >= VERIFY_BATCH_MIN:
+        return batch_engine.verify_batch(board, players, sequences)
+
+    board_size = board.board_size
+    landing = board.landing
+    destination = board.destination
+    next_state = board.next_state
+    results = []
+    for rolls in sequences:
+        states = [0] * players
+        covered = bytearray(board_size + 1)
+        player = 0
+        winner = None
+        used = 0
+        error = None
+        for die_roll in rolls:
+            if not 1 <= die_roll <= 6:
+                error = f"Die roll {die_roll} not in range [1..6]"
+                break
+            used += 1
+            transition = states[player] * 6 + die_roll - 1
+            next_position = destination[transition]
+            covered[landing[transition]] = 1
+            covered[next_position] = 1
+            states[player] = next_state[transition]
+            if next_position == board_size:
+                winner = player
+                break
+            player = player + 1 if player + 1 < players else 0
+
+        if error is not None:
+            results.append({'error': error})
+        else:
+            results.append({
+                'winner': winner,
+                'positions': [state >> 1 for state in states],
+                'coverage': covered.count(1) / board_size,
+                'rolls_used': used,
+            })
+    return results
+
+def solve_rolls(board, players):
+    """Deterministically find a roll sequence where the last player wins with low coverage.
+
+    Runs a shortest-path search over (square, die mode) states, with a
+    transposition table holding the cheapest known cost per state, where
+    the cost of a path is the number of squares it lands on. The last
+    player follows the cheapest path to the final square; every other
+    player copies its rolls, so they land on the same squares, and only
+    deviates on the final turn with the non-winning roll that lands on the
+    fewest new squares. Coverage is therefore at most the optimal path
+    cost plus two. Returns [] if the final square cannot be reached.
+    """
+    board_size = board.board_size
+    landing = board.landing
+    destination = board.destination
+    next_states = board.next_state
+
+    # Transposition table indexed by square * 2 + die_mode
+    best_cost = [None] * ((board_size + 1) * 2)
+    parent = [None] * ((board_size + 1) * 2)
+    best_cost[0] = (0, 0)
+    queue = [(0, 0, 0)]  # (squares landed, rolls, state)
+    goal = None
+
+    while queue:
+        cost, length, state = heapq.heappop(queue)
+        if (cost, length) != best_cost[state]:
+            continue  # Stale queue entry
+        if state // 2 == board_size:
+            goal = state
+            break
+        for die_roll in range(1, 7):
+            transition = state * 6 + die_roll - 1
+            next_position = destination[transition]
+            next_state = next_states[transition]
+            step = 1 if landing[transition] == next_position else 2
+            candidate = (cost + step, length + 1)
+            if best_cost[next_state] is None or candidate < best_cost[next_state]:
+                best_cost[next_state] = candidate
+                parent[next_state] = (state, die_roll)
+                heapq.heappush(queue, (cost + step, length + 1, next_state))
+
+    if goal is None:
+        return []
+
+    # Walk the parent links back to recover the winner's path
+    path = []
+    states = []
+    state = goal
+    while state != 0:
+        state, die_roll = parent[state]
+        path.append(die_roll)
+        states.append(state)
+    path.reverse()
+    states.reverse()
+
+    # Squares the winner lands on before the final turn
+    covered = set()
+    for state, die_roll in zip(states[:-1], path[:-1]):
+        transition = state * 6 + die_roll - 1
+        covered.add(landing[transition])
+        covered.add(destination[transition])
+
+    # On the final turn the other players pick the cheapest non-winning roll
+    final_state = states[-1]
+    final_roll = path[-1]
+    deviation = None
+    for die_roll in range(1, 7):
+        if die_roll == final_roll:
+            continue
+        transition = final_state * 6 + die_roll - 1
+        new_squares = len({landing[transition], destination[transition]} - covered)
+        if deviation is None or new_squares < deviation[0]:
+            deviation = (new_squares, die_roll)
+
+    rolls = []
+    for die_roll in path[:-1]:
+        rolls.extend([die_roll] * players)
+    rolls.extend([deviation[1]] * (players - 1))
+    rolls.append(final_roll)
+    return rolls
+
+def check_search_options(strategy, engine):
+    """Raise ValueError unless ``strategy`` and ``engine`` name a known search."""
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy!r}")
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}")
+
+@profiling.section('generate_rolls')
+def generate_rolls(board_size, players, jumps, board=None, strategy=DEFAULT_STRATEGY, engine=DEFAULT_ENGINE,
+                   workers=1, deadline=None, patience=None, cancel=None, stats=None):
+    """Generate die rolls to make the last player win with optimal score.
+
+    ``strategy`` is 'monte_carlo' (random search keeping the lowest
+    coverage win), 'solver' (deterministic search, see solve_rolls) or
+    'guided' (random search steered by distance-to-goal tables, see
+    heuristics.guided_rolls, always in this process).
+    ``engine`` selects how Monte Carlo games are simulated; 'numpy' falls
+    back to 'python' when NumPy is not installed. With ``workers`` > 1 the
+    Monte Carlo search is sharded across a shared process pool.
+
+    Random searches stop SEARCH_PATIENCE attempts after their last
+    improvement, and their best win is then improved by local search
+    (see refine_rolls) rather than by more random games.
+
+    ``deadline`` is a time.monotonic() value at which the search returns
+    the best win found so far, and ``patience`` stops it after that many
+    attempts without improvement. If the deadline passes before any win
+    is found, or is too close to build the guided strategy's distance
+    tables, the solver's answer is returned instead.
+    Setting the ``cancel`` threading.Event stops the search as soon as possible.
+    If a ``stats`` dict is given, the Monte Carlo search adds its attempt and
+    win counts and the reason it stopped early (see search_stats.add_search_stats), and
+    refinement adds its own in a nested ``refine`` dict.
+    """
+    check_search_options(strategy, engine)
+    if board is None:
+        board = compile_board(board_size, jumps)
+    if strategy == 'solver':
+        with profiling.section('solver'):
+            return solve_rolls(board, players)
+
+    if (strategy == 'guided' and deadline is not None and board.tables is None
+            and time.monotonic() + heuristics.table_seconds(board) > deadline):
+        # Building the distance tables would overrun the deadline
+        search_stats.add_search_stats(stats, 0, 0, 'deadline')
+        with profiling.section('solver'):
+            return solve_rolls(board, players)
+
+    search_patience = SEARCH_PATIENCE if patience is None else min(patience, SEARCH_PATIENCE)
+    if strategy == 'guided':
+        with profiling.section('guided'):
+            rolls = heuristics.guided_rolls(board, players, MAX_ATTEMPTS, MAX_ROLLS, TARGET_COVERAGE,
+                                            deadline=deadline, patience=search_patience, cancel=cancel, stats=stats)
+    elif workers > 1:
+        import parallel
+        with profiling.section('parallel'):
+            rolls = parallel.parallel_rolls(board, players, workers, engine=engine, deadline=deadline,
+                                            patience=search_patience, cancel=cancel, stats=stats)
+    elif engine == 'numpy' and batch_engine.available():
+        with profiling.section('numpy'):
+            rolls = batch_engine.search_rolls(board, players, MAX_ATTEMPTS, MAX_ROLLS, TARGET_COVERAGE,
+                                              deadline=deadline, patience=search_patience, cancel=cancel, stats=stats)
+    else:
+        with profiling.section('monte_carlo'):
+            rolls = monte_carlo_rolls(board, players, deadline=deadline, patience=search_patience, cancel=cancel,
+                                      stats=stats)
+
+    cancelled = cancel is not None and cancel.is_set()
+    if not rolls and deadline is not None and not cancelled:
+        with profiling.section('solver'):
+            rolls = solve_rolls(board, players)
+    elif rolls and not cancelled and (deadline is None or time.monotonic() < deadline):
+        with profiling.section('refine'):
+            rolls = refine_rolls(board, players, rolls, deadline=deadline, patience=patience, cancel=cancel,
+                                 stats=None if stats is None else stats.setdefault('refine', {}))
+    return rolls
+
+def monte_carlo_rolls(board, players, attempts=MAX_ATTEMPTS, rng=None, deadline=None, patience=None, cancel=None,
+                      stats=None):
+    """Play random games and keep the lowest-coverage win by the last player.
+
+    ``rng`` is a random.Random to draw rolls from, for seeded searches.
+    The search also stops at ``deadline`` (a time.monotonic() value), after
+    ``patience`` attempts in a row without improvement or once the
+    ``cancel`` threading.Event is set.
+
+    Coverage is tracked as each game is played, so wins need no second
+    simulation. Once a win is found, a share of attempts (PREFIX_RESUME_RATE)
+    keep a random prefix of it and resume from the game state memoized for
+    that prefix by a PrefixSimulator instead of replaying it from square 0.
+    """
+    rng = rng or random
+    randint = rng.randint
+    board_size = board.board_size
+    landing = board.landing
+    destination = board.destination
+    next_state = board.next_state
+
+    # States along the best win so far, for attempts that resume from them
+    memo = PrefixSimulator(board, players)
+    checkpoints = []
 
-def generate_rolls(board_size, players, jumps):
-    """Generate die rolls to make the last player win with optimal score."""
-    max_attempts = 10000  # Increased attempts for better coverage
     best_rolls = []
-    best_coverage = 0
+    best_coverage = None
+    best_attempt = 0
     target_winner = players - 1  # Last player
+    played = wins = 0
+    stop = None
 
-    for attempt in range(max_attempts):
-        rolls = []
-        positions = [0] * players  # Start before square 1
-        player_die_types = ['regular'] * players
-        current_player = 0
-        attempt_rolls = 0
-        max_rolls = 200  # Allow longer sequences for better coverage
-        squares_landed = set()
+    for attempt in range(attempts):
+        played += 1
+        if checkpoints and rng.random() < PREFIX_RESUME_RATE:
+            # Keep a prefix of the best win and play on from its stored state
+            node = checkpoints[randint(0, len(checkpoints) - 1)]
+            rolls = best_rolls[:node.depth]
+            states = list(node.states)
+            covered = bytearray(node.covered)
+            current_player = node.player
+            attempt_rolls = node.depth
+        else:
+            rolls = []
+            states = [0] * players  # Square 0 with the regular die, packed as in CompiledBoard
+            covered = bytearray(board_size + 1)
+            current_player = 0
+            attempt_rolls = 0
 
-        while attempt_rolls < max_rolls:
+        while attempt_rolls < MAX_ROLLS:
             # Generate die roll (always 1-6)
-            die_roll = random.randint(1, 6)
+            die_roll = randint(1, 6)
             rolls.append(die_roll)
 
-            # Determine movement based on die type
-            if player_die_types[current_player] == 'regular':
-                movement = die_roll
-                if die_roll == 6:
-                    player_die_types[current_player] = 'power'
-            else:  # power die
-                movement = 2 ** die_roll
-                if die_roll == 1:
-                    player_die_types[current_player] = 'regular'
-
-            # Move
-            current_position = positions[current_player]
-            new_position = current_position + movement
-            if new_position > board_size:
-                overshoot = new_position - board_size
-                new_position = board_size - overshoot
-            new_position = max(1, min(board_size, new_position))
-
-            squares_landed.add(new_position)
-
-            # Apply jumps
-            jump_map = parse_jumps(jumps, board_size)
-            next_position = apply_jump(new_position, jump_map, movement, board_size)
-            if next_position != new_position:
-                squares_landed.add(next_position)
-            
-            positions[current_player] = next_position
-
-            # Check if any player has won
+            transition = states[current_player] * 6 + die_roll - 1
+            next_position = destination[transition]
+            covered[landing[transition]] = 1
+            covered[next_position] = 1
+            states[current_player] = next_state[transition]
+
+            # The game ends with the first player to reach the final square
             if next_position == board_size:
-                # Simulate full game to verify
-                sim_positions, sim_squares_landed, winner, _ = simulate_game(board_size, players, jumps, rolls)
-                if winner == target_winner:
-                    coverage = len(sim_squares_landed) / board_size
-                    if coverage > best_coverage:
+                if current_player == target_winner:
+                    wins += 1
+                    coverage = covered.count(1) / board_size
+                    if best_coverage is None or coverage < best_coverage:
                         best_coverage = coverage
-                        best_rolls = rolls.copy()
-                        # If we have good coverage, we can stop early
-                        if coverage >= 0.5:
-                            break
+                        best_rolls = rolls
+                        best_attempt = attempt
+                        checkpoints = memo.path(rolls)[:-1]
                 break
 
             current_player = (current_player + 1) % players
             attempt_rolls += 1
 
+        stop = search_stats.stop_reason(best_coverage, TARGET_COVERAGE, deadline, patience, attempt - best_attempt,
+                                        cancel)
+        if stop is not None:
+            break
+
+    search_stats.add_search_stats(stats, played, wins, stop)
     return best_rolls
 
+def refine_rolls(board, players, rolls, iterations=REFINE_ITERATIONS, rng=None, deadline=None, patience=None,
+                 cancel=None, stats=None):
+    """Improve a winning roll sequence by local search instead of new random games.
+
+    Runs simulated annealing over the roll list: each step mutates one
+    roll, drops a few rolls or splices in the rolls from another point of
+    the sequence, replays the game from the memoized state just before
+    the change (see PrefixSimulator) and, if the game does not end within
+    the changed rolls, continues it with random rolls. A candidate is kept
+    if the last player still wins and it covers no more squares than the
+    current sequence, or with a probability that shrinks with the extra
+    squares and the temperature, which cools from REFINE_TEMPERATURE to 0.
+
+    Stops like monte_carlo_rolls, with ``patience`` counted in steps, and
+    returns the lowest-coverage sequence seen. Steps are added to
+    ``stats`` as attempts and winning candidates as wins.
+    """
+    rng = rng or random
+    randint = rng.randint
+    uniform = rng.random
+    board_size = board.board_size
+    landing = board.landing
+    destination = board.destination
+    next_state = board.next_state
+    target_winner = players - 1
+
+    memo = PrefixSimulator(board, players)
+    checkpoints = memo.path(rolls)
+    if checkpoints[-1].winner != target_winner:
+        return rolls
+    current = best_rolls = rolls[:checkpoints[-1].depth]
+    current_count = best_count = checkpoints[-1].covered.count(1)
+    best_iteration = 0
+    played = wins = 0
+    stop = None
+
+    for iteration in range(iterations):
+        stop = search_stats.stop_reason(best_count / board_size, TARGET_COVERAGE, deadline, patience,
+                                        iteration - best_iteration, cancel)
+        if stop is not None:
+            break
+        played += 1
+
+        length = len(current)
+        index = randint(0, length - 1)
+        move = randint(0, 2)
+        if move == 0:
+            # Change one roll to a different value
+            die_roll = randint(1, 5)
+            suffix = [die_roll + (die_roll >= current[index])] + current[index + 1:]
+        elif move == 1:
+            # Drop up to three rolls
+            suffix = current[index + randint(1, 3):]
+        else:
+            # Continue with the rolls from another point of the sequence
+            suffix = current[randint(0, length - 1):]
+
+        # Replay from the state before the change
+        node = checkpoints[index]
+        states = list(node.states)
+        covered = bytearray(node.covered)
+        player = node.player
+        tail = []
+        winner = None
+        for depth in range(node.depth, MAX_ROLLS):
+            die_roll = suffix[depth - node.depth] if depth - node.depth < len(suffix) else randint(1, 6)
+            tail.append(die_roll)
+            transition = states[player] * 6 + die_roll - 1
+            next_position = destination[transition]
+            covered[landing[transition]] = 1
+            covered[next_position] = 1
+            states[player] = next_state[transition]
+            if next_position == board_size:
+                winner = player
+                break
+            player = (player + 1) % players
+
+        if winner != target_winner:
+            continue
+        wins += 1
+        count = covered.count(1)
+        temperature = REFINE_TEMPERATURE * (1 - iteration / iterations)
+        if count > current_count and (temperature <= 0 or uniform() >= math.exp((current_count - count) / temperature)):
+            continue
+
+        current = current[:index] + tail
+        current_count = count
+        checkpoints = memo.path(current)
+        if count < best_count:
+            best_rolls = current
+            best_count = count
+            best_iteration = iteration
+
+    search_stats.add_search_stats(stats, played, wins, stop)
+    return best_rolls
+
+def solve_board(board_data, players=2, strategy=DEFAULT_STRATEGY, engine=DEFAULT_ENGINE, workers=1,
+                deadline=None, patience=None, cancel=None):
+    """Solve a parsed board, using the result cache when the board was seen before.
+
+    Returns a dict with the rolls, final positions, winner and coverage,
+    and ``degraded`` set if the server was too busy for a full search.
+    Raises admission.Overloaded if it was too busy to search at all.
+    """
+    # Checked before the lookup, so a bad request fails whether or not the board is cached
+    check_search_options(strategy, engine)
+    key = cache.board_signature(board_data['board_width'], board_data['board_height'], board_data['jumps'], players)
+    result = result_cache.get(key)
+    if result is not None:
+        metrics.cache_lookups.inc(result='hit')
+        return result
+    metrics.cache_lookups.inc(result='miss')
+
+    def admitted_search():
+        with admission_control.admit(deadline) as mode:
+            if mode == 'full':
+                return search_board(board_data, players, strategy, engine, workers, deadline, patience, cancel, key)
+            budget = time.monotonic() + DEGRADED_BUDGET_MS / 1000
+            result = search_board(board_data, players, DEGRADED_STRATEGY, DEFAULT_ENGINE, 1,
+                                  budget if deadline is None else min(deadline, budget), PLATEAU_ATTEMPTS, cancel)
+            result['degraded'] = True
+            return result
+
+    # Concurrent requests for the same board wait for one search instead of each running their own
+    result, outcome = inflight.do(key, admitted_search, deadline, cancel)
+    if outcome != 'leader':
+        metrics.coalesced_requests.inc(outcome=outcome)
+    return result
+
+def search_board(board_data, players=2, strategy=DEFAULT_STRATEGY, engine=DEFAULT_ENGINE, workers=1,
+                 deadline=None, patience=None, cancel=None, key=None):
+    """Search and simulate a parsed board without the cache lookup.
+
+    Wins are cached under ``key`` when the search had no deadline and was
+    not cancelled.
+    """
+    board_size = board_data['board_size']
+    jumps = board_data['jumps']
+
+    # Compile the board once and share it between search, simulation and later requests
+    started = time.perf_counter()
+    board = shared_board(board_size, jumps)
+    stats = {}
+    rolls = generate_rolls(board_size, players, jumps, board, strategy, engine, workers, deadline, patience, cancel,
+                           stats)
+    searched = time.perf_counter()
+    metrics.stage_duration.observe(searched - started, stage='search')
+    for phase, phase_stats in (('search', stats), ('refine', stats.get('refine', {}))):
+        metrics.search_attempts.inc(phase_stats.get('attempts', 0), phase=phase)
+        metrics.search_wins.inc(phase_stats.get('wins', 0), phase=phase)
+        if 'stop' in phase_stats:
+            metrics.search_early_stops.inc(phase=phase, reason=phase_stats['stop'])
+
+    # Simulate the game to get final positions
+    final_positions, squares_landed, winner, roll_index = simulate_game(board_size, players, jumps, rolls, board)
+    metrics.stage_duration.observe(time.perf_counter() - searched, stage='simulate')
+    metrics.coverage.set(len(squares_landed) / board_size)
+    result = {
+        'rolls': rolls,
+        'positions': final_positions,
+        'winner': winner,
+        'coverage': len(squares_landed) / board_size,
+    }
+    # Only a search that ran its course is cached: one cut short by a deadline or
+    # a cancel would be served to every later request, however much time it has
+    cancelled = cancel is not None and cancel.is_set()
+    if key is not None and winner == players - 1 and deadline is None and not cancelled:
+        result_cache.put(key, result)
+    return result
+
+def solve_svg(svg_content, strategy=DEFAULT_STRATEGY, engine=DEFAULT_ENGINE, workers=1,
+              deadline=None, patience=None, cancel=None, players=DEFAULT_PLAYERS):
+    """Run the /slpu pipeline on an SVG board and return the SVG response body.
+
+    Raises ValueError for boards that fail validation.
+    """
+    return solve_svg_result(svg_content, strategy, engine, workers, deadline, patience, cancel, players)[0]
+
+def solve_svg_result(svg_content, strategy=DEFAULT_STRATEGY, engine=DEFAULT_ENGINE, workers=1,
+                     deadline=None, patience=None, cancel=None, players=DEFAULT_PLAYERS):
+    """Like solve_svg, but return (svg, result) with the solve_board result dict."""
+    _, body, _, result = solve_svg_response(svg_content, strategy, engine, workers, deadline, patience, cancel, players)
+    return body.decode('utf-8'), result
+
+def solve_svg_response(svg_content, strategy=DEFAULT_STRATEGY, engine=DEFAULT_ENGINE, workers=1,
+                       deadline=None, patience=None, cancel=None, players=DEFAULT_PLAYERS,
+                       if_none_match=None, accept_encoding=None):
+    """Like solve_svg_result, but return (status, body bytes, headers, result) for an HTTP response.
+
+    The response carries a strong ETag; a matching ``if_none_match`` gets
+    a 304 without rendering. Large bodies are compressed as
+    ``accept_encoding`` allows, and responses to cached results are kept
+    in response_cache with their compressed encodings.
+    """
+    started = time.perf_counter()
+    try:
+        board_data = parse_svg_board(svg_content)
+    finally:
+        metrics.stage_duration.observe(time.perf_counter() - started, stage='parse')
+    result = solve_board(board_data, players, strategy, engine, workers, deadline, patience, cancel)
+
+    key = cache.board_signature(board_data['board_width'], board_data['board_height'], board_data['jumps'], players)
+    tag = http_cache.etag(svg_content, key, result)
+    headers = {'Content-Type': 'image/svg+xml', 'Vary': 'Accept-Encoding', 'X-Coverage': coverage_header(result)}
+    if result.get('degraded'):
+        headers['X-Degraded'] = '1'
+    if http_cache.etag_matches(if_none_match, tag):
+        metrics.http_cache_responses.inc(result='not_modified')
+        # Name the encoding a 200 would be sent in: known from the cached body's
+        # size, or else the one the client's own validator was for
+        response = response_cache.get(tag)
+        if response is not None:
+            encoding = http_cache.choose_encoding(accept_encoding, len(response.body))
+        else:
+            encoding = http_cache.matched_encoding(if_none_match, tag)
+        headers['ETag'] = http_cache.etag_header(tag, encoding)
+        del headers['Content-Type']
+        return 304, b'', headers, result
+
+    response = response_cache.get(tag)
+    if response is not None:
+        metrics.http_cache_responses.inc(result='hit')
+    else:
+        metrics.http_cache_responses.inc(result='rendered')
+        started = time.perf_counter()
+        svg = generate_board_svg_with_players(board_data['svg_root'], result['positions'],
+                                              board_data['board_width'], board_data['board_height'])
+        metrics.stage_duration.observe(time.perf_counter() - started, stage='render')
+        response = http_cache.RenderedResponse(svg)
+        # Only results the result cache keeps will be asked for again
+        if deadline is None and not result.get('degraded') and result['winner'] == players - 1:
+            response_cache.put(tag, response)
+
+    encoding = http_cache.choose_encoding(accept_encoding, len(response.body))
+    started = time.perf_counter()
+    body = response.encode(encoding)
+    if encoding is not None:
+        metrics.stage_duration.observe(time.perf_counter() - started, stage='compress')
+        headers['Content-Encoding'] = encoding
+    headers['ETag'] = http_cache.etag_header(tag, encoding)
+    return 200, body, headers, result
+
+def coverage_header(result):
+    """Return the X-Coverage header value for a solve_board result."""
+    return f"{result['coverage']:.6f}"
+
+def parse_players(value):
+    """Return the player count for a request's ``players`` parameter (None for the default)."""
+    if value is None:
+        return DEFAULT_PLAYERS
+    try:
+        players = int(value)
+    except ValueError:
+        raise ValueError(f"Invalid player count {value!r}") from None
+    if not 1 <= players <= MAX_PLAYERS:
+        raise ValueError(f"Player count {players} not in range [1..{MAX_PLAYERS}]")
+    return players
+
+def verify_request(payload, engine=VERIFY_ENGINE):
+    """Verify the roll sequences of a decoded /verify request body.
+
+    ``payload`` holds the board ``svg``, the roll sequences as a list of
+    lists in ``sequences`` (or a single one in ``rolls``) and optionally
+    ``players``. Returns the response dict, with one verify_rolls result
+    per sequence; raises ValueError for invalid requests.
+    """
+    if not isinstance(payload, dict) or not isinstance(payload.get('svg'), str):
+        raise ValueError("Request needs the board SVG in 'svg'")
+    if 'sequences' in payload:
+        sequences = payload['sequences']
+    elif 'rolls' in payload:
+        sequences = [payload['rolls']]
+    else:
+        raise ValueError("Request needs roll sequences in 'sequences' or 'rolls'")
+    if not isinstance(sequences, list) or not all(
+            isinstance(rolls, list) and all(type(die_roll) is int for die_roll in rolls) for rolls in sequences):
+        raise ValueError("Roll sequences must be lists of integers")
+    players = parse_players(payload.get('players'))
+
+    board_data = parse_svg_board(payload['svg'])
+    board = shared_board(board_data['board_size'], board_data['jumps'])
+    started = time.perf_counter()
+    results = verify_rolls(board, players, sequences, engine)
+    metrics.stage_duration.observe(time.perf_counter() - started, stage='verify')
+    return {'board_size': board.board_size, 'players': players, 'results': results}
+
+def record_failure(error):
+    """Count a request that failed with ``error``, before it is turned into EMPTY_SVG or an error response."""
+    if isinstance(error, BoardValidationError):
+        metrics.validation_failures.inc(reason=error.reason)
+    elif isinstance(error, ValueError):
+        metrics.validation_failures.inc(reason='invalid_request')
+    else:
+        metrics.errors.inc()
+
+# Response body for boards that cannot be solved (will result in score 0)
+EMPTY_SVG = '<svg xmlns="http://www.w3.org/2000/svg"><text></text></svg>'
+
+def search_budget(started, deadline_ms):
+    """Return the (deadline, patience) search limits for a client budget in milliseconds.
+
+    ``deadline_ms`` is the raw query parameter or header value, or None.
+    """
+    if deadline_ms is None:
+        return None, None
+    deadline_ms = int(deadline_ms)
+    if deadline_ms <= 0:
+        raise ValueError(f"Deadline {deadline_ms}ms must be positive")
+    return started + deadline_ms / 1000, PLATEAU_ATTEMPTS
+
 @app.route('/slpu', methods=['POST'])
 def slpu():
-    """Handle POST request to /slpu endpoint."""
+    """Handle POST request to /slpu endpoint.
+
+    An optional latency budget in milliseconds can be given with the
+    ``deadline_ms`` query parameter or the ``X-Deadline-Ms`` header, and
+    the number of players (default 2) with the ``players`` query parameter.
+    Solved boards report their coverage in the ``X-Coverage`` header, and
+    ``X-Degraded`` marks answers from the cheaper search given to requests
+    over the admission limit; requests shed instead get a 503.
+    Responses carry an ETag, answer a matching If-None-Match with a 304
+    and are compressed as Accept-Encoding allows (see http_cache.py).
+    When profiling is configured (see profiling.py), the ``X-Profile``
+    header asks for the request to be profiled and the profile's id is
+    returned in ``X-Profile-Id``.
+    """
+    started = time.monotonic()
     try:
+        # Reject oversized bodies before reading them into memory
+        if request.content_length is not None and request.content_length > MAX_SVG_BYTES:
+            raise BoardValidationError('body_too_large',
+                                       f"SVG body of {request.content_length} bytes exceeds {MAX_SVG_BYTES}")
         svg_content = request.data.decode('utf-8')
-        
-        # Parse SVG to extract board data
-        board_data = parse_svg_board(svg_content)
-        board_size = board_data['board_size']
-        jumps = board_data['jumps']
-        board_width = board_data['board_width']
-        board_height = board_data['board_height']
-        svg_root = board_data['svg_root']
-
-        # Generate die rolls for 2 players
-        rolls = generate_rolls(board_size, 2, jumps)
-
-        # Simulate the game to get final positions
-        final_positions, squares_landed, winner, roll_index = simulate_game(board_size, 2, jumps, rolls)
-
-        # Generate SVG with board and final player positions
-        svg = generate_board_svg_with_players(svg_root, final_positions, board_width, board_height)
-        return svg, 200, {'Content-Type': 'image/svg+xml'}
-    
+        strategy = request.args.get('strategy', DEFAULT_STRATEGY)
+        engine = request.args.get('engine', DEFAULT_ENGINE)
+        players = parse_players(request.args.get('players'))
+        deadline_ms = request.args.get('deadline_ms') or request.headers.get('X-Deadline-Ms')
+        deadline, patience = search_budget(started, deadline_ms)
+
+        params = {'strategy': strategy, 'engine': engine, 'players': players, 'deadline_ms': deadline_ms}
+        with profiling.profiled(profiling.requested(request.headers.get(profiling.PROFILE_HEADER)), svg_content,
+                                params) as profile:
+            status, body, headers, result = solve_svg_response(
+                svg_content, strategy, engine, SEARCH_WORKERS, deadline, patience, players=players,
+                if_none_match=request.headers.get('If-None-Match'),
+                accept_encoding=request.headers.get('Accept-Encoding'))
+            if profile is not None:
+                profile.info['coverage'] = result['coverage']
+                headers[profiling.PROFILE_ID_HEADER] = profile.id
+        if 'Content-Encoding' not in headers:
+            body = body.decode('utf-8')  # Callers of slpu() have always had the SVG as text
+        return body, status, headers
+
+    except admission.Overloaded:
+        # Shed quickly so the client can retry elsewhere or later
+        return EMPTY_SVG, 503, {'Content-Type': 'image/svg+xml', 'Retry-After': '1'}
     except ValueError as e:
         # Return empty response for validation errors (will result in score 0)
-        return '<svg xmlns="http://www.w3.org/2000/svg"><text></text></svg>', 200, {'Content-Type': 'image/svg+xml'}
+        record_failure(e)
+        return EMPTY_SVG, 200, {'Content-Type': 'image/svg+xml'}
     except Exception as e:
         # Return empty response for any other errors
-        return '<svg xmlns="http://www.w3.org/2000/svg"><text></text></svg>', 200, {'Content-Type': 'image/svg+xml'}
+        record_failure(e)
+        return EMPTY_SVG, 200, {'Content-Type': 'image/svg+xml'}
+
+@app.route('/verify', methods=['POST'])
+def verify():
+    """Replay roll sequences on a board and report each one's winner, positions and coverage.
+
+    Takes a JSON body for verify_request; the ``engine`` query parameter
+    picks the simulation engine. Invalid requests get a 400 with an
+    ``error`` message.
+    """
+    try:
+        if request.content_length is not None and request.content_length > MAX_VERIFY_BYTES:
+            raise ValueError(f"Body exceeds {MAX_VERIFY_BYTES} bytes")
+        payload = request.get_json(force=True, silent=True)
+        return jsonify(verify_request(payload, request.args.get('engine', VERIFY_ENGINE)))
+    except ValueError as e:
+        record_failure(e)
+        return jsonify(error=str(e)), 400
+    except Exception as e:
+        record_failure(e)
+        return jsonify(error='Internal error'), 500
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Expose service metrics in the Prometheus text format."""
+    return metrics.render(), 200, {'Content-Type': metrics.CONTENT_TYPE}
 
 @app.route('/')
 def home():
     return "Snakes and Ladders Power Up! Server is running. Use POST to /slpu to generate rolls."
 
 if __name__ == '__main__':
+    # Flask's development server; serve.py runs the app with preforked workers
     app.run(host='0.0.0.0', port=5000, debug=False)
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""In-process metrics exposed in the Prometheus text format.
+
+Counters, gauges and histograms are plain Python objects guarded by a
+lock, cheap enough to update on every request. ``render()`` returns the
+text served by the /metrics route.
+"""
+import bisect
+import threading
+
+# Latency buckets in seconds, from sub-millisecond renders to multi-second searches
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{value}"' for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric:
+    """Base class for a named metric with optional labels."""
+
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        if tuple(labels) != self.label_names:
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value):
+        return [f'{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}']
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+class Histogram(Metric):
+    """Distribution of observations over fixed buckets."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DURATION_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            sample = self._values.get(key)
+            if sample is None:
+                # Per-bucket counts (last one is +Inf), then count and sum
+                sample = self._values[key] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+            sample[0][index] += 1
+            sample[1] += 1
+            sample[2] += value
+
+    def count(self, **labels):
+        sample = self._values.get(self._key(labels))
+        return 0 if sample is None else sample[1]
+
+    def _render_sample(self, key, sample):
+        bucket_counts, count, total = sample
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + ('+Inf',), bucket_counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.label_names + ('le',), key + (bound,))
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = _format_labels(self.label_names, key)
+        lines.append(f'{self.name}_count{labels} {count}')
+        lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+        return lines
+
+REGISTRY = []
+
+def render():
+    """Return every registered metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+# Content type of render() output
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+stage_duration = Histogram('slpu_stage_duration_seconds', 'Time spent in each /slpu pipeline stage.', ['stage'])
+search_attempts = Counter('slpu_search_attempts_total',
+                          'Games played by the roll search (phase search) and refinement steps (phase refine).',
+                          ['phase'])
+search_wins = Counter('slpu_search_winning_attempts_total', 'Games and refinement steps won by the last player.',
+                      ['phase'])
+search_early_stops = Counter('slpu_search_early_stops_total',
+                             'Searches and refinements stopped before using every attempt.', ['phase', 'reason'])
+validation_failures = Counter('slpu_validation_failures_total', 'Requests rejected by board validation.',
+                              ['reason'])
+errors = Counter('slpu_errors_total', 'Requests that failed with an unexpected error.')
+cache_lookups = Counter('slpu_cache_lookups_total', 'Result cache lookups.', ['result'])
+coverage = Gauge('slpu_coverage_ratio', 'Coverage achieved by the most recent solved board.')
+coalesced_requests = Counter('slpu_coalesced_requests_total',
+                             'Requests that waited for a concurrent search of the same board.', ['outcome'])
+profiled_requests = Counter('slpu_profiled_requests_total', 'Requests selected for profiling, by what became of them.',
+                            ['result'])
+active_searches = Gauge('slpu_active_searches', 'Searches holding an admission slot.')
+admission_queue_depth = Gauge('slpu_admission_queue_depth', 'Requests waiting for a search slot.')
+overload_requests = Counter('slpu_overload_requests_total', 'Requests that found every search slot busy.', ['action'])
+http_cache_responses = Counter('slpu_http_cache_responses_total',
+                               '/slpu responses by how they were produced: not_modified, hit or rendered.', ['result'])
@@ -0,0 +1,198 @@
+"""Multi-core Monte Carlo roll search.
+
+The search is split into independently seeded shards that run on a
+process pool shared by all requests, so worker start-up is paid once per
+server process rather than once per request. Each shard returns its best
+winning sequence and the coordinator keeps the lowest coverage.
+
+When the coordinator returns, at its deadline, on a cancel or once
+TARGET_COVERAGE is reached, shards that have not started are dropped and
+running ones are told to stop through a stop slot: one entry of an array
+shared with the workers, which each shard polls like a cancel event.
+The pool uses the forkserver start method, since it is created from
+threaded web servers where forking is unsafe.
+"""
+import itertools
+import math
+import multiprocessing
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import main
+import search_stats
+
+# Shards per worker, so a fast worker can pick up the slack of a slow one
+SHARDS_PER_WORKER = 4
+
+# How often the coordinator checks for cancellation while shards run
+CANCEL_POLL_SECONDS = 0.05
+
+# Searches that can run on the pool at once with their own stop slot; any
+# beyond that run without one and stop at their deadline or limits only
+STOP_SLOTS = 64
+
+_pool = None
+_pool_workers = None
+_pool_lock = threading.Lock()
+
+# Each slot holds the token of the search using it; a shard stops once its
+# slot no longer holds the token it was started with
+_context = multiprocessing.get_context('forkserver')
+_stop_tokens = None
+_free_slots = list(range(STOP_SLOTS))
+_tokens = itertools.count(1)
+
+# Compiled boards kept by each worker process, keyed by (board_size, jumps)
+_board_cache = {}
+_BOARD_CACHE_SIZE = 16
+
+def get_pool(workers):
+    """Return the shared process pool, (re)creating it for ``workers`` processes."""
+    global _pool, _pool_workers, _stop_tokens
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            if _stop_tokens is None:
+                _stop_tokens = _context.RawArray('q', STOP_SLOTS)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=_context,
+                                        initializer=_init_worker, initargs=(_stop_tokens,))
+            _pool_workers = workers
+        return _pool
+
+def _init_worker(stop_tokens):
+    global _stop_tokens
+    _stop_tokens = stop_tokens
+
+class ShardStop:
+    """Stop signal of one search's shards, read like a threading.Event."""
+
+    __slots__ = ('slot', 'token')
+
+    def __init__(self, slot, token):
+        self.slot = slot
+        self.token = token
+
+    def is_set(self):
+        return _stop_tokens[self.slot] != self.token
+
+def _take_slot():
+    """Claim a stop slot for a search; return (slot, token), or None if all are in use."""
+    with _pool_lock:
+        if not _free_slots:
+            return None
+        slot = _free_slots.pop()
+        token = next(_tokens)
+        _stop_tokens[slot] = token
+        return slot, token
+
+def _release_slot(slot):
+    """Tell the shards using ``slot`` to stop, and free it for another search."""
+    with _pool_lock:
+        _stop_tokens[slot] = 0
+        _free_slots.append(slot)
+
+def shutdown_pool():
+    """Shut down the shared process pool, if one was started."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+        _pool_workers = None
+
+def _compiled_board(board_size, jumps):
+    key = (board_size, jumps)
+    board = _board_cache.get(key)
+    if board is None:
+        if len(_board_cache) >= _BOARD_CACHE_SIZE:
+            _board_cache.clear()
+        board = _board_cache[key] = main.compile_board(board_size, jumps)
+    return board
+
+def search_shard(board_size, jumps, players, attempts, seed, engine, deadline=None, patience=None, stop_slot=None):
+    """Run one seeded Monte Carlo shard and return (coverage, rolls, stats).
+
+    Coverage is None when no attempt in the shard was won by the last player.
+    Stats are the shard's search counts, as filled in by search_stats.add_search_stats.
+    The deadline is a time.monotonic() value, which is shared by all
+    processes on the machine. ``stop_slot`` is the (slot, token) of the
+    search's stop signal, polled while the shard runs.
+    """
+    board = _compiled_board(board_size, jumps)
+    stop = None if stop_slot is None else ShardStop(*stop_slot)
+    stats = {}
+    if engine == 'numpy' and main.batch_engine.available():
+        rolls = main.batch_engine.search_rolls(board, players, attempts, main.MAX_ROLLS, main.TARGET_COVERAGE, seed,
+                                               deadline, patience, stop, stats=stats)
+    else:
+        rolls = main.monte_carlo_rolls(board, players, attempts, random.Random(seed), deadline, patience, stop,
+                                       stats=stats)
+
+    if not rolls:
+        return None, rolls, stats
+    _, squares_landed, _, _ = main.simulate_game(board_size, players, jumps, rolls, board)
+    return len(squares_landed) / board_size, rolls, stats
+
+def parallel_rolls(board, players, workers, attempts=main.MAX_ATTEMPTS, engine=main.DEFAULT_ENGINE, seed=None,
+                   deadline=None, patience=None, cancel=None, stats=None):
+    """Search for the lowest-coverage win by the last player across ``workers`` processes.
+
+    At ``deadline``, or once the ``cancel`` threading.Event is set, the best
+    result from the shards finished so far is returned and the shards
+    still running are stopped. Shard seeds come
+    from ``seed``, or from the random module when it is None. Counts from
+    the finished shards are added to ``stats``.
+    """
+    pool = get_pool(workers)
+    shards = workers * SHARDS_PER_WORKER
+    shard_attempts = math.ceil(attempts / shards)
+    seeds = random.Random(random.getrandbits(64) if seed is None else seed)
+    jumps = tuple(board.jumps)
+    stop_slot = _take_slot()
+
+    futures = [
+        pool.submit(search_shard, board.board_size, jumps, players, shard_attempts, seeds.getrandbits(64), engine,
+                    deadline, patience, stop_slot)
+        for _ in range(shards)
+    ]
+
+    best_rolls = []
+    best_coverage = None
+    played = wins = 0
+    stop = None
+    pending = set(futures)
+    try:
+        while pending:
+            if cancel is not None and cancel.is_set():
+                stop = 'cancelled'
+                break
+            timeout = CANCEL_POLL_SECONDS
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    stop = 'deadline'  # Keep the best result so far
+                    break
+                timeout = min(timeout, remaining)
+
+            done, pending = wait(pending, timeout, FIRST_COMPLETED)
+            for future in done:
+                coverage, rolls, shard_stats = future.result()
+                played += shard_stats.get('attempts', 0)
+                wins += shard_stats.get('wins', 0)
+                if coverage is not None and (best_coverage is None or coverage < best_coverage):
+                    best_coverage = coverage
+                    best_rolls = rolls
+            if best_coverage is not None and best_coverage <= main.TARGET_COVERAGE:
+                stop = 'target'
+                break
+    finally:
+        for future in futures:
+            future.cancel()
+        if stop_slot is not None:
+            _release_slot(stop_slot[0])
+
+    search_stats.add_search_stats(stats, played, wins, stop)
+    return best_rolls
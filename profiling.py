@@ -0,0 +1,158 @@
+"""Opt-in profiling of single /slpu requests.
+
+Profiling is off unless SLPU_PROFILE_DIR names a directory to write
+profiles to. A request is then profiled when it carries the X-Profile
+header, or at random for a share SLPU_PROFILE_SAMPLE (0 to 1) of
+requests. Each profile is a directory named by the id returned in the
+X-Profile-Id response header, holding:
+
+- ``profile.pstats``: cProfile statistics of the request's thread, for
+  pstats, snakeviz or flameprof;
+- ``sections.folded``: wall time of the named sections marked with
+  section(), as folded stacks in microseconds for flamegraph.pl or
+  speedscope;
+- ``board.svg`` and ``request.json``: the board and the request's
+  parameters, duration, section totals and outcome.
+
+Only one request per process is profiled at a time; requests that ask
+while another one is being profiled run normally. Searches sharded
+across processes (SLPU_SEARCH_WORKERS) only show up as waiting.
+"""
+import contextlib
+import cProfile
+import itertools
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+import metrics
+
+# Where profiles are written; profiling is disabled when unset
+PROFILE_DIR = os.environ.get('SLPU_PROFILE_DIR')
+
+# Share of requests profiled without asking
+PROFILE_SAMPLE = float(os.environ.get('SLPU_PROFILE_SAMPLE', '0'))
+
+# Request header that asks for a profile, and response header naming it
+PROFILE_HEADER = 'X-Profile'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+
+_local = threading.local()
+_busy = threading.Lock()
+_sequence = itertools.count(1)
+
+class RequestProfile:
+    """The cProfile profiler and section timings of one request."""
+
+    def __init__(self, profile_id):
+        self.id = profile_id
+        self.profiler = cProfile.Profile()
+        self.started = time.perf_counter()
+        self.stack = []
+        self.sections = {}
+        self.info = {}
+
+    def enter(self, name):
+        self.stack.append((name, time.perf_counter()))
+
+    def exit(self):
+        name, started = self.stack.pop()
+        path = ';'.join([entry[0] for entry in self.stack] + [name])
+        self.sections[path] = self.sections.get(path, 0.0) + time.perf_counter() - started
+
+    def folded(self, duration):
+        """Return the sections as folded stacks of self time in microseconds, under a 'request' root."""
+        totals = {'request': duration}
+        totals.update(('request;' + path, seconds) for path, seconds in self.sections.items())
+        own = dict(totals)
+        for path, seconds in totals.items():
+            parent = path.rpartition(';')[0]
+            if parent:
+                own[parent] -= seconds
+        return ''.join(f'{path} {max(0, round(seconds * 1e6))}\n' for path, seconds in sorted(own.items()))
+
+    def save(self, directory, svg_content, params):
+        duration = time.perf_counter() - self.started
+        path = os.path.join(directory, self.id)
+        os.makedirs(path, exist_ok=True)
+        self.profiler.dump_stats(os.path.join(path, 'profile.pstats'))
+        with open(os.path.join(path, 'sections.folded'), 'w') as f:
+            f.write(self.folded(duration))
+        if isinstance(svg_content, str):
+            svg_content = svg_content.encode('utf-8')
+        with open(os.path.join(path, 'board.svg'), 'wb') as f:
+            f.write(svg_content)
+        with open(os.path.join(path, 'request.json'), 'w') as f:
+            json.dump(dict(self.info, id=self.id, params=params, duration_s=duration, sections=self.sections),
+                      f, indent=2)
+        return path
+
+class Section(contextlib.ContextDecorator):
+    """A named span of a profiled request; a no-op on requests that are not profiled."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        profile = getattr(_local, 'profile', None)
+        if profile is not None:
+            profile.enter(self.name)
+        return self
+
+    def __exit__(self, *exc_info):
+        profile = getattr(_local, 'profile', None)
+        if profile is not None:
+            profile.exit()
+        return False
+
+def section(name):
+    """Mark a named section, as a ``with`` block or a function decorator."""
+    return Section(name)
+
+def requested(header_value, rng=random):
+    """Return whether a request with this X-Profile header value should be profiled."""
+    if PROFILE_DIR is None:
+        return False
+    if header_value and header_value.lower() not in ('0', 'false', 'no'):
+        return True
+    return PROFILE_SAMPLE > 0 and rng.random() < PROFILE_SAMPLE
+
+@contextlib.contextmanager
+def profiled(enabled, svg_content, params):
+    """Profile the enclosed block if ``enabled``, yielding its RequestProfile or None.
+
+    The block may add entries to the profile's ``info`` dict, which are
+    saved in request.json with the parameters and any error.
+    """
+    if not enabled:
+        yield None
+        return
+    if not _busy.acquire(blocking=False):
+        metrics.profiled_requests.inc(result='busy')
+        yield None
+        return
+
+    profile = RequestProfile(f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_sequence)}")
+    _local.profile = profile
+    try:
+        profile.profiler.enable()
+        try:
+            yield profile
+        except Exception as e:
+            profile.info['error'] = f'{type(e).__name__}: {e}'
+            raise
+        finally:
+            profile.profiler.disable()
+            _local.profile = None
+            # A profile that cannot be written must not fail the request
+            try:
+                profile.save(PROFILE_DIR, svg_content, params)
+                metrics.profiled_requests.inc(result='saved')
+            except Exception:
+                logging.exception("Could not save profile %s", profile.id)
+                metrics.profiled_requests.inc(result='failed')
+    finally:
+        _busy.release()
@@ -0,0 +1,41 @@
+"""Stop conditions and counts shared by the roll searches.
+
+The searches stop for the same reasons and report the same counts, so
+they check and record them here. This module imports nothing else from
+the package, so batch_engine and heuristics can use it without main.
+"""
+import time
+
+# Why a search ended before using all its attempts
+STOP_REASONS = ('target', 'deadline', 'plateau', 'cancelled')
+
+def stop_reason(best_coverage, target_coverage, deadline=None, patience=None, since_improvement=0, cancel=None):
+    """Return the reason a search should stop now, or None to go on.
+
+    ``best_coverage`` is the share of the board covered by the best win
+    so far (None before any win), ``deadline`` a time.monotonic() value,
+    and ``since_improvement`` the attempts made since the best win, which
+    end the search once they reach ``patience``.
+    """
+    if best_coverage is not None and best_coverage <= target_coverage:
+        return 'target'
+    if deadline is not None and time.monotonic() >= deadline:
+        return 'deadline'
+    if patience is not None and best_coverage is not None and since_improvement >= patience:
+        return 'plateau'
+    if cancel is not None and cancel.is_set():
+        return 'cancelled'
+    return None
+
+def add_search_stats(stats, attempts, wins, stop=None):
+    """Add a search's counts to a ``stats`` dict, if one was given.
+
+    ``stop`` is why the search ended before using all its attempts, one
+    of STOP_REASONS.
+    """
+    if stats is None:
+        return
+    stats['attempts'] = stats.get('attempts', 0) + attempts
+    stats['wins'] = stats.get('wins', 0) + wins
+    if stop is not None:
+        stats['stop'] = stop
@@ -0,0 +1,224 @@
+"""Production server for the Flask app: a prefork master with warm workers.
+
+    python serve.py --workers 4 --port 5000
+
+The master imports the app, builds the lookup tables requests need
+(warm()), opens the listening socket and then forks the workers, so the
+tables are shared copy-on-write and every worker accepts connections
+from the same socket with a threaded werkzeug server. Workers that die
+are replaced.
+
+Signals to the master:
+
+- SIGHUP reloads gracefully: the master re-executes itself, so code and
+  configuration are read again, starts new workers on the same socket
+  and then stops the old ones, which finish their requests first.
+- SIGTERM or SIGINT shut down gracefully.
+
+Each worker keeps its own result cache and metrics; set SLPU_CACHE_DB to
+share solved boards between workers.
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+import geometry
+import heuristics
+import main
+
+# Environment variables that hand the socket and the old workers to a reloaded master
+LISTEN_FD_ENV = 'SLPU_LISTEN_FD'
+OLD_WORKERS_ENV = 'SLPU_OLD_WORKERS'
+
+# How long a stopping worker waits for its in-flight requests, checking this often
+GRACEFUL_TIMEOUT = 30
+DRAIN_POLL_SECONDS = 0.05
+
+# Signals handled by the master
+CONTROL_SIGNALS = {signal.SIGHUP, signal.SIGTERM, signal.SIGINT}
+
+# How often the master checks on its workers
+MONITOR_SECONDS = 0.2
+
+# Small board run through the pipeline once before forking
+WARM_BOARD = '''<svg viewBox="0 0 128 128" xmlns="http://www.w3.org/2000/svg">
+  <rect width="100%" height="100%" fill="#f9f9f9" />
+  <line x1="32" y1="96" x2="64" y2="32" stroke="BLUE" />
+</svg>'''
+
+def log(message):
+    print(f"[{os.getpid()}] {message}", file=sys.stderr, flush=True)
+
+def warm():
+    """Build lookup tables and exercise the pipeline so forked workers start warm."""
+    # Geometry tables for every board size parse_svg_board accepts
+    for width in range(4, 33):
+        for height in range(4, 33, 2):
+            geometry.board_geometry(width, height)
+
+    board_data = main.parse_svg_board(WARM_BOARD)
+    board = main.compile_board(board_data['board_size'], board_data['jumps'])
+    heuristics.board_tables(board)
+    rolls = main.solve_rolls(board, main.DEFAULT_PLAYERS)
+    positions, _, _, _ = main.simulate_game(board.board_size, main.DEFAULT_PLAYERS, board.jumps, rolls, board)
+    main.generate_board_svg_with_players(board_data['svg_root'], positions, board_data['board_width'],
+                                         board_data['board_height'])
+
+class DrainingRequestHandler(WSGIRequestHandler):
+    """Request handler that counts open connections on its server, so a stopping worker can wait for them."""
+
+    def handle(self):
+        server = self.server
+        with server.connections_lock:
+            server.connections += 1
+        try:
+            super().handle()
+        finally:
+            with server.connections_lock:
+                server.connections -= 1
+
+def run_worker(listener):
+    """Serve requests from ``listener`` until SIGTERM, then drain and exit."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)  # Until the server can drain
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # The master handles Ctrl-C
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+    host, port = listener.getsockname()[:2]
+    server = make_server(host, port, main.app, threaded=True, request_handler=DrainingRequestHandler,
+                         fd=listener.fileno())
+    server.connections = 0
+    server.connections_lock = threading.Lock()
+
+    def stop(signum, frame):
+        # shutdown() waits for serve_forever, so it cannot run in this thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    def watch_master(master):
+        # Stop too if the master dies without stopping this worker
+        while os.getppid() == master:
+            time.sleep(MONITOR_SECONDS)
+        stop(None, None)
+
+    signal.signal(signal.SIGTERM, stop)
+    threading.Thread(target=watch_master, args=(os.getppid(),), daemon=True).start()
+    server.serve_forever()
+
+    # Give the last accepted connection's thread time to start, then wait for all of them
+    time.sleep(DRAIN_POLL_SECONDS)
+    waited = 0.0
+    while server.connections and waited < GRACEFUL_TIMEOUT:
+        time.sleep(DRAIN_POLL_SECONDS)
+        waited += DRAIN_POLL_SECONDS
+    server.server_close()
+
+def spawn_worker(listener):
+    """Fork a worker process and return its pid."""
+    pid = os.fork()
+    if pid == 0:
+        status = 0
+        try:
+            run_worker(listener)
+        except BaseException:
+            logging.exception("Worker failed")
+            status = 1
+        finally:
+            os._exit(status)
+    log(f"Booted worker {pid}")
+    return pid
+
+def open_listener(host, port, backlog):
+    """Return the listening socket, reusing the one handed over by a reload."""
+    fd = os.environ.pop(LISTEN_FD_ENV, None)
+    if fd is not None:
+        return socket.socket(fileno=int(fd))
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    return socket.create_server((host, port), family=family, backlog=backlog)
+
+def stop_workers(pids, timeout=GRACEFUL_TIMEOUT + 5):
+    """Ask workers to stop, waiting for them and killing any that overrun ``timeout``."""
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    deadline = time.monotonic() + timeout
+    remaining = set(pids)
+    while remaining:
+        for pid in list(remaining):
+            try:
+                done, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done = pid
+            if done:
+                remaining.discard(pid)
+        if remaining and time.monotonic() >= deadline:
+            for pid in remaining:
+                os.kill(pid, signal.SIGKILL)
+            deadline = float('inf')
+        time.sleep(0.05)
+
+def serve(args):
+    listener = open_listener(args.host, args.port, args.backlog)
+    old_workers = [int(pid) for pid in os.environ.pop(OLD_WORKERS_ENV, '').split(',') if pid]
+    if not args.access_log:
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    # Signals are blocked across a reload's exec, so none is lost before the handlers are back
+    requested = []
+    signal.signal(signal.SIGHUP, lambda signum, frame: requested.append('reload'))
+    signal.signal(signal.SIGTERM, lambda signum, frame: requested.append('stop'))
+    signal.signal(signal.SIGINT, lambda signum, frame: requested.append('stop'))
+    signal.pthread_sigmask(signal.SIG_UNBLOCK, CONTROL_SIGNALS)
+
+    warm()
+    workers = {spawn_worker(listener) for _ in range(args.workers)}
+    host, port = listener.getsockname()[:2]
+    log(f"Listening on {host}:{port} with {args.workers} workers")
+
+    # After a reload, the previous generation finishes its requests and exits
+    if old_workers:
+        threading.Thread(target=stop_workers, args=(old_workers,), daemon=True).start()
+
+    while not requested:
+        for pid in list(workers):
+            try:
+                done, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done = pid
+            if done:
+                workers.discard(pid)
+                log(f"Worker {pid} exited, replacing it")
+                workers.add(spawn_worker(listener))
+        time.sleep(MONITOR_SECONDS)
+
+    # A stop wins over a reload requested at the same time
+    if 'stop' not in requested:
+        log("Reloading")
+        os.set_inheritable(listener.fileno(), True)
+        os.environ[LISTEN_FD_ENV] = str(listener.fileno())
+        os.environ[OLD_WORKERS_ENV] = ','.join(map(str, workers | set(old_workers)))
+        signal.pthread_sigmask(signal.SIG_BLOCK, CONTROL_SIGNALS)
+        os.execv(sys.executable, [sys.executable, os.path.abspath(__file__)] + sys.argv[1:])
+
+    log("Shutting down")
+    stop_workers(workers | set(old_workers))
+    listener.close()
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('SLPU_WORKERS', os.cpu_count() or 2)))
+    parser.add_argument('--backlog', type=int, default=1024)
+    parser.add_argument('--access-log', action='store_true', help='log every request')
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    serve(parse_args(sys.argv[1:]))
@@ -0,0 +1,206 @@
+"""Solve board files in bulk, without HTTP, on every core.
+
+Boards come from .svg files, directories of them, or JSON-lines files
+with an ``svg`` field per line (the /slpu/batch input format, with an
+optional ``id`` and a ``query`` object of per-board ``players``,
+``strategy``, ``engine`` and ``deadline_ms``). Each board is parsed,
+searched and simulated like /slpu does, without the result cache, and
+one JSON line per board is written to the output in input order, with
+the rolls, final positions, winner, coverage and stage timings, or the
+error that stopped it.
+
+Boards are read lazily and sent to the worker processes in chunks, with
+a bounded number of chunks in flight, so memory stays flat whatever the
+input size. The output is flushed after every chunk; running the same
+command again after an interruption skips the boards already written.
+
+    python solve_boards.py boards.jsonl --output results.jsonl --workers 8
+    python solve_boards.py boards/ --output results.jsonl --strategy guided --deadline-ms 500
+"""
+import argparse
+import collections
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import main
+
+# Chunks queued per worker, enough to keep every worker busy while results are written
+CHUNKS_PER_WORKER = 2
+
+def iter_boards(paths):
+    """Yield (id, svg, query) for every board in ``paths``, reading files one at a time.
+
+    JSON lines that cannot be read yield (id, None, error message) instead,
+    so they are reported in order with the boards around them.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            names = sorted(name for name in os.listdir(path) if name.endswith('.svg'))
+            yield from iter_boards([os.path.join(path, name) for name in names])
+        elif path.endswith(('.jsonl', '.ndjson')):
+            with open(path, encoding='utf-8') as f:
+                for number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        item = json.loads(line)
+                        board_id = str(item.get('id', f'{path}:{number}'))
+                        svg_content, query = item['svg'], item.get('query', {})
+                        if not isinstance(svg_content, str) or not isinstance(query, dict):
+                            raise TypeError("'svg' must be a string and 'query' an object")
+                    except (ValueError, KeyError, TypeError, AttributeError) as e:
+                        yield f'{path}:{number}', None, f"Invalid board line: {e}"
+                        continue
+                    yield board_id, svg_content, query
+        else:
+            with open(path, encoding='utf-8') as f:
+                yield path, f.read(), {}
+
+def solve_one(board_id, svg_content, query, defaults):
+    """Parse, search and simulate one board; return its output line as a dict."""
+    line = {'id': board_id}
+    if svg_content is None:
+        line['error'] = query  # A line iter_boards could not read
+        return line
+    options = dict(defaults, **query)
+    try:
+        players = main.parse_players(options.get('players'))
+        started = time.perf_counter()
+        board_data = main.parse_svg_board(svg_content)
+        parsed = time.perf_counter()
+
+        board = main.compile_board(board_data['board_size'], board_data['jumps'])
+        deadline, patience = main.search_budget(time.monotonic(), options.get('deadline_ms'))
+        stats = {}
+        rolls = main.generate_rolls(board.board_size, players, board.jumps, board,
+                                    options.get('strategy', main.DEFAULT_STRATEGY),
+                                    options.get('engine', main.DEFAULT_ENGINE),
+                                    deadline=deadline, patience=patience, stats=stats)
+        searched = time.perf_counter()
+
+        positions, squares_landed, winner, _ = main.simulate_game(board.board_size, players, board.jumps, rolls, board)
+        simulated = time.perf_counter()
+    except Exception as e:  # Reported per board, like /slpu/batch
+        line['error'] = f'{type(e).__name__}: {e}'
+        return line
+
+    line.update(
+        players=players,
+        rolls=rolls,
+        positions=positions,
+        winner=winner,
+        coverage=len(squares_landed) / board.board_size,
+        attempts=stats.get('attempts', 0),
+        timing_ms={
+            'parse': (parsed - started) * 1000,
+            'search': (searched - parsed) * 1000,
+            'simulate': (simulated - searched) * 1000,
+        },
+    )
+    return line
+
+def solve_chunk(chunk, defaults):
+    """Solve a list of (id, svg, query) boards in a worker process; return their output lines."""
+    return [json.dumps(solve_one(board_id, svg_content, query, defaults)) + '\n'
+            for board_id, svg_content, query in chunk]
+
+def resume_point(path):
+    """Return (lines, last id) already written to ``path``, dropping a partly written last line."""
+    if not os.path.exists(path):
+        return 0, None
+    lines = 0
+    last_id = None
+    complete = 0  # Offset just past the last complete line
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            lines += 1
+            complete += len(line)
+            last_id = json.loads(line)['id']
+    if complete != os.path.getsize(path):
+        os.truncate(path, complete)
+    return lines, last_id
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+def solve_boards(boards, output, defaults, workers, chunk_size):
+    """Solve ``boards`` into the ``output`` file, resuming after the lines it already has.
+
+    Returns a summary dict of the boards solved by this run.
+    """
+    done, last_id = resume_point(output)
+    boards = iter(boards)
+    if done:
+        # Only the last board written is kept, to check it against the output
+        skipped = collections.deque(enumerate(itertools.islice(boards, done), 1), maxlen=1)
+        count, last = skipped[0] if skipped else (0, None)
+        if count != done or last[0] != last_id:
+            raise SystemExit(f"{output} does not match the input: its line {done} is not board {last_id!r}")
+
+    summary = {'resumed_after': done, 'solved': 0, 'errors': 0, 'wins': 0, 'coverage_sum': 0.0}
+    started = time.perf_counter()
+    with open(output, 'a', encoding='utf-8') as out, ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = collections.deque()
+
+        def write_oldest():
+            for text in pending.popleft().result():
+                out.write(text)
+                line = json.loads(text)
+                summary['solved'] += 1
+                if 'error' in line:
+                    summary['errors'] += 1
+                else:
+                    summary['coverage_sum'] += line['coverage']
+                    summary['wins'] += line['winner'] == line['players'] - 1
+            out.flush()
+
+        try:
+            for chunk in chunked(boards, chunk_size):
+                pending.append(pool.submit(solve_chunk, chunk, defaults))
+                if len(pending) >= workers * CHUNKS_PER_WORKER:
+                    write_oldest()
+            while pending:
+                write_oldest()
+        except KeyboardInterrupt:
+            # Written lines are complete; the next run resumes after them
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    elapsed = time.perf_counter() - started
+    solved = summary['solved'] - summary['errors']
+    summary['elapsed_s'] = elapsed
+    summary['boards_per_s'] = summary['solved'] / elapsed if elapsed else 0.0
+    summary['mean_coverage'] = summary.pop('coverage_sum') / solved if solved else None
+    return summary
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('inputs', nargs='+', help='.svg files, directories of them or JSON-lines files')
+    parser.add_argument('--output', required=True, help='JSON-lines file to write, resumed if it exists')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=int, default=16, help='boards sent to a worker at a time')
+    parser.add_argument('--players', type=int, default=main.DEFAULT_PLAYERS)
+    parser.add_argument('--strategy', choices=main.STRATEGIES, default=main.DEFAULT_STRATEGY)
+    parser.add_argument('--engine', choices=main.ENGINES, default=main.DEFAULT_ENGINE)
+    parser.add_argument('--deadline-ms', help='per-board search budget')
+    return parser.parse_args(argv)
+
+def main_cli(argv=None):
+    args = parse_args(argv)
+    defaults = {'players': args.players, 'strategy': args.strategy, 'engine': args.engine}
+    if args.deadline_ms is not None:
+        defaults['deadline_ms'] = args.deadline_ms
+    summary = solve_boards(iter_boards(args.inputs), args.output, defaults, args.workers, args.chunk_size)
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+    return summary
+
+if __name__ == '__main__':
+    main_cli(sys.argv[1:])
@@ -0,0 +1,133 @@
+import threading
+import time
+
+import admission
+import main
+import metrics
+
+print("Admission control test:")
+
+def hold(control, entered, release, modes):
+    with control.admit() as mode:
+        modes.append(mode)
+        entered.set()
+        release.wait()
+
+def occupy(control):
+    """Take every slot of ``control`` from background threads; return the release event and threads."""
+    release = threading.Event()
+    threads = []
+    for _ in range(control.limit):
+        entered = threading.Event()
+        thread = threading.Thread(target=hold, args=(control, entered, release, []))
+        thread.start()
+        entered.wait()
+        threads.append(thread)
+    return release, threads
+
+# A request waiting in the queue gets the slot freed by another one
+control = admission.AdmissionControl(1, 1, 1.0)
+release, threads = occupy(control)
+modes = []
+waiter = threading.Thread(target=hold, args=(control, threading.Event(), release, modes))
+waiter.start()
+time.sleep(0.05)
+depth = metrics.admission_queue_depth.value()
+release.set()
+for thread in threads + [waiter]:
+    thread.join()
+if modes == ['full'] and depth == 1 and control.active == 0 and control.waiting == 0:
+    print("✓ Queued request runs when a slot frees up")
+else:
+    print(f"✗ Queued request got {modes}, queue depth {depth}")
+
+# Overflow requests are degraded, or shed under the shed policy
+control = admission.AdmissionControl(1, 0, 1.0)
+release, threads = occupy(control)
+degraded = metrics.overload_requests.value(action='degraded')
+with control.admit() as mode:
+    pass
+shed_control = admission.AdmissionControl(1, 0, 1.0, 'shed')
+shed_release, shed_threads = occupy(shed_control)
+shed = metrics.overload_requests.value(action='shed')
+try:
+    with shed_control.admit():
+        shed_mode = 'admitted'
+except admission.Overloaded:
+    shed_mode = 'shed'
+for event in (release, shed_release):
+    event.set()
+for thread in threads + shed_threads:
+    thread.join()
+if (mode, shed_mode) == ('degraded', 'shed') and metrics.overload_requests.value(action='degraded') == degraded + 1 \
+        and metrics.overload_requests.value(action='shed') == shed + 1:
+    print("✓ Overflow degraded or shed by policy, and counted")
+else:
+    print(f"✗ Overflow got {mode} and {shed_mode}")
+
+# Waiting in the queue ends at the queue timeout or the request's deadline, whichever is first
+control = admission.AdmissionControl(1, 4, 0.1)
+release, threads = occupy(control)
+started = time.monotonic()
+with control.admit() as mode:
+    waited = time.monotonic() - started
+started = time.monotonic()
+with control.admit(deadline=time.monotonic() + 0.02) as deadline_mode:
+    deadline_waited = time.monotonic() - started
+release.set()
+for thread in threads:
+    thread.join()
+if mode == deadline_mode == 'degraded' and 0.09 <= waited < 0.5 and deadline_waited < 0.08:
+    print("✓ Queue wait bounded by its timeout and the request deadline")
+else:
+    print(f"✗ Waited {waited:.3f}s ({mode}) and {deadline_waited:.3f}s ({deadline_mode})")
+
+# Degraded requests have their own limit
+control = admission.AdmissionControl(1, 0, 0, degraded_limit=1)
+release, threads = occupy(control)
+with control.admit() as mode:
+    try:
+        with control.admit():
+            inner = 'admitted'
+    except admission.Overloaded:
+        inner = 'shed'
+release.set()
+for thread in threads:
+    thread.join()
+if (mode, inner) == ('degraded', 'shed'):
+    print("✓ Degraded requests past their limit are shed")
+else:
+    print(f"✗ Degraded limit gave {mode}, {inner}")
+
+# The endpoint sheds with a 503, or answers from a cheaper search that is not cached
+svg_content = open('test_board.svg').read()
+client = main.app.test_client()
+main.result_cache = main.cache.ResultCache(16)
+board_data = main.parse_svg_board(svg_content)
+key = main.cache.board_signature(board_data['board_width'], board_data['board_height'], board_data['jumps'])
+original = main.admission_control
+try:
+    main.admission_control = admission.AdmissionControl(0, 0, 0, 'shed')
+    response = client.post('/slpu', data=svg_content)
+    if response.status_code == 503 and response.headers.get('Retry-After'):
+        print("✓ /slpu sheds with 503 when saturated")
+    else:
+        print(f"✗ Saturated /slpu answered {response.status_code}")
+
+    main.admission_control = admission.AdmissionControl(0, 0, 0, 'degrade', degraded_limit=1)
+    started = time.monotonic()
+    response = client.post('/slpu', data=svg_content)
+    elapsed = time.monotonic() - started
+    if (response.status_code == 200 and response.headers.get('X-Degraded') == '1'
+            and '<circle' in response.get_data(as_text=True) and main.result_cache.get(key) is None and elapsed < 1):
+        print("✓ /slpu degrades to a cheaper search that is not cached")
+    else:
+        print(f"✗ Degraded /slpu answered {response.status_code} {dict(response.headers)}")
+finally:
+    main.admission_control = original
+
+response = client.post('/slpu', data=svg_content)
+if response.status_code == 200 and 'X-Degraded' not in response.headers and main.result_cache.get(key) is not None:
+    print("✓ Admitted requests run the full search")
+else:
+    print(f"✗ Admitted /slpu answered {response.status_code} {dict(response.headers)}")
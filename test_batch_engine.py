@@ -0,0 +1,41 @@
+import main
+import batch_engine
+
+print("Batch engine test:")
+
+if not batch_engine.available():
+    print("- NumPy not installed, skipping batch engine test")
+else:
+    import numpy as np
+
+    board_size = 64
+    jumps = ['8:26', '29:35', '40:12', '50:3']
+    board = main.compile_board(board_size, jumps)
+
+    # Each batched game must match the pure-Python reference simulation
+    rng = np.random.default_rng(42)
+    for players in (2, 3):
+        rolls = rng.integers(1, 7, size=(500, 80), dtype=np.int32)
+        winners, lengths, coverage = batch_engine.simulate_batch(board, players, rolls)
+
+        mismatches = 0
+        for game in range(rolls.shape[0]):
+            positions, squares_landed, winner, roll_count = main.simulate_game(
+                board_size, players, jumps, rolls[game].tolist(), board
+            )
+            expected = (-1 if winner is None else winner, roll_count, len(squares_landed))
+            if (winners[game], lengths[game], coverage[game]) != expected:
+                mismatches += 1
+
+        if mismatches == 0:
+            print(f"✓ {players} players: batch simulation matches simulate_game")
+        else:
+            print(f"✗ {players} players: {mismatches} games differ from simulate_game")
+
+    # Rolls from the numpy engine must replay to a win for the last player
+    rolls = main.generate_rolls(board_size, 2, jumps, board, engine='numpy')
+    positions, squares_landed, winner, _ = main.simulate_game(board_size, 2, jumps, rolls, board)
+    if winner == 1:
+        print(f"✓ numpy engine generated {len(rolls)} rolls, last player wins")
+    else:
+        print("✗ Last player did not win")
@@ -0,0 +1,26 @@
+import bench
+import main
+import random
+
+print("Benchmark board generator test:")
+
+# Generated boards parse back to the requested size and jump count, up to the 25% limit
+rng = random.Random(5)
+for width, height in ((4, 4), (8, 6), (16, 16), (32, 32)):
+    jump_count = (width * height // 4) // 2
+    board_data = main.parse_svg_board(bench.random_board_svg(width, height, jump_count, rng))
+    if (board_data['board_width'], board_data['board_height'], len(board_data['jumps'])) == (width, height, jump_count):
+        print(f"✓ {width}x{height} board with {jump_count} jumps parses back")
+    else:
+        print(f"✗ {width}x{height} board parsed as {board_data['board_width']}x{board_data['board_height']} "
+              f"with {len(board_data['jumps'])} jumps")
+
+# The same seed gives the same report
+args = bench.parse_args(['--repeat', '3', '--seed', '9'])
+client = main.app.test_client()
+first = bench.bench_config(8, 8, 0.25, args, client)
+second = bench.bench_config(8, 8, 0.25, args, client)
+if first['coverage'] == second['coverage'] and first['win_rate'] == 1:
+    print(f"✓ Seeded runs are reproducible, mean coverage {first['coverage']['mean']:.2%}")
+else:
+    print("✗ Seeded runs differ")
@@ -0,0 +1,88 @@
+import main
+import cache
+import os
+import tempfile
+
+print("Result cache test:")
+
+# Cosmetic markup and jump order must not change the signature
+svg_a = '''<svg viewBox="0 0 512 512" xmlns="http://www.w3.org/2000/svg">
+  <rect width="100%" height="100%" fill="#f9f9f9" />
+  <line x1="224" y1="480" x2="192" y2="448" stroke="BLUE" />
+  <line x1="96" y1="448" x2="64" y2="416" stroke="RED" />
+</svg>'''
+svg_b = '''<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 512 512">
+  <line x1="96.0" y1="448" x2="64" y2="416" stroke="GREEN" marker-end="url(#end)"/>
+  <line x1="224" y1="480" x2="192" y2="448" stroke="AQUA"/>
+</svg>'''
+board_a = main.parse_svg_board(svg_a)
+board_b = main.parse_svg_board(svg_b)
+signature_a = cache.board_signature(board_a['board_width'], board_a['board_height'], board_a['jumps'])
+signature_b = cache.board_signature(board_b['board_width'], board_b['board_height'], board_b['jumps'])
+if signature_a == signature_b:
+    print("✓ Signature ignores markup and jump order")
+else:
+    print("✗ Signature depends on markup")
+
+# The LRU evicts the least recently used entry
+lru = cache.LRUCache(2)
+lru.put('a', 1)
+lru.put('b', 2)
+lru.get('a')
+lru.put('c', 3)
+if lru.get('b') is None and lru.get('a') == 1 and lru.get('c') == 3:
+    print("✓ LRU evicts the least recently used entry")
+else:
+    print("✗ LRU eviction order is wrong")
+
+# The disk tier survives a new cache instance, and worse results don't replace better ones
+with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, 'results.db')
+    cache.ResultCache(8, path).put('board', {'rolls': [1, 2], 'coverage': 0.1})
+    restarted = cache.ResultCache(8, path)
+    restarted.put('board', {'rolls': [3, 4], 'coverage': 0.2})
+    if restarted.get('board') == {'rolls': [1, 2], 'coverage': 0.1}:
+        print("✓ Disk tier keeps the best result across restarts")
+    else:
+        print("✗ Disk tier lost or replaced the best result")
+
+# A second solve of the same board is served from the cache
+first = main.solve_board(board_a)
+second = main.solve_board(board_b)
+if first is second:
+    print("✓ Repeated board is served from the cache")
+else:
+    print("✗ Repeated board was solved again")
+
+# Searches cut short by a deadline or a cancel are not cached for requests with more time
+import threading
+import time
+
+main.result_cache = cache.ResultCache(8)
+key = cache.board_signature(board_a['board_width'], board_a['board_height'], board_a['jumps'])
+budgeted = main.solve_board(board_a, deadline=time.monotonic() + 0.003)
+cancel = threading.Event()
+cancel.set()
+cancelled = main.solve_board(board_a, cancel=cancel)
+if main.result_cache.get(key) is None:
+    print("✓ Budgeted and cancelled searches not cached")
+else:
+    print("✗ A cut-short search was cached")
+
+full = main.solve_board(board_a)
+if main.result_cache.get(key) is full and main.solve_board(board_a, deadline=time.monotonic() + 0.003) is full:
+    print("✓ Full searches cached and served to budgeted requests")
+else:
+    print("✗ Full search not cached")
+
+# Invalid options fail the same way whether or not the board is cached
+rejected = []
+for options in ({'strategy': 'bogus'}, {'engine': 'bogus'}):
+    try:
+        main.solve_board(board_a, **options)
+    except ValueError:
+        rejected.append(options)
+if len(rejected) == 2:
+    print("✓ Unknown strategy and engine rejected before the cache lookup")
+else:
+    print(f"✗ Cached board answered invalid options {rejected}")
@@ -0,0 +1,62 @@
+import main
+import random
+
+# Reference implementation of one move, following the original per-roll rules
+def reference_move(position, die_type, die_roll, board_size, jump_map):
+    if die_type == 'regular':
+        movement = die_roll
+        if die_roll == 6:
+            die_type = 'power'
+    else:
+        movement = 2 ** die_roll
+        if die_roll == 1:
+            die_type = 'regular'
+    new_position = position + movement
+    if new_position > board_size:
+        new_position = board_size - (new_position - board_size)
+    new_position = max(1, min(board_size, new_position))
+    return new_position, main.apply_jump(new_position, jump_map, movement, board_size), die_type
+
+board_size = 64
+jumps = ['8:26', '29:35', '40:12', '50:3']
+jump_map = main.parse_jumps(jumps, board_size)
+board = main.compile_board(board_size, jumps)
+
+print("Compiled board test:")
+
+# Every transition in the table must match the reference rules
+mismatches = 0
+for position in range(board_size + 1):
+    for die_mode, die_type in ((main.REGULAR_DIE, 'regular'), (main.POWER_DIE, 'power')):
+        for die_roll in range(1, 7):
+            landing, destination, next_type = reference_move(position, die_type, die_roll, board_size, jump_map)
+            index = (position * 2 + die_mode) * 6 + die_roll - 1
+            expected_mode = main.REGULAR_DIE if next_type == 'regular' else main.POWER_DIE
+            if (board.landing[index], board.destination[index], board.next_mode[index]) != (landing, destination, expected_mode):
+                mismatches += 1
+
+if mismatches == 0:
+    print("✓ Transition table matches reference rules")
+else:
+    print(f"✗ {mismatches} transitions differ from reference rules")
+
+# simulate_game with a compiled board must agree with one compiled on the fly
+rng = random.Random(1234)
+agree = True
+for _ in range(200):
+    rolls = [rng.randint(1, 6) for _ in range(rng.randint(1, 120))]
+    if main.simulate_game(board_size, 2, jumps, rolls) != main.simulate_game(board_size, 2, jumps, rolls, board):
+        agree = False
+
+if agree:
+    print("✓ simulate_game agrees with and without a precompiled board")
+else:
+    print("✗ simulate_game results differ with a precompiled board")
+
+# Rolls from generate_rolls must replay to a win for the last player
+rolls = main.generate_rolls(board_size, 2, jumps, board)
+positions, squares_landed, winner, _ = main.simulate_game(board_size, 2, jumps, rolls, board)
+if winner == 1:
+    print(f"✓ Generated {len(rolls)} rolls, last player wins")
+else:
+    print("✗ Last player did not win")
@@ -0,0 +1,56 @@
+import heuristics
+import main
+import time
+
+board_size = 1024
+jumps = ['10:200', '300:20', '500:900']
+
+# Allowed overrun past the budget: the attempt or refinement step in progress
+# when the deadline passes, plus timer slack on a loaded machine
+BUDGET = 0.05
+TOLERANCE = 0.025
+
+print("Search deadline test:")
+
+def check(name, board, budget=BUDGET):
+    stats = {}
+    started = time.monotonic()
+    rolls = main.generate_rolls(board_size, 2, jumps, board, strategy, engine,
+                                deadline=started + budget, patience=main.PLATEAU_ATTEMPTS, stats=stats)
+    elapsed = time.monotonic() - started
+    positions, squares_landed, winner, _ = main.simulate_game(board_size, 2, jumps, rolls, board)
+
+    if elapsed <= budget + TOLERANCE:
+        print(f"✓ {name}: search took {elapsed * 1000:.0f}ms with a {budget * 1000:.0f}ms budget")
+    else:
+        print(f"✗ {name}: search took {elapsed * 1000:.0f}ms, over its {budget * 1000:.0f}ms budget")
+    if winner == 1:
+        print(f"✓ {name}: last player wins, coverage {len(squares_landed) / board_size:.2%}")
+    else:
+        print(f"✗ {name}: last player did not win")
+    return stats
+
+for strategy in main.STRATEGIES:
+    for engine in main.ENGINES:
+        # A fresh board, so guided has to decide whether its tables fit the budget
+        check(f"{strategy} strategy, {engine} engine", main.compile_board(board_size, jumps))
+
+# Guided search proper, once the board's distance tables are built
+strategy = 'guided'
+for engine in main.ENGINES:
+    board = main.compile_board(board_size, jumps)
+    heuristics.board_tables(board)
+    stats = check(f"guided search with tables, {engine} engine", board)
+    if stats.get('attempts'):
+        print(f"✓ guided search with tables, {engine} engine: {stats['attempts']} attempts before '{stats['stop']}'")
+    else:
+        print(f"✗ guided search with tables, {engine} engine: did not search, {stats}")
+
+# An already expired deadline still yields a winning sequence
+board = main.compile_board(board_size, jumps)
+rolls = main.generate_rolls(board_size, 2, jumps, board, deadline=time.monotonic())
+positions, squares_landed, winner, _ = main.simulate_game(board_size, 2, jumps, rolls, board)
+if winner == 1:
+    print("✓ Expired deadline still returns a win for the last player")
+else:
+    print("✗ Expired deadline returned no win")
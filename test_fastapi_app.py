@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import time
+import fastapi_app
+import main
+
+# Drive the ASGI app directly, without a server or HTTP client
+def post(path, body, query=b''):
+    messages = []
+
+    async def receive():
+        if not messages:
+            messages.append(None)
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'POST',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'root_path': '', 'query_string': query,
+        'headers': [(b'content-type', b'image/svg+xml')], 'client': ('127.0.0.1', 1), 'server': ('127.0.0.1', 8000),
+    }
+    asyncio.run(fastapi_app.app(scope, receive, send))
+    status = messages[1]['status']
+    response_body = b''.join(m.get('body', b'') for m in messages[2:])
+    return status, response_body.decode()
+
+print("FastAPI app test:")
+
+svg_content = open('test_board.svg', 'rb').read()
+status, response = post('/slpu', svg_content, b'strategy=solver')
+response_single = response
+if status == 200 and '<circle' in response and response.endswith('</ns0:svg>'):
+    print("✓ /slpu returns the board with player positions")
+else:
+    print(f"✗ Unexpected /slpu response: {status} {response[:80]}")
+
+if response == main.solve_svg(svg_content, 'solver'):
+    print("✓ Response matches the Flask pipeline")
+else:
+    print("✗ Response differs from the Flask pipeline")
+
+status, response = post('/slpu', b'<svg viewBox="0 0 100 100"')
+if response == main.EMPTY_SVG:
+    print("✓ Invalid board returns the empty SVG")
+else:
+    print("✗ Invalid board did not return the empty SVG")
+
+# A disconnected client cancels the running search
+class DisconnectedRequest:
+    async def is_disconnected(self):
+        return True
+
+def wait_for_cancel(cancel):
+    return cancel.wait(5)
+
+started = time.monotonic()
+cancelled = asyncio.run(fastapi_app.run_cancellable(DisconnectedRequest(), threading.Event(), wait_for_cancel))
+if cancelled and time.monotonic() - started < 1:
+    print("✓ Client disconnect cancels the search")
+else:
+    print("✗ Search was not cancelled on disconnect")
+
+# Batch endpoint: duplicate boards are solved once and every board gets a line
+import json
+
+calls = []
+original_solve_board = main.solve_board
+def counting_solve_board(board_data, *args):
+    calls.append(board_data['jumps'])
+    return original_solve_board(board_data, *args)
+main.solve_board = counting_solve_board
+
+try:
+    svg_text = svg_content.decode()
+    batch = '\n'.join([
+        json.dumps({'id': 'a', 'svg': svg_text}),
+        json.dumps({'id': 'b', 'svg': svg_text.replace('BLUE', 'GREEN')}),
+        json.dumps({'id': 'c', 'svg': '<svg viewBox="0 0 100 100"'}),
+        'not json',
+    ]).encode()
+    status, response = post('/slpu/batch', batch, b'strategy=solver')
+    results = {line['id']: line for line in map(json.loads, response.splitlines())}
+
+    if sorted(map(str, results)) == ['4', 'a', 'b', 'c']:
+        print("✓ Batch returns one line per board")
+    else:
+        print(f"✗ Batch returned ids {sorted(results)}")
+
+    if len(calls) == 1 and results['a']['svg'] == response_single:
+        print("✓ Duplicate boards in a batch are solved once")
+    else:
+        print(f"✗ Batch solved {len(calls)} boards for one unique board")
+
+    if 'error' in results['c'] and results['c']['svg'] == main.EMPTY_SVG and 'error' in results[4]:
+        print("✓ Invalid boards and lines are reported per line")
+    else:
+        print("✗ Invalid boards were not reported")
+finally:
+    main.solve_board = original_solve_board
+
+# /verify replays roll sequences like the Flask route
+verify_body = json.dumps({'svg': svg_content.decode(), 'sequences': [[1, 2, 3], [6, 6, 6]]}).encode()
+status, response = post('/verify', verify_body)
+if status == 200 and json.loads(response) == main.verify_request(json.loads(verify_body)):
+    print("✓ /verify returns the same results as the Flask route")
+else:
+    print(f"✗ Unexpected /verify response: {status} {response[:80]}")
+
+status, response = post('/verify', b'not json')
+if status == 400 and 'error' in json.loads(response):
+    print("✓ /verify rejects invalid JSON")
+else:
+    print(f"✗ Invalid /verify body answered {status}")
+
+# A batch larger than the search slots waits for them instead of shedding its own boards
+import random
+import admission
+import bench
+
+original = main.admission_control
+original_executor = fastapi_app.executor
+fastapi_app.executor = fastapi_app.ThreadPoolExecutor(max_workers=8)
+main.result_cache = main.cache.ResultCache(0)
+rng = random.Random(7)
+batch = '\n'.join(json.dumps({'id': index, 'svg': bench.random_board_svg(8, 8, 4, rng)}) for index in range(8)).encode()
+try:
+    main.admission_control = admission.AdmissionControl(1, 0, 0, 'shed')
+    shed = main.metrics.overload_requests.value(action='shed')
+    status, response = post('/slpu/batch', batch)
+    lines = [json.loads(line) for line in response.splitlines()]
+    if (len(lines) == 8 and not any('error' in line for line in lines)
+            and main.metrics.overload_requests.value(action='shed') == shed):
+        print("✓ Batch boards share the search slots without shedding each other")
+    else:
+        print(f"✗ Batch over one slot gave {[line.get('error') for line in lines]}")
+
+    # Boards shed by a saturated server are reported, but not counted as errors
+    main.admission_control = admission.AdmissionControl(0, 0, 0, 'shed')
+    errors = main.metrics.errors.value()
+    status, response = post('/slpu/batch', batch)
+    lines = [json.loads(line) for line in response.splitlines()]
+    if (len(lines) == 8 and all('error' in line for line in lines) and main.metrics.errors.value() == errors
+            and main.metrics.overload_requests.value(action='shed') == shed + 8):
+        print("✓ Shed batch boards reported without counting as errors")
+    else:
+        print(f"✗ Shed batch counted {main.metrics.errors.value() - errors} errors")
+finally:
+    main.admission_control = original
+    fastapi_app.executor = original_executor
+
+# Oversized bodies are counted under the same validation reason as in the Flask app
+failures = main.metrics.validation_failures.value(reason='body_too_large')
+status, response = post('/slpu', b' ' * (main.MAX_SVG_BYTES + 1))
+if response == main.EMPTY_SVG and main.metrics.validation_failures.value(reason='body_too_large') == failures + 1:
+    print("✓ Oversized body rejected as body_too_large")
+else:
+    print(f"✗ Oversized body answered {status} {response[:40]}")
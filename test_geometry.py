@@ -0,0 +1,55 @@
+import geometry
+import main
+
+print("Geometry test:")
+
+# Tables agree with the reference arithmetic on every board size
+agree = True
+for width in range(4, 33):
+    for height in range(4, 33, 2):
+        geom = geometry.board_geometry(width, height)
+        for square in range(1, width * height + 1):
+            x, y = geometry.square_to_coord(square, width, height)
+            if geom.centers[square] != (x, y) or geom.square_at(x, y) != square:
+                agree = False
+            if geom.square_at(x - 16, y - 16) != square or geom.square_at(x + 15, y + 15) != square:
+                agree = False
+            # Every point inside the cell, not just its corner, maps the same way in both
+            for dx, dy in ((-16, -16), (0, 0), (15, 15), (-16, 15), (15, -16), (-5, 9)):
+                if geom.square_at(x + dx, y + dy) != geometry.coord_to_square(x + dx, y + dy, width, height):
+                    agree = False
+
+if agree:
+    print("✓ Lookup tables match coord_to_square and square_to_coord")
+else:
+    print("✗ Lookup tables differ from the reference mapping")
+
+# Corners of a 4x4 board follow the boustrophedon numbering
+geom = geometry.board_geometry(4, 4)
+corners = geom.squares_at([(0, 96), (96, 96), (96, 64), (0, 64), (0, 0)])
+if corners == [1, 4, 5, 8, 16]:
+    print("✓ Boustrophedon numbering")
+else:
+    print(f"✗ Unexpected squares {corners}")
+
+# Points off the board keep the arithmetic result
+points = [(-32, 96), (128, 96), (0, 128), (0, -32)]
+if geom.squares_at(points) == [geometry.coord_to_square(x, y, 4, 4) for x, y in points]:
+    print("✓ Off-board points match coord_to_square")
+else:
+    print("✗ Off-board points differ from coord_to_square")
+
+if geom.centers_of([1, 16]) == [(16, 112), (16, 16)]:
+    print("✓ Batched centers")
+else:
+    print(f"✗ Unexpected centers {geom.centers_of([1, 16])}")
+
+if geometry.board_geometry(4, 4) is geom and main.square_centers(4, 4) is geom.centers:
+    print("✓ Tables built once per board size")
+else:
+    print("✗ Tables rebuilt for the same board size")
+
+if [geometry.parse_coordinate(value) for value in ('48', '48.9', ' 7 ', '1e2', '-3.5')] == [48, 48, 7, 100, -3]:
+    print("✓ Coordinate parsing")
+else:
+    print("✗ Coordinate parsing")
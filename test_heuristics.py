@@ -0,0 +1,88 @@
+import random
+import time
+import heuristics
+import main
+
+board_size = 64
+jumps = ['8:26', '29:35', '40:12', '50:3']
+board = main.compile_board(board_size, jumps)
+
+print("Distance tables test:")
+
+# Brute-force fewest rolls by relaxing every transition until nothing changes
+expected = [heuristics.UNREACHABLE] * ((board_size + 1) * 2)
+expected[board_size * 2] = expected[board_size * 2 + 1] = 0
+changed = True
+while changed:
+    changed = False
+    for state in range(board_size * 2):
+        best = min(expected[board.next_state[state * 6 + roll]] for roll in range(6)) + 1
+        if best < expected[state]:
+            expected[state] = best
+            changed = True
+
+tables = heuristics.board_tables(board)
+if tables.rolls_to_finish == expected:
+    print("✓ Rolls to finish match brute force")
+else:
+    print("✗ Rolls to finish differ from brute force")
+
+if heuristics.board_tables(board) is tables:
+    print("✓ Tables computed once per board")
+else:
+    print("✗ Tables recomputed")
+
+# Expected finish times satisfy E = 1 + mean(E[next]) and agree without NumPy
+values = tables.expected_rolls
+residual = max(abs(1 + sum(values[board.next_state[state * 6 + roll]] for roll in range(6)) / 6 - values[state])
+               for state in range(board_size * 2) if values[state] != float('inf'))
+numpy = heuristics.np
+heuristics.np = None
+try:
+    python_values = heuristics.expected_rolls(board, tables.rolls_to_finish)
+finally:
+    heuristics.np = numpy
+if residual < 0.05 and abs(python_values[0] - values[0]) < 0.5:
+    print(f"✓ Expected finish time from the start: {values[0]:.1f} rolls")
+else:
+    print(f"✗ Expected finish times inconsistent (residual {residual}, {values[0]} vs {python_values[0]})")
+
+# Guided search wins with the last player and covers no more than random search
+stats = {}
+guided = heuristics.guided_rolls(board, 2, 2000, main.MAX_ROLLS, 0, rng=random.Random(5), stats=stats)
+random_rolls = main.monte_carlo_rolls(board, 2, attempts=2000, rng=random.Random(5))
+_, guided_landed, winner, _ = main.simulate_game(board_size, 2, jumps, guided, board)
+_, random_landed, _, _ = main.simulate_game(board_size, 2, jumps, random_rolls, board)
+if winner == 1 and len(guided_landed) <= len(random_landed):
+    print(f"✓ Guided search wins covering {len(guided_landed)} squares (random: {len(random_landed)})")
+else:
+    print(f"✗ Guided search winner {winner}, {len(guided_landed)} squares (random: {len(random_landed)})")
+
+if stats['attempts'] == 2000 and 0 < stats['wins'] <= 2000:
+    print("✓ Search stats recorded")
+else:
+    print(f"✗ Unexpected stats {stats}")
+
+rolls = main.generate_rolls(board_size, 3, jumps, strategy='guided')
+if main.simulate_game(board_size, 3, jumps, rolls)[2] == 2:
+    print("✓ generate_rolls runs the guided strategy")
+else:
+    print("✗ generate_rolls guided strategy did not win with the last player")
+
+# Compiled boards, and the tables on them, are shared between requests for the same board
+shared = main.shared_board(board_size, jumps)
+heuristics.board_tables(shared)
+if main.shared_board(board_size, list(reversed(jumps))) is shared and shared.tables is not None:
+    print("✓ Compiled board and tables shared across requests")
+else:
+    print("✗ Compiled board rebuilt for the same board")
+
+# A deadline too close to build the tables falls back to the solver
+fresh = main.compile_board(board_size, jumps)
+stats = {}
+started = time.monotonic()
+rolls = main.generate_rolls(board_size, 2, jumps, fresh, 'guided', deadline=started + 0.001, stats=stats)
+if fresh.tables is None and rolls == main.solve_rolls(fresh, 2) and stats.get('stop') == 'deadline':
+    print("✓ Guided search falls back to the solver when the tables do not fit the deadline")
+else:
+    print(f"✗ Guided search under a tight deadline: tables built {fresh.tables is not None}, stats {stats}")
@@ -0,0 +1,100 @@
+import gzip
+import random
+
+import bench
+
+import http_cache
+import main
+import metrics
+
+print("HTTP caching test:")
+
+# Accept-Encoding negotiation honours q-values and the size threshold
+big = http_cache.COMPRESS_MIN_BYTES
+cases = [
+    ('gzip, deflate', big, 'gzip'),
+    ('gzip;q=0, identity', big, None),
+    ('*', big, http_cache.available_encodings()[0]),
+    ('deflate', big, None),
+    (None, big, None),
+    ('gzip', big - 1, None),
+]
+wrong = [(header, got) for header, size, expected in cases
+         if (got := http_cache.choose_encoding(header, size)) != expected]
+if not wrong:
+    print("✓ Content coding negotiated from Accept-Encoding")
+else:
+    print(f"✗ Wrong codings chosen: {wrong}")
+
+if (http_cache.etag_matches('"abc-gzip"', 'abc') and http_cache.etag_matches('W/"x", "abc"', 'abc')
+        and http_cache.etag_matches('*', 'abc') and not http_cache.etag_matches('"abcd"', 'abc')):
+    print("✓ If-None-Match compared across encodings")
+else:
+    print("✗ If-None-Match comparison wrong")
+
+# A board with enough jumps to render past the compression threshold
+svg_content = bench.random_board_svg(32, 32, 60, random.Random(4))
+main.result_cache = main.cache.ResultCache(16)
+main.response_cache = main.cache.LRUCache(16)
+client = main.app.test_client()
+
+# A first request renders and tags the board
+first = client.post('/slpu', data=svg_content, headers={'Accept-Encoding': 'gzip'})
+tag = first.headers.get('ETag')
+identity = client.post('/slpu', data=svg_content)
+if (first.headers.get('Content-Encoding') == 'gzip' and tag and tag.endswith('-gzip"')
+        and gzip.decompress(first.get_data()) == identity.get_data()
+        and identity.headers['ETag'] == tag.replace('-gzip', '')
+        and len(first.get_data()) < len(identity.get_data())):
+    print(f"✓ Large response gzip-compressed ({len(identity.get_data())} -> {len(first.get_data())} bytes)")
+else:
+    print(f"✗ Unexpected compression headers {dict(first.headers)}")
+
+if identity.get_data(as_text=True) == main.solve_svg(svg_content) and first.headers.get('Vary') == 'Accept-Encoding':
+    print("✓ Uncompressed body unchanged from the /slpu pipeline")
+else:
+    print("✗ Body differs from solve_svg")
+
+# Repeated requests reuse the stored encodings
+stored = main.response_cache.get(tag.strip('"').rpartition('-')[0])
+hits = metrics.http_cache_responses.value(result='hit')
+again = client.post('/slpu', data=svg_content, headers={'Accept-Encoding': 'gzip'})
+if (stored is not None and 'gzip' in stored.encoded and again.get_data() == first.get_data()
+        and metrics.http_cache_responses.value(result='hit') == hits + 1):
+    print("✓ Cached response served with its stored compressed bytes")
+else:
+    print("✗ Cached response not reused")
+
+# A matching validator gets a 304 without a body
+not_modified = metrics.http_cache_responses.value(result='not_modified')
+response = client.post('/slpu', data=svg_content, headers={'If-None-Match': tag})
+if (response.status_code == 304 and response.get_data() == b'' and response.headers['ETag'] == identity.headers['ETag']
+        and metrics.http_cache_responses.value(result='not_modified') == not_modified + 1):
+    print("✓ Matching If-None-Match answered with 304")
+else:
+    print(f"✗ Conditional request answered {response.status_code}")
+
+# The 304 names the encoding the 200 would have been sent in
+gzipped = client.post('/slpu', data=svg_content, headers={'If-None-Match': identity.headers['ETag'],
+                                                          'Accept-Encoding': 'gzip'})
+main.response_cache = main.cache.LRUCache(16)
+uncached = client.post('/slpu', data=svg_content, headers={'If-None-Match': tag, 'Accept-Encoding': 'gzip'})
+if (gzipped.status_code == uncached.status_code == 304
+        and gzipped.headers['ETag'] == uncached.headers['ETag'] == first.headers['ETag']):
+    print("✓ 304 carries the ETag of the negotiated encoding")
+else:
+    print(f"✗ 304 carried {gzipped.headers.get('ETag')} and {uncached.headers.get('ETag')}, not {tag}")
+
+response = client.post('/slpu', data=svg_content, headers={'If-None-Match': '"stale"'})
+if response.status_code == 200 and response.get_data() == identity.get_data():
+    print("✓ Stale validator gets the full response")
+else:
+    print(f"✗ Stale validator answered {response.status_code}")
+
+# The same board in different markup renders differently, so it gets another tag
+restyled = svg_content.replace('<svg', '<svg data-theme="dark"', 1)
+response = client.post('/slpu', data=restyled, headers={'If-None-Match': tag})
+if response.status_code == 200 and response.headers['ETag'] != identity.headers['ETag']:
+    print("✓ ETag depends on the board markup")
+else:
+    print(f"✗ Restyled board answered {response.status_code} with {response.headers.get('ETag')}")
@@ -11,6 +11,9 @@ svg_content_large = '''<svg viewBox="0 0 512 512" xmlns="http://www.w3.org/2000/
 # Mock the request object
 mock_request = Mock()
 mock_request.data.decode.return_value = svg_content_large
+mock_request.args = {}
+mock_request.headers = {}
+mock_request.content_length = None
 
 # Temporarily replace the request in the module
 original_request = main.request
@@ -0,0 +1,70 @@
+import json
+import os
+import tempfile
+import loadtest
+import main
+
+print("Load test harness test:")
+
+# Coverage is reported in a response header
+client = main.app.test_client()
+svg_content = open('test_board.svg').read()
+response = client.post('/slpu', data=svg_content, query_string={'strategy': 'solver'})
+coverage = response.headers.get('X-Coverage')
+if coverage is not None and 0 < float(coverage) <= 1:
+    print(f"✓ /slpu reports X-Coverage {coverage}")
+else:
+    print(f"✗ Missing or invalid X-Coverage header {coverage!r}")
+
+# Recorded boards load from .svg and JSON-lines files
+with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as f:
+    f.write(json.dumps({'id': 'a', 'svg': svg_content, 'query': {'players': 3}}) + '\n\n')
+    f.write(json.dumps({'id': 'b', 'svg': svg_content}) + '\n')
+try:
+    boards = loadtest.load_boards(['test_board.svg', f.name])
+finally:
+    os.unlink(f.name)
+if [query for _, query in boards] == [{}, {'players': 3}, {}] and boards[0][0] == svg_content.encode():
+    print("✓ Boards loaded from .svg and JSON-lines files")
+else:
+    print("✗ Boards not loaded as expected")
+
+# A short run against a locally started server
+report_path = tempfile.mktemp(suffix='.json')
+loadtest.main_cli(['--server', 'flask', '--server-workers', '1', '--rate', '10', '--duration', '1',
+                   '--sizes', '8x8', '--count', '3', '--strategy', 'solver', '--output', report_path])
+with open(report_path) as f:
+    report = json.load(f)
+os.unlink(report_path)
+step = report['steps'][0]
+if step['requests'] == 10 and step['statuses'] == {'200': 10} and step['empty_rate'] == 0:
+    print(f"✓ Rate step completed, p95 latency {step['latency']['p95_ms']:.1f} ms")
+else:
+    print(f"✗ Unexpected step {step}")
+
+if step['coverage']['min'] <= step['coverage']['p50'] <= step['coverage']['max'] <= 1:
+    print("✓ Coverage distribution reported")
+else:
+    print(f"✗ Unexpected coverage {step.get('coverage')}")
+
+# Failed requests are counted as errors
+target = loadtest.Target(f'http://127.0.0.1:{loadtest.free_port()}/slpu', {}, 1)
+step = loadtest.report_step([target.send(b'<svg/>', {})], 1.0)
+if step['error_rate'] == 1 and step['throughput_rps'] == 0 and 'coverage' not in step:
+    print("✓ Connection errors counted")
+else:
+    print(f"✗ Unexpected error step {step}")
+
+# Sheds and server errors count as errors; at_target only when a threshold is given
+results = [
+    {'latency': 0.01, 'status': 200, 'empty': False, 'coverage': 0.1},
+    {'latency': 0.01, 'status': 200, 'empty': False, 'coverage': 0.3},
+    {'latency': 0.01, 'status': 503, 'empty': False},
+    {'latency': 0.01, 'status': 500, 'empty': False},
+]
+plain = loadtest.report_step(results, 1.0)
+targeted = loadtest.report_step(results, 1.0, target_coverage=0.2)
+if plain['error_rate'] == 0.5 and 'at_target' not in plain['coverage'] and targeted['coverage']['at_target'] == 0.5:
+    print("✓ Non-200 statuses counted as errors, at_target from the given threshold")
+else:
+    print(f"✗ Unexpected step {plain}, {targeted.get('coverage')}")
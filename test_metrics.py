@@ -0,0 +1,72 @@
+import main
+import metrics
+
+print("Metrics test:")
+
+client = main.app.test_client()
+svg_content = open('test_board.svg').read()
+
+parse_count = metrics.stage_duration.count(stage='parse')
+client.post('/slpu', data=svg_content)
+client.post('/slpu', data='<svg viewBox="0 0 100 100" xmlns="http://www.w3.org/2000/svg"></svg>')
+client.post('/slpu?strategy=unknown', data=svg_content.replace('BLUE', 'GREEN').replace('448', '416', 1))
+
+if metrics.stage_duration.count(stage='parse') == parse_count + 3:
+    print("✓ Parse durations recorded")
+else:
+    print("✗ Parse durations missing")
+
+if metrics.validation_failures.value(reason='board_width') >= 1:
+    print("✓ Validation failure counted by reason")
+else:
+    print("✗ Validation failure not counted")
+
+if metrics.validation_failures.value(reason='invalid_request') >= 1:
+    print("✓ Invalid request options counted")
+else:
+    print("✗ Invalid request options not counted")
+
+response = client.get('/metrics')
+text = response.get_data(as_text=True)
+expected = [
+    '# TYPE slpu_stage_duration_seconds histogram',
+    'slpu_stage_duration_seconds_bucket{stage="parse",le="+Inf"}',
+    'slpu_search_attempts_total',
+    'slpu_validation_failures_total{reason="board_width"}',
+    'slpu_coverage_ratio',
+]
+if response.content_type.startswith('text/plain') and all(line in text for line in expected):
+    print("✓ /metrics serves Prometheus text format")
+else:
+    print("✗ /metrics output is missing expected metrics")
+
+# Search counters add up across the Monte Carlo engines
+board = main.compile_board(256, ['8:26', '29:35'])
+for engine in main.ENGINES:
+    stats = {}
+    main.generate_rolls(256, 2, ['8:26', '29:35'], board, engine=engine, stats=stats)
+    if stats['attempts'] >= stats['wins'] >= 1 and stats.get('stop') in ('target', 'plateau'):
+        print(f"✓ {engine} engine reports {stats['attempts']} attempts and {stats['wins']} wins")
+    else:
+        print(f"✗ {engine} engine reported {stats}")
+
+# Refinement reports under its own phase, leaving the search's stop reason alone
+stats = {}
+main.generate_rolls(256, 2, ['8:26', '29:35'], board, engine='python', stats=stats)
+refine = stats.get('refine', {})
+if stats.get('stop') in ('target', 'plateau') and refine.get('attempts', 0) >= refine.get('wins', 0) >= 1:
+    print(f"✓ Search stopped on '{stats['stop']}', refinement counted separately ({refine})")
+else:
+    print(f"✗ Search and refinement stats mixed: {stats}")
+
+def search_stops():
+    return sum(metrics.search_early_stops.value(phase='search', reason=reason)
+               for reason in ('target', 'deadline', 'plateau', 'cancelled'))
+
+stops = search_stops()
+main.search_board(main.parse_svg_board(open('test_board.svg').read()), engine='python')
+if (search_stops() == stops + 1
+        and metrics.search_attempts.value(phase='refine') > 0):
+    print("✓ Early stops and attempts labelled by phase")
+else:
+    print("✗ Search metrics not labelled by phase")
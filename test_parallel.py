@@ -0,0 +1,56 @@
+import threading
+import time
+
+import main
+import parallel
+
+board_size = 256
+jumps = ['8:26', '29:35']
+board = main.compile_board(board_size, jumps)
+
+# Pool workers start with forkserver, which imports this script again in each of them
+if __name__ == '__main__':
+    print("Parallel search test:")
+
+    try:
+        rolls = main.generate_rolls(board_size, 2, jumps, board, workers=2)
+        positions, squares_landed, winner, _ = main.simulate_game(board_size, 2, jumps, rolls, board)
+        if winner == 1:
+            print(f"✓ 2 workers generated {len(rolls)} rolls, last player wins")
+        else:
+            print("✗ Last player did not win")
+
+        # The pool is reused by later searches instead of being recreated
+        pool = parallel.get_pool(2)
+        main.generate_rolls(board_size, 2, jumps, board, workers=2)
+        if parallel.get_pool(2) is pool:
+            print("✓ Process pool is reused across searches")
+        else:
+            print("✗ Process pool was recreated")
+
+        # A shard is reproducible from its seed
+        first = parallel.search_shard(board_size, tuple(jumps), 2, 200, 7, 'python')
+        second = parallel.search_shard(board_size, tuple(jumps), 2, 200, 7, 'python')
+        if first == second:
+            print("✓ Shards are reproducible from their seed")
+        else:
+            print("✗ Shard results differ for the same seed")
+
+        # A cancelled search stops its running shards, so the pool is free for the next one
+        cancel = threading.Event()
+        threading.Timer(0.2, cancel.set).start()
+        parallel.parallel_rolls(board, 2, 2, attempts=10 ** 7, engine='python', cancel=cancel)
+        started = time.monotonic()
+        pool.submit(time.monotonic).result()
+        waited = time.monotonic() - started
+        if waited < 2:
+            print(f"✓ Cancelled shards stopped, pool free after {waited * 1000:.0f}ms")
+        else:
+            print(f"✗ Pool still busy {waited:.1f}s after the search was cancelled")
+
+        if len(parallel._free_slots) == parallel.STOP_SLOTS:
+            print("✓ Stop slots released")
+        else:
+            print(f"✗ {parallel.STOP_SLOTS - len(parallel._free_slots)} stop slots still taken")
+    finally:
+        parallel.shutdown_pool()
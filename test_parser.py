@@ -0,0 +1,57 @@
+import main
+
+print("Streaming parser test:")
+
+board_data = main.parse_svg_board(open('test_board.svg').read())
+if (board_data['board_size'], board_data['jumps']) == (256, ['8:26', '29:35']):
+    print("✓ Board size and jumps parsed")
+else:
+    print(f"✗ Unexpected board: {board_data['board_size']} {board_data['jumps']}")
+
+if board_data['svg_root'].get('viewBox') == '0 0 512 512':
+    print("✓ SVG root kept for rendering")
+else:
+    print("✗ SVG root missing")
+
+# Bytes input parses the same as text
+if main.parse_svg_board(open('test_board.svg', 'rb').read())['jumps'] == board_data['jumps']:
+    print("✓ Bytes input parses the same as text")
+else:
+    print("✗ Bytes input parsed differently")
+
+def rejected(svg_content):
+    try:
+        main.parse_svg_board(svg_content)
+    except ValueError:
+        return True
+    return False
+
+header = '<svg viewBox="0 0 256 256" xmlns="http://www.w3.org/2000/svg">'
+many_jumps = ''.join(
+    f'<line x1="{x}" y1="{y}" x2="{x}" y2="{y - 32}" />'
+    for x in range(0, 256, 32) for y in (192, 128)
+)
+cases = [
+    ("oversized body", header + ' ' * main.MAX_SVG_BYTES + '</svg>'),
+    ("malformed XML", header + '<line x1="32"'),
+    ("too many elements", header + '<g/>' * main.MAX_SVG_ELEMENTS + '</svg>'),
+    ("odd board height", '<svg viewBox="0 0 256 224" xmlns="http://www.w3.org/2000/svg"></svg>'),
+    ("jump off the board", header + '<line x1="32" y1="224" x2="32" y2="-64" /></svg>'),
+    ("line missing a coordinate", header + '<line x1="32" y1="224" x2="64" /></svg>'),
+    ("too many jumps", header + many_jumps + '</svg>'),
+]
+for name, svg_content in cases:
+    if rejected(svg_content):
+        print(f"✓ Rejected {name}")
+    else:
+        print(f"✗ Accepted {name}")
+
+# /slpu refuses an oversized body from its Content-Length, without reading it
+client = main.app.test_client()
+failures = main.metrics.validation_failures.value(reason='body_too_large')
+response = client.post('/slpu', data=header + ' ' * main.MAX_SVG_BYTES + '</svg>')
+if (response.get_data(as_text=True) == main.EMPTY_SVG
+        and main.metrics.validation_failures.value(reason='body_too_large') == failures + 1):
+    print("✓ /slpu rejects bodies over MAX_SVG_BYTES")
+else:
+    print(f"✗ /slpu answered an oversized body with {response.status_code}")
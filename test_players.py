@@ -0,0 +1,81 @@
+import random
+import main
+
+# Reference simulator with one list entry per player and a set of squares
+def reference_game(board_size, players, jumps, rolls):
+    board = main.compile_board(board_size, jumps)
+    positions = [0] * players
+    modes = [main.REGULAR_DIE] * players
+    landed = set()
+    player = 0
+    for index, die_roll in enumerate(rolls, 1):
+        transition = (positions[player] * 2 + modes[player]) * 6 + die_roll - 1
+        landed.add(board.landing[transition])
+        landed.add(board.destination[transition])
+        positions[player] = board.destination[transition]
+        modes[player] = board.next_mode[transition]
+        if positions[player] == board_size:
+            return positions, landed, player, index
+        player = (player + 1) % players
+    return positions, landed, None, len(rolls)
+
+print("N-player test:")
+
+board_size = 400
+jumps = ['10:150', '160:20', '200:390', '395:5']
+rng = random.Random(11)
+agree = True
+for players in (1, 2, 3, 8, 12, 16):
+    for _ in range(50):
+        rolls = [rng.randint(1, 6) for _ in range(rng.randint(1, 300))]
+        if main.simulate_game(board_size, players, jumps, rolls) != reference_game(board_size, players, jumps, rolls):
+            agree = False
+
+if agree:
+    print("✓ Packed state simulation matches the reference for 1 to 16 players")
+else:
+    print("✗ Packed state simulation differs from the reference")
+
+# Searches find a win by the last player for large player counts
+board = main.compile_board(board_size, jumps)
+for strategy in main.STRATEGIES:
+    rolls = main.generate_rolls(board_size, 8, jumps, board, strategy)
+    _, _, winner, _ = main.simulate_game(board_size, 8, jumps, rolls, board)
+    if winner == 7:
+        print(f"✓ {strategy} wins with the last of 8 players")
+    else:
+        print(f"✗ {strategy} winner was {winner} with 8 players")
+
+# Player count parameter
+if main.parse_players(None) == main.DEFAULT_PLAYERS and main.parse_players('8') == 8:
+    print("✓ Player count parsed")
+else:
+    print("✗ Player count not parsed")
+
+rejected = 0
+for value in ('0', str(main.MAX_PLAYERS + 1), 'many'):
+    try:
+        main.parse_players(value)
+    except ValueError:
+        rejected += 1
+if rejected == 3:
+    print("✓ Invalid player counts rejected")
+else:
+    print(f"✗ Only {rejected} of 3 invalid player counts rejected")
+
+# The endpoint draws one marker per player on the board
+main.result_cache = main.cache.ResultCache(0)
+client = main.app.test_client()
+svg_content = open('test_board.svg').read()
+response = client.post('/slpu', data=svg_content, query_string={'strategy': 'solver', 'players': 6}).get_data(as_text=True)
+colors = [color for color in main.PLAYER_COLORS[:6] if f'fill="{color}"' in response]
+if len(colors) == 6 and response.count('<circle') == 6:
+    print("✓ /slpu renders six players")
+else:
+    print(f"✗ /slpu rendered {response.count('<circle')} markers")
+
+response = client.post('/slpu', data=svg_content, query_string={'players': 99}).get_data(as_text=True)
+if response == main.EMPTY_SVG:
+    print("✓ Out-of-range player count returns the empty board")
+else:
+    print("✗ Out-of-range player count was accepted")
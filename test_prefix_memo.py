@@ -0,0 +1,57 @@
+import main
+import random
+
+board_size = 256
+jumps = ['20:90', '95:30', '120:200', '210:140', '230:7']
+board = main.compile_board(board_size, jumps)
+
+print("Prefix memo test:")
+
+# PrefixSimulator must agree with simulate_game, with and without shared prefixes
+rng = random.Random(7)
+memo = main.PrefixSimulator(board, 3)
+base = [rng.randint(1, 6) for _ in range(150)]
+agree = True
+for _ in range(300):
+    cut = rng.randint(0, len(base))
+    rolls = base[:cut] + [rng.randint(1, 6) for _ in range(rng.randint(0, 60))]
+    if memo.play(rolls) != main.simulate_game(board_size, 3, jumps, rolls, board):
+        agree = False
+
+if agree:
+    print("✓ Memoized simulation matches simulate_game")
+else:
+    print("✗ Memoized simulation differs from simulate_game")
+
+# Shared prefixes are stored once
+memo = main.PrefixSimulator(board, 2)
+memo.path(base[:100])
+before = memo.nodes
+memo.path(base[:80] + [1, 2, 3])
+if memo.nodes - before <= 3:
+    print("✓ Shared prefix reused from the trie")
+else:
+    print(f"✗ Shared prefix added {memo.nodes - before} nodes")
+
+# The trie never grows past its node budget
+memo = main.PrefixSimulator(board, 2, max_nodes=50)
+for _ in range(20):
+    memo.path([rng.randint(1, 6) for _ in range(40)])
+if memo.nodes <= 50:
+    print("✓ Node budget respected")
+else:
+    print(f"✗ Trie holds {memo.nodes} nodes")
+
+try:
+    memo.play([3, 7])
+    print("✗ Out-of-range roll accepted")
+except ValueError:
+    print("✓ Out-of-range roll rejected")
+
+# Wins reported by the search are real wins with the reported coverage
+rolls = main.monte_carlo_rolls(board, 2, attempts=500, rng=random.Random(3))
+_, covered, winner, _ = main.simulate_game(board_size, 2, jumps, rolls, board)
+if rolls and winner == 1:
+    print(f"✓ Search returns a win by the last player (coverage {len(covered) / board_size:.1%})")
+else:
+    print("✗ Search did not return a win by the last player")
@@ -0,0 +1,85 @@
+import json
+import os
+import pstats
+import tempfile
+
+import main
+import profiling
+
+print("Profiling test:")
+
+svg_content = open('test_board.svg').read()
+main.result_cache = main.cache.ResultCache(0)
+client = main.app.test_client()
+
+# Without a profile directory the header is ignored
+profiling.PROFILE_DIR = None
+response = client.post('/slpu', data=svg_content, headers={'X-Profile': '1'})
+if profiling.PROFILE_ID_HEADER not in response.headers and response.headers.get('X-Coverage'):
+    print("✓ Profiling is off unless configured")
+else:
+    print("✗ Request profiled without a profile directory")
+
+with tempfile.TemporaryDirectory() as directory:
+    profiling.PROFILE_DIR = directory
+
+    # Requests that do not ask are not profiled
+    response = client.post('/slpu', data=svg_content)
+    if profiling.PROFILE_ID_HEADER not in response.headers and not os.listdir(directory):
+        print("✓ Requests are not profiled by default")
+    else:
+        print("✗ Request profiled without asking")
+
+    # The header profiles the request and names the profile in the response
+    response = client.post('/slpu', data=svg_content, query_string={'strategy': 'guided', 'players': 3},
+                           headers={'X-Profile': '1'})
+    profile_id = response.headers.get(profiling.PROFILE_ID_HEADER)
+    path = os.path.join(directory, profile_id or 'missing')
+    if profile_id and sorted(os.listdir(path)) == ['board.svg', 'profile.pstats', 'request.json', 'sections.folded']:
+        print("✓ Profile saved under the returned id")
+    else:
+        print(f"✗ Profile id {profile_id!r}, files {os.listdir(directory)}")
+
+    with open(os.path.join(path, 'request.json')) as f:
+        info = json.load(f)
+    if (info['params']['strategy'] == 'guided' and info['params']['players'] == 3
+            and main.coverage_header(info) == response.headers['X-Coverage']):
+        print("✓ Request parameters and coverage recorded")
+    else:
+        print(f"✗ Recorded {info}")
+
+    if 'generate_rolls;guided' in info['sections'] and 'simulate_game' in info['sections']:
+        print("✓ Named sections recorded")
+    else:
+        print(f"✗ Sections {sorted(info['sections'])}")
+
+    with open(os.path.join(path, 'sections.folded')) as f:
+        folded = dict(line.rsplit(' ', 1) for line in f.read().splitlines())
+    if 'request;generate_rolls;guided' in folded and all(int(value) >= 0 for value in folded.values()):
+        print("✓ Sections written as folded stacks")
+    else:
+        print(f"✗ Folded stacks {folded}")
+
+    stats = pstats.Stats(os.path.join(path, 'profile.pstats'))
+    functions = {name for _, _, name in stats.stats}
+    if 'guided_rolls' in functions:
+        print("✓ cProfile statistics include the search")
+    else:
+        print("✗ cProfile statistics miss guided_rolls")
+
+    with open(os.path.join(path, 'board.svg')) as f:
+        if f.read() == svg_content:
+            print("✓ Board saved with the profile")
+        else:
+            print("✗ Saved board differs from the request")
+
+    # Sampling profiles requests that did not ask
+    profiling.PROFILE_SAMPLE = 1.0
+    response = client.post('/slpu', data=svg_content)
+    profiling.PROFILE_SAMPLE = 0.0
+    if profiling.PROFILE_ID_HEADER in response.headers:
+        print("✓ Sampled request profiled")
+    else:
+        print("✗ Sampled request not profiled")
+
+profiling.PROFILE_DIR = None
@@ -0,0 +1,55 @@
+import random
+import threading
+import main
+
+board_size = 1024
+jumps = ['100:700', '710:40', '300:900', '950:12', '500:1000']
+board = main.compile_board(board_size, jumps)
+
+print("Local search test:")
+
+# Keep refining past the coverage that already earns the maximum score
+main.TARGET_COVERAGE = 0
+
+seed = main.monte_carlo_rolls(board, 2, attempts=300, rng=random.Random(4))
+_, seed_landed, _, _ = main.simulate_game(board_size, 2, jumps, seed, board)
+stats = {}
+refined = main.refine_rolls(board, 2, seed, iterations=1500, rng=random.Random(4), stats=stats)
+_, refined_landed, winner, roll_index = main.simulate_game(board_size, 2, jumps, refined, board)
+
+if winner == 1 and roll_index == len(refined):
+    print("✓ Refined sequence is a win by the last player on its final roll")
+else:
+    print(f"✗ Refined sequence winner {winner} after {roll_index} of {len(refined)} rolls")
+
+if len(refined_landed) < len(seed_landed):
+    print(f"✓ Coverage reduced from {len(seed_landed)} to {len(refined_landed)} squares")
+else:
+    print(f"✗ Coverage not reduced ({len(seed_landed)} -> {len(refined_landed)})")
+
+if stats['attempts'] <= 1500 and 0 < stats['wins'] <= stats['attempts']:
+    print("✓ Search stats recorded")
+else:
+    print(f"✗ Unexpected stats {stats}")
+
+# A sequence the last player does not win is returned unchanged
+losing = [6, 6, 6]
+if main.refine_rolls(board, 2, losing, iterations=10) is losing:
+    print("✓ Non-winning sequence left alone")
+else:
+    print("✗ Non-winning sequence was changed")
+
+cancel = threading.Event()
+cancel.set()
+stats = {}
+if main.refine_rolls(board, 2, seed, cancel=cancel, stats=stats) == seed and stats.get('stop') == 'cancelled':
+    print("✓ Cancelled refinement returns the input")
+else:
+    print(f"✗ Cancelled refinement stats {stats}")
+
+# generate_rolls refines the search result
+rolls = main.generate_rolls(board_size, 3, jumps, board)
+if main.simulate_game(board_size, 3, jumps, rolls, board)[2] == 2:
+    print("✓ generate_rolls returns a refined win by the last player")
+else:
+    print("✗ generate_rolls did not return a win by the last player")
@@ -0,0 +1,51 @@
+import main
+from xml.etree import ElementTree as ET
+
+# Reference renderer: copy the tree, append circles and serialize again
+def reference_render(svg_root, positions, board_width, board_height):
+    root = ET.fromstring(ET.tostring(svg_root))
+    colors = main.PLAYER_COLORS
+    for i, pos in enumerate(positions):
+        if pos > 0:
+            x, y = main.square_to_coord(pos, board_width, board_height)
+            circle = ET.Element('circle')
+            circle.set('cx', str(x))
+            circle.set('cy', str(y))
+            circle.set('r', '12')
+            circle.set('fill', colors[i % len(colors)])
+            circle.set('stroke', 'black')
+            circle.set('stroke-width', '2')
+            root.append(circle)
+    return ET.tostring(root, encoding='unicode', method='xml')
+
+print("Template renderer test:")
+
+boards = [
+    open('test_board.svg').read(),
+    '''<svg viewBox="0 0 128 128" xmlns="http://www.w3.org/2000/svg">
+  <rect width="100%" height="100%" fill="#f9f9f9" />
+  <line x1="112" y1="48" x2="80" y2="16" stroke="BLUE" />
+</svg>''',
+    '<svg viewBox="0 0 128 128" xmlns="http://www.w3.org/2000/svg"/>',
+    '<svg viewBox="0 0 128 128" xmlns="http://www.w3.org/2000/svg">text only</svg>',
+]
+position_sets = [[0, 0], [1, 0], [5, 16], [3, 7, 9, 11, 13]]
+
+for svg_content in boards:
+    board_data = main.parse_svg_board(svg_content)
+    template = main.BoardTemplate(board_data['svg_root'])
+    width, height = board_data['board_width'], board_data['board_height']
+    for positions in position_sets:
+        expected = reference_render(board_data['svg_root'], positions, width, height)
+        if template.render(positions, width, height) != expected:
+            print(f"✗ Output differs for positions {positions} on {width}x{height} board")
+            break
+    else:
+        print(f"✓ {width}x{height} board renders identically to the tree-based renderer")
+
+# Precomputed centers match square_to_coord
+centers = main.square_centers(32, 32)
+if all(centers[square] == main.square_to_coord(square, 32, 32) for square in range(1, 1025)):
+    print("✓ Square centers match square_to_coord")
+else:
+    print("✗ Square centers differ from square_to_coord")
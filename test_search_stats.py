@@ -0,0 +1,30 @@
+import threading
+import time
+
+import search_stats
+
+print("Search stop conditions test:")
+
+cancel = threading.Event()
+cancel.set()
+cases = [
+    ("target reached", search_stats.stop_reason(0.1, 0.25, time.monotonic() - 1, 5, 10, cancel), 'target'),
+    ("deadline passed", search_stats.stop_reason(0.5, 0.25, time.monotonic() - 1, 5, 10, cancel), 'deadline'),
+    ("no improvement", search_stats.stop_reason(0.5, 0.25, None, 5, 5, cancel), 'plateau'),
+    ("no win yet", search_stats.stop_reason(None, 0.25, None, 5, 50, cancel), 'cancelled'),
+    ("still improving", search_stats.stop_reason(0.5, 0.25, time.monotonic() + 60, 5, 4), None),
+]
+for name, stop, expected in cases:
+    if stop == expected:
+        print(f"✓ {name}: {stop}")
+    else:
+        print(f"✗ {name}: got {stop}, expected {expected}")
+
+stats = {}
+search_stats.add_search_stats(stats, 10, 3, 'plateau')
+search_stats.add_search_stats(stats, 5, 1)
+search_stats.add_search_stats(None, 5, 1, 'target')
+if stats == {'attempts': 15, 'wins': 4, 'stop': 'plateau'}:
+    print("✓ Counts added up and the stop reason kept")
+else:
+    print(f"✗ Stats were {stats}")
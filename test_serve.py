@@ -0,0 +1,58 @@
+import http.client
+import queue
+import re
+import signal
+import subprocess
+import sys
+import threading
+
+print("Prefork server test:")
+
+server = subprocess.Popen([sys.executable, 'serve.py', '--workers', '2', '--host', '127.0.0.1', '--port', '0'],
+                          stderr=subprocess.PIPE, text=True)
+lines = queue.Queue()
+threading.Thread(target=lambda: [lines.put(line) for line in server.stderr], daemon=True).start()
+
+def wait_for(pattern, timeout=30):
+    """Return the booted worker pids and the match of the first log line matching ``pattern``."""
+    booted = []
+    while True:
+        line = lines.get(timeout=timeout)
+        booted += re.findall(r'Booted worker (\d+)', line)
+        match = re.search(pattern, line)
+        if match:
+            return booted, match
+
+def post(port, path, body):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    connection.request('POST', path, body, {'Content-Type': 'image/svg+xml'})
+    response = connection.getresponse()
+    return response.status, response.read().decode()
+
+svg_content = open('test_board.svg', 'rb').read()
+try:
+    first, match = wait_for(r'Listening on [\d.]+:(\d+) with 2 workers')
+    port = int(match.group(1))
+
+    status, body = post(port, '/slpu?strategy=solver', svg_content)
+    if status == 200 and '<circle' in body and len(first) == 2:
+        print("✓ Two workers serve /slpu from the shared socket")
+    else:
+        print(f"✗ Unexpected response {status} {body[:80]}")
+
+    server.send_signal(signal.SIGHUP)
+    second, _ = wait_for(r'Listening on')
+    status, body = post(port, '/slpu?strategy=solver', svg_content)
+    if status == 200 and '<circle' in body and len(second) == 2 and not set(first) & set(second):
+        print("✓ SIGHUP replaces the workers and keeps serving on the same port")
+    else:
+        print(f"✗ Reload failed: {status}, workers {first} -> {second}")
+
+    server.send_signal(signal.SIGTERM)
+    if server.wait(timeout=30) == 0:
+        print("✓ SIGTERM shuts the server down")
+    else:
+        print(f"✗ Server exited with {server.returncode}")
+finally:
+    if server.poll() is None:
+        server.kill()
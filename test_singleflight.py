@@ -0,0 +1,154 @@
+import threading
+import time
+
+import cache
+import main
+
+print("Single-flight test:")
+
+def run_concurrently(count, call):
+    """Start ``count`` threads on ``call`` at once and return their results."""
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def worker(index):
+        barrier.wait()
+        results[index] = call()
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+# Concurrent calls for one key run the function once and share its value
+flight = cache.SingleFlight()
+calls = []
+
+def slow_search():
+    calls.append(1)
+    time.sleep(0.2)
+    return 'result'
+
+results = run_concurrently(8, lambda: flight.do('board', slow_search))
+outcomes = sorted(outcome for _, outcome in results)
+if len(calls) == 1 and all(value == 'result' for value, _ in results) and outcomes == ['leader'] + ['shared'] * 7:
+    print("✓ Concurrent identical calls share one search")
+else:
+    print(f"✗ {len(calls)} searches ran, outcomes {outcomes}")
+
+if len(flight) == 0:
+    print("✓ Finished flights are forgotten")
+else:
+    print(f"✗ {len(flight)} flights left behind")
+
+# A failing leader does not hand its error to the followers
+flight = cache.SingleFlight()
+calls = []
+
+def failing_once():
+    calls.append(1)
+    time.sleep(0.1)
+    if len(calls) == 1:
+        raise RuntimeError('search failed')
+    return 'recovered'
+
+def call_failing():
+    try:
+        return flight.do('board', failing_once)
+    except RuntimeError:
+        return None, 'raised'
+
+results = run_concurrently(4, call_failing)
+raised = [result for result in results if result[1] == 'raised']
+recovered = [result for result in results if result[0] == 'recovered']
+if len(raised) == 1 and len(recovered) == 3 and len(calls) == 2:
+    print("✓ Followers retry after a failing leader")
+else:
+    print(f"✗ Failing leader: {results}, {len(calls)} searches")
+
+# A cancelled leader's result is not shared
+flight = cache.SingleFlight()
+leader_cancel = threading.Event()
+started = threading.Event()
+
+def cancelled_search():
+    started.set()
+    time.sleep(0.1)
+    leader_cancel.set()
+    return 'partial'
+
+leader = threading.Thread(target=flight.do, args=('board', cancelled_search, None, leader_cancel))
+leader.start()
+started.wait()
+value, outcome = flight.do('board', lambda: 'complete')
+leader.join()
+if (value, outcome) == ('complete', 'leader'):
+    print("✓ Cancelled leader's result is not shared")
+else:
+    print(f"✗ Follower of a cancelled leader got {value!r} ({outcome})")
+
+# A follower stops waiting at its own deadline and searches itself
+flight = cache.SingleFlight()
+started = threading.Event()
+
+def stuck_search():
+    started.set()
+    time.sleep(0.5)
+    return 'late'
+
+leader = threading.Thread(target=flight.do, args=('board', stuck_search))
+leader.start()
+started.wait()
+began = time.monotonic()
+value, outcome = flight.do('board', lambda: 'own', deadline=time.monotonic() + 0.05)
+waited = time.monotonic() - began
+leader.join()
+if (value, outcome) == ('own', 'timeout') and waited < 0.3:
+    print("✓ Follower falls back to its own search at its deadline")
+else:
+    print(f"✗ Follower got {value!r} ({outcome}) after {waited:.2f}s")
+
+# Followers only share a leader whose deadline gives them at least their own budget
+flight = cache.SingleFlight()
+started = threading.Event()
+
+def budgeted_search():
+    started.set()
+    time.sleep(0.2)
+    return 'budgeted'
+
+leader_deadline = time.monotonic() + 1
+leader = threading.Thread(target=flight.do, args=('board', budgeted_search, leader_deadline))
+leader.start()
+started.wait()
+unbudgeted = flight.do('board', lambda: 'full')
+shorter = flight.do('board', lambda: 'own', deadline=leader_deadline - 0.1)
+leader.join()
+if unbudgeted == ('full', 'leader') and shorter == ('budgeted', 'shared') and len(flight) == 0:
+    print("✓ Followers share only leaders whose budget covers theirs")
+else:
+    print(f"✗ Unbudgeted follower got {unbudgeted}, shorter-budget follower {shorter}")
+
+# solve_board coalesces concurrent requests for the same board
+with open('test_board.svg') as f:
+    board_data = main.parse_svg_board(f.read())
+main.result_cache = cache.ResultCache(0)
+searches = []
+search_board = main.search_board
+
+def counted_search(*args, **kwargs):
+    searches.append(1)
+    time.sleep(0.1)
+    return search_board(*args, **kwargs)
+
+main.search_board = counted_search
+try:
+    results = run_concurrently(6, lambda: main.solve_board(board_data, 2))
+finally:
+    main.search_board = search_board
+if len(searches) == 1 and all(result == results[0] for result in results):
+    print("✓ solve_board runs one search for concurrent identical boards")
+else:
+    print(f"✗ solve_board ran {len(searches)} searches")
@@ -0,0 +1,88 @@
+import json
+import os
+import random
+import tempfile
+
+import bench
+import solve_boards
+
+print("Bulk solver test:")
+
+rng = random.Random(3)
+svg_content = open('test_board.svg').read()
+
+with tempfile.TemporaryDirectory() as directory:
+    inputs = os.path.join(directory, 'boards.jsonl')
+    output = os.path.join(directory, 'results.jsonl')
+    with open(inputs, 'w') as f:
+        for index in range(12):
+            f.write(json.dumps({'id': f'board-{index}', 'svg': bench.random_board_svg(8, 8, 4, rng)}) + '\n')
+        f.write(json.dumps({'id': 'bad', 'svg': '<svg>'}) + '\n')
+        f.write(json.dumps({'svg': svg_content, 'query': {'players': 3, 'strategy': 'solver'}}) + '\n')
+
+    summary = solve_boards.main_cli([inputs, 'test_board.svg', '--output', output, '--workers', '2',
+                                     '--chunk-size', '3'])
+    with open(output) as f:
+        lines = [json.loads(line) for line in f]
+
+    # One line per board, in input order
+    expected_ids = [f'board-{index}' for index in range(12)] + ['bad', f'{inputs}:14', 'test_board.svg']
+    if [line['id'] for line in lines] == expected_ids:
+        print("✓ One output line per board, in input order")
+    else:
+        print(f"✗ Output ids {[line['id'] for line in lines]}")
+
+    solved = [line for line in lines if 'error' not in line]
+    if len(solved) == 14 and all(line['winner'] == line['players'] - 1 and line['rolls'] for line in solved):
+        print("✓ Every valid board solved for its last player")
+    else:
+        print(f"✗ {len(solved)} boards solved")
+
+    if lines[13]['players'] == 3 and set(lines[0]['timing_ms']) == {'parse', 'search', 'simulate'}:
+        print("✓ Per-board query and stage timings recorded")
+    else:
+        print(f"✗ Unexpected line {lines[13]}")
+
+    if 'error' in lines[12] and summary['errors'] == 1 and summary['solved'] == 15:
+        print("✓ Invalid board reported as an error line")
+    else:
+        print(f"✗ Invalid board handling: {lines[12]}, {summary}")
+
+    # An interrupted run, with a partly written line, resumes after the complete lines
+    with open(output) as f:
+        kept = f.readlines()[:5]
+    with open(output, 'w') as f:
+        f.writelines(kept)
+        f.write('{"id": "board-5", "ro')
+    summary = solve_boards.main_cli([inputs, 'test_board.svg', '--output', output, '--workers', '2'])
+    with open(output) as f:
+        resumed = f.readlines()
+    if resumed[:5] == kept and [json.loads(line)['id'] for line in resumed] == expected_ids \
+            and summary['resumed_after'] == 5 and summary['solved'] == 10:
+        print("✓ Interrupted run resumed after the complete lines")
+    else:
+        print(f"✗ Resume wrote {len(resumed)} lines, summary {summary}")
+
+    # An output written for other boards is not silently extended
+    try:
+        solve_boards.main_cli(['test_board.svg', '--output', output])
+        print("✗ Output from another input was resumed")
+    except SystemExit:
+        print("✓ Output from another input refused")
+
+    # Lines that are not boards are reported in place rather than stopping the run
+    mixed = os.path.join(directory, 'mixed.jsonl')
+    with open(mixed, 'w') as f:
+        f.write('{"id": "first", "svg": ' + json.dumps(svg_content) + '}\n')
+        f.write('{"id": "cut off", "sv\n')
+        f.write('{"id": "no svg"}\n')
+        f.write('{"id": "last", "svg": ' + json.dumps(svg_content) + '}\n')
+    summary = solve_boards.main_cli([mixed, '--output', os.path.join(directory, 'mixed-results.jsonl'),
+                                     '--workers', '1'])
+    with open(os.path.join(directory, 'mixed-results.jsonl')) as f:
+        lines = [json.loads(line) for line in f]
+    if ([line['id'] for line in lines] == ['first', f'{mixed}:2', f'{mixed}:3', 'last']
+            and [('error' in line) for line in lines] == [False, True, True, False] and summary['errors'] == 2):
+        print("✓ Unreadable input lines reported as error lines")
+    else:
+        print(f"✗ Unreadable input lines gave {lines}")
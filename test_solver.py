@@ -0,0 +1,36 @@
+import main
+
+# Boards of increasing size, with a ladder and a snake near the start
+boards = [
+    (16, ['3:9', '12:5']),
+    (256, ['8:26', '29:35']),
+    (1024, ['10:200', '300:20', '500:900']),
+]
+
+print("Solver test:")
+
+for board_size, jumps in boards:
+    board = main.compile_board(board_size, jumps)
+
+    for players in (2, 3):
+        rolls = main.generate_rolls(board_size, players, jumps, board, strategy='solver')
+        positions, squares_landed, winner, roll_count = main.simulate_game(board_size, players, jumps, rolls, board)
+        coverage = len(squares_landed) / board_size
+
+        if winner == players - 1 and roll_count == len(rolls):
+            print(f"✓ {board_size} squares, {players} players: last player wins "
+                  f"with {len(rolls)} rolls, coverage {coverage:.2%}")
+        else:
+            print(f"✗ {board_size} squares, {players} players: last player did not win")
+
+        if all(1 <= r <= 6 for r in rolls):
+            print("✓ All rolls are valid (1-6)")
+        else:
+            print("✗ Some rolls are invalid")
+
+# The solver is deterministic
+board = main.compile_board(256, ['8:26', '29:35'])
+if main.solve_rolls(board, 2) == main.solve_rolls(board, 2):
+    print("✓ Solver output is deterministic")
+else:
+    print("✗ Solver output changed between runs")
@@ -0,0 +1,84 @@
+import random
+import time
+
+import batch_engine
+import main
+
+print("Verification test:")
+
+rng = random.Random(11)
+board_size = 256
+jumps = ['20:90', '95:30', '120:200', '210:140', '230:7']
+board = main.compile_board(board_size, jumps)
+
+sequences = [[rng.randint(1, 6) for _ in range(rng.randint(0, 200))] for _ in range(2000)]
+sequences[1] = [1, 2, 7, 3]
+sequences[2] = []
+
+def reference(players, rolls):
+    try:
+        positions, squares_landed, winner, roll_index = main.simulate_game(board_size, players, jumps, rolls, board)
+    except ValueError as e:
+        return {'error': str(e)}
+    return {'winner': winner, 'positions': positions, 'coverage': len(squares_landed) / board_size,
+            'rolls_used': roll_index}
+
+# Every engine agrees with simulate_game, errors included
+expected = {players: [reference(players, rolls) for rolls in sequences] for players in (1, 3)}
+engines = ['python'] + (['numpy'] if batch_engine.available() else [])
+for engine in engines:
+    if all(main.verify_rolls(board, players, sequences, engine) == expected[players] for players in (1, 3)):
+        print(f"✓ {engine} verification matches simulate_game")
+    else:
+        print(f"✗ {engine} verification differs from simulate_game")
+
+if expected[3][1] == {'error': 'Die roll 7 not in range [1..6]'} and expected[3][2]['rolls_used'] == 0:
+    print("✓ Invalid and empty sequences reported")
+else:
+    print(f"✗ Unexpected results {expected[3][1]}, {expected[3][2]}")
+
+# Small batches stay on the pure Python path
+if batch_engine.available():
+    small = main.verify_rolls(board, 2, sequences[:10], 'numpy')
+    if small == main.verify_rolls(board, 2, sequences[:10], 'python'):
+        print("✓ Small numpy batches match")
+    else:
+        print("✗ Small numpy batches differ")
+
+# Bulk verification is well above one sequence per simulate_game call
+started = time.perf_counter()
+main.verify_rolls(board, 2, sequences * 5, main.VERIFY_ENGINE)
+rate = len(sequences) * 5 / (time.perf_counter() - started)
+print(f"  {rate:.0f} sequences/s")
+
+# The endpoint takes a board and sequences as JSON
+client = main.app.test_client()
+svg_content = open('test_board.svg').read()
+board_data = main.parse_svg_board(svg_content)
+rolls = main.solve_rolls(main.compile_board(board_data['board_size'], board_data['jumps']), 2)
+response = client.post('/verify', json={'svg': svg_content, 'sequences': [rolls, [1, 2, 3]]})
+body = response.get_json()
+if (response.status_code == 200 and body['board_size'] == board_data['board_size'] and len(body['results']) == 2
+        and body['results'][0]['winner'] == 1 and body['results'][1]['winner'] is None):
+    print("✓ /verify reports each sequence")
+else:
+    print(f"✗ Unexpected /verify response {response.status_code} {body}")
+
+response = client.post('/verify', json={'svg': svg_content, 'rolls': rolls, 'players': 3})
+body = response.get_json()
+if response.status_code == 200 and body['players'] == 3 and len(body['results']) == 1:
+    print("✓ /verify accepts a single sequence and a player count")
+else:
+    print(f"✗ Unexpected /verify response {response.status_code} {body}")
+
+rejected = 0
+for payload in ({'sequences': [rolls]}, {'svg': svg_content}, {'svg': svg_content, 'sequences': [['1']]},
+                {'svg': '<svg>', 'rolls': rolls}):
+    response = client.post('/verify', json=payload)
+    rejected += response.status_code == 400 and 'error' in response.get_json()
+response = client.post('/verify', data='not json')
+rejected += response.status_code == 400
+if rejected == 5:
+    print("✓ Invalid /verify requests rejected")
+else:
+    print(f"✗ Only {rejected} of 5 invalid /verify requests rejected")